@@ -0,0 +1,554 @@
+# analysis.py
+# 결과 파일 분석 / triage 리포트
+# - sender / scenario 결과(CSV/JSONL)를 한 번만 스트리밍하며
+#   (액션, 변형, 결과 분류, 오류 원인 시그니처) 버킷으로 집계
+# - 메모리: 버킷 수(MAX_BUCKETS 상한) × (카운트 + 지연 히스토그램 + 예시 몇 건). 행 수와 무관
+# - 리포트: 결과 분류 요약, 상위 버킷, 드문 버킷, crash/hang, 지연 이상치, 변형 연산자별 수율 (.md 또는 .html)
+# - pandas(+numpy)가 설치되어 있으면 CSV를 청크 단위로 벡터화 집계 (--engine, 집계 결과는 같음)
+
+import argparse
+import csv
+import functools
+import heapq
+import html
+import itertools
+import re
+import sys
+import time
+from pathlib import Path
+
+from . import codec
+from .provenance import TUNABLE_OPS, apply_tuning, load_tuning, operator_yields, save_tuning, tune_probabilities
+from .results import is_jsonl_path
+from .stats import LatencyHistogram, SUB_BUCKET_BITS, SUB_BUCKET_COUNT, SUB_BUCKET_HALF, VALUE_UNIT
+
+try:
+    import numpy
+    import pandas
+except ImportError:  # 선택 의존성: --engine pandas 일 때만 필요
+    numpy = None
+    pandas = None
+
+REPORT_DEFAULT_PATH = "triage_report.md"
+ENGINES = ["auto", "python", "pandas"]
+MAX_BUCKETS = 50000            # 버킷 수 상한. 넘으면 새 버킷 키는 모두 OVERFLOW_KEY 하나로 합침
+OVERFLOW_SIGNATURE = "<other>"
+OVERFLOW_KEY = (OVERFLOW_SIGNATURE,) * 4   # 상한을 넘은 (액션, 변형, 결과, 시그니처) 전체를 모으는 버킷
+SIGNATURE_CACHE_SIZE = 65536  # detail → 시그니처 LRU 크기 (같은 원인 문자열이 반복되므로)
+SIGNATURE_MAX_CHARS = 160      # 오류 원인 시그니처 최대 길이
+LONG_QUOTED_CHARS = 24         # 이보다 긴 따옴표 문자열은 '…'로 대체 (짧은 건 필드/타입 이름으로 유지)
+BUCKET_EXAMPLES = 3            # 버킷별로 남길 느린 케이스 예시 수
+SLOWEST_CASES = 20             # 전체에서 남길 가장 느린 케이스 수
+RARE_COUNT = 2                 # 이 횟수 이하로 나온 버킷을 "드문 버킷"으로 표시
+OUTLIER_FACTOR = 5.0           # 버킷 p99가 전체 p50의 이 배수 이상이면 지연 이상치
+OUTLIER_MIN_COUNT = 5          # 지연 이상치로 볼 버킷 최소 표본 수
+DEFAULT_TOP = 50               # 표별 최대 행 수
+DEFAULT_CHUNK_ROWS = 200000    # pandas 엔진 청크 크기
+FAULT_RESULT_PREFIXES = ("TIMEOUT", "CLOSED:", "EXC:", "HANG")
+
+# input 이름에서 액션/종류 추출: generator 케이스 ID "0001_Authorize_fuzz", --generate "gen:000001_Authorize"
+INPUT_NAME_PATTERN = r"^(?:gen:)?\d+_([A-Za-z0-9]+)(?:_([A-Za-z]+))?$"
+_INPUT_NAME = re.compile(INPUT_NAME_PATTERN)
+# 오류 원인 정규화: ocpp의 "Payload '<repr>' for action '<A>' is not valid: " 머리말, jsonschema 메시지 앞의
+# 인스턴스 값과 뒤의 "On instance" 값, enum 목록, 예상 밖 속성 이름, uuid/hex, 숫자, 긴 따옴표 문자열
+_PAYLOAD_PREFIX = re.compile(r"^Payload .+? for action '[^']*' is not valid: ", re.S)
+_ON_INSTANCE = re.compile(r"\s*On instance.*$", re.S)
+_ENUM_LIST = re.compile(r"is not one of \[[^\]]*\]?")
+_INSTANCE_PREFIX = re.compile(r"^.+? (is (?:not|too|less|greater|a multiple|not a multiple)\b)", re.S)
+_UNEXPECTED = re.compile(r"\(.* (was|were) unexpected\)", re.S)
+_HEX_ID = re.compile(r"\b[0-9a-fA-F]{8}(?:-?[0-9a-fA-F]{4}){3}-?[0-9a-fA-F]{12}\b|\b0x[0-9a-fA-F]+\b")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])")
+_LONG_QUOTED = re.compile("'[^']{%d,}'|\"[^\"]{%d,}\"" % (LONG_QUOTED_CHARS, LONG_QUOTED_CHARS))
+_MUTATION_ARGS = re.compile(r"[@:=].*$")
+
+
+@functools.lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def detail_signature(detail):
+    """
+    @param detail: 결과 파일의 detail 값 (CallError 원인 문자열)
+    @return: 값이 달라도 같은 원인이면 같은 문자열
+        예) "'xxxx…' is too long" → "<value> is too long", "'a' was unexpected" → "(<name> was unexpected)"
+    """
+    if not detail:
+        return ""
+    head = ""
+    match = _PAYLOAD_PREFIX.match(detail)
+    if match:
+        head, detail = "Payload is not valid: ", detail[match.end():]
+    sig = head + _INSTANCE_PREFIX.sub(r"<value> \1", _ON_INSTANCE.sub("", detail), count=1)
+    sig = _ENUM_LIST.sub("is not one of […]", sig)
+    sig = _UNEXPECTED.sub(r"(<name> \1 unexpected)", sig)
+    sig = _HEX_ID.sub("<id>", sig)
+    sig = _LONG_QUOTED.sub("'…'", sig)
+    sig = _NUMBER.sub("#", sig)
+    return " ".join(sig.split())[:SIGNATURE_MAX_CHARS]
+
+
+@functools.lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def mutation_signature(mutations):
+    """
+    @param mutations: 변형 목록 문자열 (";" 구분, 예: "swap:2;bogus_tx:3" / "invalid:too_long@idTag")
+    @return: 인자를 뺀 연산 이름을 정렬·중복 제거해 "+"로 이은 문자열 (예: "bogus_tx+swap")
+    """
+    if not mutations:
+        return ""
+    ops = {_MUTATION_ARGS.sub("", item.strip()) for item in mutations.split(";") if item.strip()}
+    return "+".join(sorted(op for op in ops if op))
+
+
+def row_fields(row):
+    """
+    @param row: 결과 행 dict (sender 또는 scenario 결과 컬럼)
+    @return: (버킷 키 (action, mutation, result, signature), input, detail, 지연 ms 또는 None)
+    @note: action / mutations 컬럼 값이 없으면 input 이름(케이스 ID)에서 추출, scenario 결과는 "<액션>:<결과>"를 나눔.
+        fault 컬럼이 있으면 결과 분류 뒤에 " [crash]" 형태로 붙임
+    """
+    input_name = str(row.get("input") or "")
+    result = str(row.get("result") or "")
+    action = str(row.get("action") or "")
+    mutation = str(row.get("mutations") or "")
+    if "steps" in row and result != "ok":
+        action, _, result = result.partition(":")
+    match = _INPUT_NAME.match(input_name)
+    if match:
+        action = action or match.group(1)
+        mutation = mutation or (match.group(2) or "")
+    fault = row.get("fault")
+    if fault:
+        result = f"{result} [{fault}]"
+    detail = str(row.get("detail") or "")
+    latency = row.get("parsed_ms")
+    if latency is None:
+        latency = row.get("elapsed_ms")
+    try:
+        latency = float(latency) if latency not in (None, "") else None
+    except (TypeError, ValueError):
+        latency = None
+    return (action, mutation_signature(mutation), result, detail_signature(detail)), input_name, detail, latency
+
+
+class Bucket:
+    """
+    @note: 버킷 1개의 집계
+    - count                : 케이스 수
+    - first_seq / first_*  : 처음 나온 케이스 (스트림 순번, input, 파일, 원본 detail)
+    - latency              : LatencyHistogram
+    - slowest              : 가장 느린 케이스 (ms, input) 최대 BUCKET_EXAMPLES개 (min-heap)
+    """
+
+    __slots__ = ("count", "first_seq", "first_input", "first_source", "first_detail", "latency", "slowest")
+
+    def __init__(self, seq, input_name, source, detail):
+        self.count = 0
+        self.first_seq = seq
+        self.first_input = input_name
+        self.first_source = source
+        self.first_detail = detail
+        self.latency = LatencyHistogram()
+        self.slowest = []
+
+
+def _push_bounded(heap, item, limit):
+    if len(heap) < limit:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+class TriageReport:
+    """
+    @param max_buckets: 버킷 수 상한 (넘으면 새 키는 모두 OVERFLOW_KEY 버킷 하나로 → 버킷은 최대 max_buckets + 1개)
+    @note: add() / add_group()으로 한 번에 한 행(또는 한 그룹)씩 집계. 행을 보관하지 않음
+    """
+
+    def __init__(self, max_buckets=MAX_BUCKETS):
+        self.max_buckets = max(1, max_buckets)
+        self.buckets = {}
+        self.rows = 0
+        self.overflow_rows = 0
+        self.sources = []
+        self.latency = LatencyHistogram()
+        self.slowest = []          # (ms, -seq, input, key) min-heap
+        self._seq = itertools.count()
+
+    def _bucket(self, key, seq, input_name, source, detail):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= self.max_buckets:
+                key = OVERFLOW_KEY
+                bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = Bucket(seq, input_name, source, detail)
+        return key, bucket, key == OVERFLOW_KEY
+
+    def add(self, key, input_name, detail, latency_ms, source=""):
+        """
+        @param key: (action, mutation, result, signature)
+        @param latency_ms: 지연(ms) 또는 None
+        """
+        seq = next(self._seq)
+        key, bucket, overflow = self._bucket(key, seq, input_name, source, detail)
+        bucket.count += 1
+        self.rows += 1
+        self.overflow_rows += overflow
+        if latency_ms is not None:
+            bucket.latency.record(latency_ms)
+            self.latency.record(latency_ms)
+            _push_bounded(bucket.slowest, (latency_ms, input_name), BUCKET_EXAMPLES)
+            _push_bounded(self.slowest, (latency_ms, -seq, input_name, key), SLOWEST_CASES)
+
+    def add_group(self, key, count, first_offset, input_name, detail, source, hist_counts, latency_sum,
+                  latency_max, slowest):
+        """
+        @param key: 버킷 키
+        @param count: 그룹 행 수
+        @param first_offset: 그룹 첫 행의 청크 내 위치 (청크 시작 순번 기준)
+        @param hist_counts: {버킷 번호: 개수} (stats.bucket_index 기준)
+        @param latency_sum / latency_max: 지연 합계 / 최댓값 (표본이 없으면 0)
+        @param slowest: [(ms, 청크 내 위치, input)] 느린 순
+        @note: pandas 엔진용. 같은 청크의 그룹은 첫 행 순서대로 넣어야 add()와 같은 결과
+        """
+        seq = self._chunk_base + first_offset
+        key, bucket, overflow = self._bucket(key, seq, input_name, source, detail)
+        bucket.count += count
+        self.rows += count
+        if overflow:
+            self.overflow_rows += count
+        samples = sum(hist_counts.values())
+        for hist in (bucket.latency, self.latency):
+            for index, n in hist_counts.items():
+                hist.counts[index] = hist.counts.get(index, 0) + n
+            hist.total += samples
+            hist.sum_ms += latency_sum
+            hist.max_ms = max(hist.max_ms, latency_max)
+        for ms, offset, name in slowest:
+            _push_bounded(bucket.slowest, (ms, name), BUCKET_EXAMPLES)
+            _push_bounded(self.slowest, (ms, -(self._chunk_base + offset), name, key), SLOWEST_CASES)
+
+    def begin_chunk(self, rows):
+        """
+        @param rows: 청크 행 수 (pandas 엔진에서 순번을 청크 단위로 예약)
+        """
+        self._chunk_base = next(self._seq)
+        self._seq = itertools.count(self._chunk_base + rows)
+
+    def by_result(self):
+        """
+        @return: {결과 분류: (케이스 수, LatencyHistogram)}
+        """
+        groups = {}
+        for key, bucket in self.buckets.items():
+            count, hist = groups.get(key[2], (0, None))
+            if hist is None:
+                hist = LatencyHistogram()
+            hist.merge(bucket.latency)
+            groups[key[2]] = (count + bucket.count, hist)
+        return groups
+
+
+def iter_result_rows(path):
+    """
+    @param path: 결과 파일 (CSV / JSONL)
+    @return: 행 dict Generator (깨진 JSONL 줄은 건너뜀)
+    """
+    p = Path(path)
+    with p.open("r", newline="", encoding="utf-8") as f:
+        if is_jsonl_path(p):
+            for line in f:
+                try:
+                    row = codec.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(row, dict):
+                    yield row
+        else:
+            yield from csv.DictReader(f)
+
+
+def analyze_python(report, path):
+    for row in iter_result_rows(path):
+        key, input_name, detail, latency = row_fields(row)
+        report.add(key, input_name, detail, latency, str(path))
+
+
+def bucket_indices(values):
+    """
+    @param values: 0 이상 정수 numpy 배열 (µs)
+    @return: stats.bucket_index()와 같은 버킷 번호 배열
+    """
+    values = values.astype(numpy.int64)
+    exponent = numpy.frexp(values.astype(numpy.float64))[1] - SUB_BUCKET_BITS
+    exponent = numpy.maximum(exponent, 1)
+    mantissa = values >> exponent
+    large = SUB_BUCKET_COUNT + (exponent - 1) * SUB_BUCKET_HALF + (mantissa - SUB_BUCKET_HALF)
+    return numpy.where(values < SUB_BUCKET_COUNT, values, large)
+
+
+def _column(chunk, name):
+    if name in chunk.columns:
+        return chunk[name]
+    return pandas.Series("", index=chunk.index)
+
+
+def analyze_pandas_chunk(report, chunk, source):
+    """
+    @param chunk: 결과 CSV 청크 (모든 컬럼 문자열, 빈 값은 "")
+    @note: 시그니처는 고유 값마다 한 번만 계산. 그룹 번호(첫 등장 순) 하나로
+        카운트/지연 합계·최댓값/히스토그램/느린 케이스를 numpy로 집계
+    """
+    report.begin_chunk(len(chunk))
+    chunk = chunk.reset_index(drop=True)
+    input_name = _column(chunk, "input")
+    result = _column(chunk, "result")
+    action = _column(chunk, "action")
+    mutation = _column(chunk, "mutations")
+    if "steps" in chunk.columns:
+        failed = result != "ok"
+        parts = result[failed].str.split(":", n=1, expand=True).reindex(columns=[0, 1], fill_value="")
+        action = action.where(~failed, parts[0])
+        result = result.where(~failed, parts[1].fillna(""))
+    need = (action == "") | (mutation == "")
+    if need.any():
+        extracted = input_name[need].str.extract(INPUT_NAME_PATTERN).fillna("")
+        action = action.where(~need | (action != ""), extracted[0])
+        mutation = mutation.where(~need | (mutation != ""), extracted[1])
+    fault = _column(chunk, "fault")
+    result = result.where(fault == "", result + " [" + fault + "]")
+    detail = _column(chunk, "detail")
+
+    codes, uniques = pandas.factorize(detail)
+    signature = numpy.array([detail_signature(u) for u in uniques], dtype=object)[codes]
+    codes, uniques = pandas.factorize(mutation)
+    mutation_sig = numpy.array([mutation_signature(u) for u in uniques], dtype=object)[codes]
+    keys = pandas.DataFrame({"action": action.values, "mutation": mutation_sig, "result": result.values,
+                             "signature": signature})
+    group = keys.groupby(list(keys.columns), sort=False).ngroup().values   # 첫 등장 순 번호
+    n_groups = int(group.max()) + 1 if len(group) else 0
+    counts = numpy.bincount(group, minlength=n_groups)
+    _, first_rows = numpy.unique(group, return_index=True)
+
+    latency_column = "parsed_ms" if "parsed_ms" in chunk.columns else "elapsed_ms"
+    latency = pandas.to_numeric(_column(chunk, latency_column), errors="coerce").values
+    sampled = numpy.flatnonzero(~numpy.isnan(latency))
+    values = latency[sampled]
+    sampled_group = group[sampled]
+    sums = numpy.bincount(sampled_group, weights=values, minlength=n_groups)
+    peaks = numpy.zeros(n_groups)
+    numpy.maximum.at(peaks, sampled_group, values)
+    buckets = bucket_indices(numpy.maximum(values, 0.0) * VALUE_UNIT)
+    pairs, pair_counts = numpy.unique((sampled_group.astype(numpy.int64) << 32) | buckets, return_counts=True)
+    hist_by_group = [{} for _ in range(n_groups)]
+    for pair, n in zip(pairs.tolist(), pair_counts.tolist()):
+        hist_by_group[pair >> 32][pair & 0xFFFFFFFF] = n
+
+    # 그룹별 느린 순(같으면 앞 행) 상위 max(BUCKET_EXAMPLES, SLOWEST_CASES)개
+    order = numpy.lexsort((sampled, -values, sampled_group))
+    ordered_group = sampled_group[order]
+    starts = numpy.searchsorted(ordered_group, ordered_group, side="left")
+    keep = order[numpy.arange(len(order)) - starts < max(BUCKET_EXAMPLES, SLOWEST_CASES)]
+    slowest_by_group = [[] for _ in range(n_groups)]
+    names = input_name.values
+    for g, ms, row in zip(sampled_group[keep].tolist(), values[keep].tolist(), sampled[keep].tolist()):
+        slowest_by_group[g].append((ms, row, names[row]))
+
+    key_rows = keys.values
+    details = detail.values
+    for g, row in enumerate(first_rows.tolist()):
+        report.add_group(tuple(key_rows[row]), int(counts[g]), row, names[row], details[row], source,
+                         hist_by_group[g], float(sums[g]), float(peaks[g]), slowest_by_group[g])
+
+
+def analyze_pandas(report, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    if is_jsonl_path(path):
+        analyze_python(report, path)
+        return
+    for chunk in pandas.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+        analyze_pandas_chunk(report, chunk, str(path))
+
+
+def analyze(paths, engine="auto", max_buckets=MAX_BUCKETS, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    @param paths: 결과 파일 경로 리스트 (주어진 순서대로 한 번씩 읽음)
+    @param engine: "auto"(pandas가 있으면 pandas) / "python" / "pandas"
+    @return: (TriageReport, 사용한 엔진 이름)
+    """
+    if engine == "auto":
+        engine = "pandas" if pandas is not None else "python"
+    if engine == "pandas" and pandas is None:
+        raise RuntimeError("--engine pandas requires the 'pandas' and 'numpy' packages")
+    report = TriageReport(max_buckets)
+    for path in paths:
+        report.sources.append(str(path))
+        if engine == "pandas":
+            analyze_pandas(report, path, chunk_rows)
+        else:
+            analyze_python(report, path)
+    return report, engine
+
+
+def _ms(value):
+    return "" if value is None else f"{value:.2f}"
+
+
+def _bucket_row(key, bucket, total):
+    share = 100.0 * bucket.count / total if total else 0.0
+    return [key[0], key[1], key[2], key[3], bucket.count, f"{share:.2f}%",
+            f"{bucket.first_input} ({Path(bucket.first_source).name})",
+            _ms(bucket.latency.percentile(50)), _ms(bucket.latency.percentile(99)),
+            _ms(bucket.latency.max_ms if bucket.latency.total else None)]
+
+
+BUCKET_HEADERS = ["action", "mutation", "result", "signature", "count", "share", "first seen", "p50 ms",
+                  "p99 ms", "max ms"]
+
+
+def report_sections(report, engine, elapsed, top=DEFAULT_TOP, yields=None):
+    """
+    @param yields: operator_yields() 결과 (None이면 여기서 계산)
+    @return: (제목, 설명, 헤더, 행 리스트) 섹션 리스트 (render_markdown / render_html 입력)
+    """
+    if yields is None:
+        yields = operator_yields(report)
+    total = report.rows
+    items = list(report.buckets.items())
+    overall_p50 = report.latency.percentile(50)
+    summary = [
+        ["files", ", ".join(Path(s).name for s in report.sources)],
+        ["rows", total],
+        ["buckets", len(report.buckets)],
+        ["overflow rows", report.overflow_rows],
+        ["engine", engine],
+        ["elapsed", f"{elapsed:.2f}s"],
+        ["latency p50 / p99 / max (ms)", f"{_ms(overall_p50)} / {_ms(report.latency.percentile(99))} / "
+                                         f"{_ms(report.latency.max_ms if report.latency.total else None)}"],
+    ]
+    results = [[name, count, f"{100.0 * count / total:.2f}%" if total else "", _ms(hist.percentile(50)),
+                _ms(hist.percentile(99)), _ms(hist.max_ms if hist.total else None)]
+               for name, (count, hist) in sorted(report.by_result().items(), key=lambda kv: -kv[1][0])]
+
+    by_count = sorted(items, key=lambda kv: (-kv[1].count, kv[1].first_seq))
+    rare = sorted((kv for kv in items if kv[1].count <= RARE_COUNT), key=lambda kv: kv[1].first_seq)
+    faults = sorted((kv for kv in items if "[" in kv[0][2] or kv[0][2].startswith(FAULT_RESULT_PREFIXES)),
+                    key=lambda kv: (-kv[1].count, kv[1].first_seq))
+    outliers = []
+    if overall_p50:
+        outliers = sorted((kv for kv in items if kv[1].latency.total >= OUTLIER_MIN_COUNT
+                           and kv[1].latency.percentile(99) >= OUTLIER_FACTOR * overall_p50),
+                          key=lambda kv: -kv[1].latency.percentile(99))
+    outlier_rows = [_bucket_row(key, bucket, total) + [", ".join(name for _, name in sorted(bucket.slowest,
+                                                                                           reverse=True))]
+                    for key, bucket in outliers[:top]]
+    slowest = [[f"{ms:.2f}", name, key[0], key[2], key[3]]
+               for ms, _, name, key in sorted(report.slowest, reverse=True)]
+    yield_rows = [[op, sends, failures, n_unique, f"{per_1k:.2f}", TUNABLE_OPS.get(op, "")]
+                  for op, sends, failures, n_unique, per_1k in yields[:top]]
+
+    return [
+        ("Summary", "", ["item", "value"], summary),
+        ("Result classes", "", ["result", "count", "share", "p50 ms", "p99 ms", "max ms"], results),
+        (f"Top buckets (by count, top {top})", "", BUCKET_HEADERS,
+         [_bucket_row(k, b, total) for k, b in by_count[:top]]),
+        (f"Faults and transport errors ({len(faults)})", "crash/hang/TIMEOUT/CLOSED/EXC results",
+         BUCKET_HEADERS, [_bucket_row(k, b, total) for k, b in faults[:top]]),
+        (f"Rare buckets ({len(rare)})", f"seen at most {RARE_COUNT} times, in first-seen order",
+         BUCKET_HEADERS, [_bucket_row(k, b, total) for k, b in rare[:top]]),
+        (f"Latency outlier buckets ({len(outliers)})",
+         f"p99 >= {OUTLIER_FACTOR:g} x overall p50, at least {OUTLIER_MIN_COUNT} samples",
+         BUCKET_HEADERS + ["slowest inputs"], outlier_rows),
+        (f"Slowest cases (top {SLOWEST_CASES})", "", ["ms", "input", "action", "result", "signature"], slowest),
+        (f"Mutation operator yield ({len(yields)})",
+         "unique failure buckets (action, result, signature) per 1k sends; a case counts for every operator it applied",
+         ["operator", "sends", "failures", "unique failures", "per 1k sends", "seeds.py"], yield_rows),
+    ]
+
+
+def _md_cell(value):
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def render_markdown(sections, title):
+    lines = [f"# {title}", ""]
+    for name, note, headers, rows in sections:
+        lines += [f"## {name}", ""]
+        if note:
+            lines += [f"_{note}_", ""]
+        if not rows:
+            lines += ["(none)", ""]
+            continue
+        lines.append("| " + " | ".join(headers) + " |")
+        lines.append("|" + "---|" * len(headers))
+        lines += ["| " + " | ".join(_md_cell(v) for v in row) + " |" for row in rows]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def render_html(sections, title):
+    parts = [f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>",
+             "<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:1em}"
+             "td,th{border:1px solid #ccc;padding:2px 6px;font-size:13px;text-align:left}</style>",
+             f"</head><body><h1>{html.escape(title)}</h1>"]
+    for name, note, headers, rows in sections:
+        parts.append(f"<h2>{html.escape(name)}</h2>")
+        if note:
+            parts.append(f"<p><i>{html.escape(note)}</i></p>")
+        if not rows:
+            parts.append("<p>(none)</p>")
+            continue
+        parts.append("<table><tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in headers) + "</tr>")
+        parts += ["<tr>" + "".join(f"<td>{html.escape(str(v))}</td>" for v in row) + "</tr>" for row in rows]
+        parts.append("</table>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def main():
+    """
+    @note:
+    - inputs : sender / scenario 결과 파일 (CSV / JSONL, 여러 개 가능)
+    - --report : 리포트 경로 (.html 이면 HTML, 그 외 Markdown)
+    - --top : 표별 최대 행 수
+    - --engine : auto / python / pandas (pandas: CSV 청크 벡터화 집계)
+    - --max-buckets : 버킷 수 상한 (메모리 상한, 넘은 키는 모두 <other> 버킷 하나로)
+    - --tune-out : 연산자별 수율로 조정한 seeds.py 변형 확률을 JSON으로 저장 (generator / sender --tuning 입력)
+    - --tuning : 조정 기준 확률 파일 (결과를 만든 실행의 --tuning, 기본: seeds.py 값)
+    - 버킷 키: (action, mutation, result, signature)
+      action은 action 컬럼 또는 input 이름, mutation은 mutations 컬럼(연산 이름만) 또는 케이스 종류,
+      signature는 detail(CallError 원인)에서 값/ID/숫자를 지운 문자열
+    """
+    parser = argparse.ArgumentParser(description="Bucket OCPP fuzzing results and write a triage report.")
+    parser.add_argument("inputs", nargs="+", help="결과 파일 (CSV / JSONL)")
+    parser.add_argument("--report", default=REPORT_DEFAULT_PATH, help="리포트 경로 (.html 이면 HTML)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="표별 최대 행 수")
+    parser.add_argument("--engine", choices=ENGINES, default="auto", help="집계 엔진 (기본: auto)")
+    parser.add_argument("--max-buckets", type=int, default=MAX_BUCKETS, help="버킷 수 상한 (넘으면 새 버킷은 모두 <other> 하나로)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="pandas 엔진 청크 행 수")
+    parser.add_argument("--tune-out", default=None, help="조정한 변형 확률 JSON 저장 경로")
+    parser.add_argument("--tuning", default=None, help="조정 기준 확률 파일 (기본: seeds.py 값)")
+    args = parser.parse_args()
+    if args.tuning:
+        try:
+            apply_tuning(load_tuning(args.tuning))
+        except (OSError, ValueError) as e:
+            parser.error(f"--tuning: {e}")
+
+    started = time.monotonic()
+    try:
+        report, engine = analyze(args.inputs, args.engine, args.max_buckets, args.chunk_rows)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    yields = operator_yields(report)
+    sections = report_sections(report, engine, time.monotonic() - started, args.top, yields)
+    title = "OCPP fuzzing triage report"
+    render = render_html if args.report.lower().endswith((".html", ".htm")) else render_markdown
+    Path(args.report).write_text(render(sections, title), encoding="utf-8")
+    print(f"{report.rows} rows -> {len(report.buckets)} buckets ({engine}, "
+          f"{time.monotonic() - started:.2f}s): {args.report}")
+    if args.tune_out:
+        tuned = tune_probabilities(yields)
+        save_tuning(args.tune_out, tuned)
+        print(f"tuned probabilities -> {args.tune_out}: "
+              + ", ".join(f"{name}={value:g}" for name, value in sorted(tuned.items())))
+
+
+if __name__ == "__main__":
+    main()
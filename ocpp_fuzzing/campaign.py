@@ -0,0 +1,331 @@
+# campaign.py
+# 전송률 제한 + 시간/메시지 예산 + 적응형 감속 캠페인 실행기 (공유 스테이징 CSMS 대상)
+# - 토큰 버킷: 전체(--rate)와 연결별(--rate-per-connection) 전송률 상한. 전송(재전송 포함) 1건 = 토큰 1개
+# - 예산: --duration(초) 또는 --max-messages 중 먼저 도달하면 새 입력 분배를 멈춤
+#   --duration 은 전송 직전에도 확인 → 이미 세션 큐에 들어간 케이스도 마감 후에는 보내지 않고 NOT_SENT로 기록
+#   (마감 시점에 응답을 기다리던 요청만 --timeout 안에서 마저 받음)
+# - 적응형 감속(AIMD): CONTROL_INTERVAL_SEC마다 구간의 응답 p99와 TIMEOUT 비율을 확인해
+#   임계값을 넘으면 전송률을 BACKOFF_FACTOR배로 낮추고, 정상이면 목표의 RECOVERY_STEP씩 다시 올림
+#   → 서버를 넘어뜨리지 않으면서 허용된 용량까지 채움
+#   (헤더가 깨진 프레임처럼 원래 응답이 없는 케이스의 TIMEOUT은 과부하 신호에서 제외)
+# - 전송/결과 기록은 sender.py의 ReplaySession을 그대로 사용 (결과 컬럼 동일)
+
+import argparse
+import asyncio
+import time
+
+from . import codec
+from .results import NOT_SENT_RESULT, ResultWriter, RESULT_FIELDS
+from .sender import (DEFAULT_CONNECTIONS, DEFAULT_INFLIGHT, DEFAULT_SUBPROTOCOLS, DEFAULT_URI, DEFAULT_WINDOW,
+                     DETAIL_FIELDS, FAULT_FIELDS, HANG_RESULT, MUTATION_FIELDS, RECONNECT_MAX_TRIES, RECV_TIMEOUT_SEC,
+                     TIMING_FIELDS, ReplaySession, all_sessions_dead, build_session_uri, dispatch_inputs,
+                     is_connection_failure, iter_input_records)
+from .stats import LatencyHistogram, LatencyReport
+from .template import iter_generated_records
+
+CSV_DEFAULT_PATH = "campaign_result.csv"
+DEFAULT_BURST_SEC = 0.2           # 버킷 크기 = 전송률 × 이 시간 (최소 토큰 1개)
+CONTROL_INTERVAL_SEC = 1.0        # 감속 판단 주기
+CONTROL_MIN_SAMPLES = 20          # 구간 결과가 이보다 적으면 판단을 미루고 다음 구간에 합산
+STATUS_EVERY = 5                  # 상태 줄 출력 주기 (판단 주기 단위, 전송률이 바뀌면 즉시 출력)
+DEFAULT_MAX_P99_MS = 1000.0       # 구간 응답 p99 상한 (ms)
+DEFAULT_MAX_TIMEOUT_RATE = 0.02   # 구간 무응답(TIMEOUT/HANG/연결 끊김·실패) 비율 상한
+BACKOFF_FACTOR = 0.5              # 임계값 초과 시 전송률 배율
+RECOVERY_STEP = 0.1               # 정상 구간마다 목표 전송률 대비 회복 비율
+MIN_RATE_FRACTION = 0.02          # 목표 대비 최저 전송률 (0이 되어 멈추지 않도록)
+TIMEOUT_RESULTS = ("TIMEOUT", HANG_RESULT)
+
+
+def is_overload_result(result_class):
+    """
+    @param result_class: 결과 분류
+    @return: 서버 과부하 신호인지 (TIMEOUT/HANG 또는 CLOSED:<code> / EXC:<msg> 연결 끊김·연결 실패)
+    @note: 과부하로 서버가 연결을 끊기 시작하면 TIMEOUT 대신 연결 장애가 늘어나므로 함께 셈
+    """
+    return result_class in TIMEOUT_RESULTS or is_connection_failure(result_class)
+
+
+def expects_reply(frame):
+    """
+    @param frame: 입력 프레임
+    @return: 정상 서버라면 반드시 응답해야 하는 CALL 형식인지 ([2, "<id>", "<Action>", {...}])
+    @note: 메시지 타입/uniqueId가 깨진 프레임은 서버가 응답하지 않는 게 정상이므로 부하 판단에서 제외
+    """
+    return (isinstance(frame, list) and len(frame) == 4 and type(frame[0]) is int and frame[0] == 2
+            and isinstance(frame[1], str) and isinstance(frame[2], str) and isinstance(frame[3], dict))
+
+
+class TokenBucket:
+    """
+    @param rate: 초당 토큰 수 (전송률)
+    @param burst_sec: 버킷 크기를 정하는 시간 (rate × burst_sec, 최소 1)
+    @note: acquire()는 토큰이 생길 때까지 대기. 대기 순서는 lock으로 도착 순서 유지
+    """
+
+    def __init__(self, rate, burst_sec=DEFAULT_BURST_SEC):
+        self.burst_sec = burst_sec
+        self.rate = 0.0
+        self.capacity = 1.0
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.set_rate(rate)
+        self.tokens = self.capacity
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        """
+        @param rate: 새 전송률 (대기 중인 acquire()에도 다음 확인부터 반영)
+        """
+        self._refill(time.monotonic())
+        self.rate = float(rate)
+        self.capacity = max(1.0, self.rate * self.burst_sec)
+        self.tokens = min(self.tokens, self.capacity)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill(time.monotonic())
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class AdaptiveThrottle:
+    """
+    @param buckets: [(TokenBucket, 목표 전송률)] - 같은 배율로 함께 조정
+    @param max_p99_ms: 구간 응답 p99 상한
+    @param max_timeout_rate: 구간 무응답 비율 상한 (is_overload_result() 기준)
+    @param adaptive: False면 집계만 하고 전송률은 고정
+    @note: record()를 ReplaySession.on_result로 연결하고, 입력은 track()을 거쳐 분배.
+        scale = 현재 전송률 / 목표 전송률
+    """
+
+    def __init__(self, buckets, max_p99_ms=DEFAULT_MAX_P99_MS, max_timeout_rate=DEFAULT_MAX_TIMEOUT_RATE,
+                 adaptive=True):
+        self.buckets = buckets
+        self.max_p99_ms = max_p99_ms
+        self.max_timeout_rate = max_timeout_rate
+        self.adaptive = adaptive
+        self.scale = 1.0
+        self.min_scale = 1.0
+        self.backoffs = 0
+        self.total = 0
+        self.not_sent = 0           # 시간 예산이 끝나 보내지 않은 케이스 수 (NOT_SENT)
+        self.no_reply = set()       # 응답을 기대하지 않는 케이스 순번 (결과가 오면 제거)
+        self._reset_window()
+
+    def _reset_window(self):
+        self.window = LatencyHistogram()
+        self.samples = 0
+        self.timeouts = 0
+
+    def track(self, records):
+        """
+        @param records: (display_path, parsed, trace[, raw]) 이터러블 (dispatch_inputs에 바로 넘기는 입력)
+        @return: 같은 입력 Generator. 응답을 기대하지 않는 케이스의 순번을 기억
+        @note: 순번은 dispatch_inputs가 붙이는 index와 같음 (--resume 건너뛰기 없음).
+            parsed가 None인 raw 레코드(--generate)는 판단용으로만 파싱 (전송은 raw 바이트 그대로)
+        """
+        for index, record in enumerate(records):
+            frame = record[1]
+            if frame is None and len(record) > 3:
+                try:
+                    frame = codec.loads(bytes(record[3]))
+                except ValueError:
+                    frame = None
+            if not expects_reply(frame):
+                self.no_reply.add(index)
+            yield record
+
+    def record(self, index, result_class, latency_ms):
+        """
+        @note: ReplaySession.on_result 형식 (index, 결과 분류, parsed_ms)
+        """
+        if result_class == NOT_SENT_RESULT:
+            self.not_sent += 1
+            self.no_reply.discard(index)
+            return
+        self.total += 1
+        if index in self.no_reply:
+            self.no_reply.discard(index)
+            return
+        self.samples += 1
+        if is_overload_result(result_class):
+            self.timeouts += 1
+        else:
+            self.window.record(latency_ms)
+
+    def evaluate(self):
+        """
+        @return: (p99 ms, 무응답 비율, 과부하 여부), 표본이 부족하면 None
+        @note: 판단한 구간은 비우고 다음 구간을 새로 집계
+        """
+        if self.samples < CONTROL_MIN_SAMPLES:
+            return None
+        p99 = self.window.percentile(99)
+        timeout_rate = self.timeouts / self.samples
+        overloaded = (p99 is not None and p99 > self.max_p99_ms) or timeout_rate > self.max_timeout_rate
+        if self.adaptive:
+            if overloaded:
+                self.scale = max(MIN_RATE_FRACTION, self.scale * BACKOFF_FACTOR)
+                self.backoffs += 1
+            elif self.scale < 1.0:
+                self.scale = min(1.0, self.scale + RECOVERY_STEP)
+            self.min_scale = min(self.min_scale, self.scale)
+            for bucket, target in self.buckets:
+                bucket.set_rate(target * self.scale)
+        self._reset_window()
+        return p99, timeout_rate, overloaded
+
+    async def run(self, started, interval=CONTROL_INTERVAL_SEC):
+        """
+        @param started: 캠페인 시작 시각 (time.monotonic())
+        @note: 취소될 때까지 interval마다 evaluate()하고 상태 줄 출력
+        """
+        ticks = 0
+        while True:
+            await asyncio.sleep(interval)
+            ticks += 1
+            scale = self.scale
+            decision = self.evaluate()
+            if decision is None or (self.scale == scale and ticks % STATUS_EVERY):
+                continue
+            p99, timeout_rate, overloaded = decision
+            elapsed = time.monotonic() - started
+            rates = ", ".join(f"{bucket.rate:.1f}/s" for bucket, _ in self.buckets)
+            p99_text = f"{p99:.1f}ms" if p99 is not None else "-"
+            state = "overloaded" if overloaded else "ok"
+            print(f"[CAMPAIGN] {elapsed:7.1f}s sent {self.total} ({self.total / elapsed:.1f}/s) rate {rates} "
+                  f"p99 {p99_text} no-reply {100.0 * timeout_rate:.1f}% {state}")
+
+
+def iter_budgeted(records, max_messages=None, deadline=None):
+    """
+    @param records: (display_path, parsed, trace) 이터러블
+    @param max_messages: 최대 전송 수 (None: 제한 없음)
+    @param deadline: 입력 분배를 멈출 time.monotonic() 시각 (None: 제한 없음)
+    @return: 예산 안의 입력만 내보내는 Generator (지연 평가 유지)
+    """
+    for count, record in enumerate(records):
+        if max_messages is not None and count >= max_messages:
+            return
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+        yield record
+
+
+async def main():
+    """
+    @note:
+    - --input / --generate : 입력 (sender와 같음, 둘 중 하나)
+    - --rate : 전체 목표 전송률 (msgs/sec)
+    - --rate-per-connection : 연결별 목표 전송률 (msgs/sec)
+    - --duration / --max-messages : 시간(초) / 메시지 예산. 먼저 도달한 쪽에서 멈춤
+    - --max-p99-ms / --max-timeout-rate : 감속 임계값 (구간 응답 p99, TIMEOUT/HANG/연결 끊김·실패 비율)
+    - --fixed-rate : 적응형 감속 끄기 (목표 전송률 고정)
+    - 나머지 옵션(--uri, --connections, --window 등)과 결과 컬럼은 sender.py와 같음
+    """
+    parser = argparse.ArgumentParser(description="Rate-limited, time-budgeted OCPP fuzzing campaign.")
+    parser.add_argument("--input", help="JSON 파일/JSONL/디렉터리 경로")
+    parser.add_argument("--generate", type=int, default=None, help="입력 대신 템플릿 splice로 N개 케이스 즉석 생성")
+    parser.add_argument("--seed", type=int, default=None, help="--generate 재현성용 난수 시드")
+    parser.add_argument("--rate", type=float, default=None, help="전체 목표 전송률 (msgs/sec)")
+    parser.add_argument("--rate-per-connection", type=float, default=None, help="연결별 목표 전송률 (msgs/sec)")
+    parser.add_argument("--duration", type=float, default=None, help="시간 예산 (초)")
+    parser.add_argument("--max-messages", type=int, default=None, help="메시지 예산 (전송 케이스 수)")
+    parser.add_argument("--max-p99-ms", type=float, default=DEFAULT_MAX_P99_MS,
+                        help="감속 임계값: 구간 응답 p99 (ms, 기본: 1000)")
+    parser.add_argument("--max-timeout-rate", type=float, default=DEFAULT_MAX_TIMEOUT_RATE,
+                        help="감속 임계값: 구간 TIMEOUT/HANG/연결 끊김·실패 비율 (기본: 0.02)")
+    parser.add_argument("--fixed-rate", action="store_true", help="적응형 감속 끄기")
+    parser.add_argument("--replace-uid", action="store_true", help="uniqueId를 실행 시 새 uuid4로 교체")
+    parser.add_argument("--csv", default=CSV_DEFAULT_PATH, help="결과 CSV 경로 (.jsonl 이면 JSONL)")
+    parser.add_argument("--uri", default=DEFAULT_URI, help="WebSocket 서버 URI")
+    parser.add_argument("--subp", nargs="*", default=DEFAULT_SUBPROTOCOLS, help="WebSocket subprotocols")
+    parser.add_argument("--timeout", type=int, default=RECV_TIMEOUT_SEC, help="서버 응답 타임아웃(초)")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS, help="동시 WebSocket 세션 수")
+    parser.add_argument("--inflight", type=int, default=DEFAULT_INFLIGHT, help="세션별 대기 큐 길이")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="세션별 동시 응답 대기 요청 수")
+    args = parser.parse_args()
+    if (args.input is None) == (args.generate is None):
+        parser.error("exactly one of --input or --generate is required")
+    if args.rate is None and args.rate_per_connection is None:
+        parser.error("at least one of --rate or --rate-per-connection is required")
+    if any(r is not None and r <= 0 for r in (args.rate, args.rate_per_connection)):
+        parser.error("rates must be positive")
+
+    if args.generate is not None:
+        records = iter_generated_records(args.generate, seed=args.seed)
+    else:
+        records = iter_input_records(args.input)
+
+    n_sessions = max(1, args.connections)
+    buckets = []
+    global_bucket = None
+    if args.rate is not None:
+        global_bucket = TokenBucket(args.rate)
+        buckets.append((global_bucket, args.rate))
+    sessions = [
+        ReplaySession(i, build_session_uri(args.uri, i, n_sessions),
+                      args.subp, args.timeout, args.inflight, args.window)
+        for i in range(n_sessions)
+    ]
+    throttle = AdaptiveThrottle(buckets, args.max_p99_ms, args.max_timeout_rate, adaptive=not args.fixed_rate)
+    latency = LatencyReport()
+    clock_origin = time.monotonic()
+    deadline = clock_origin + args.duration if args.duration is not None else None
+    for session in sessions:
+        limiters = []
+        if args.rate_per_connection is not None:
+            bucket = TokenBucket(args.rate_per_connection)
+            buckets.append((bucket, args.rate_per_connection))
+            limiters.append(bucket)
+        if global_bucket is not None:
+            limiters.append(global_bucket)     # 연결별 토큰을 먼저 받아 전체 토큰을 쥔 채 기다리지 않도록
+        session.limiters = tuple(limiters)
+        session.latency = latency
+        session.clock_origin = clock_origin
+        session.on_result = throttle.record
+        session.deadline = deadline
+
+    sink = ResultWriter(args.csv, RESULT_FIELDS + TIMING_FIELDS + FAULT_FIELDS + DETAIL_FIELDS + MUTATION_FIELDS)
+    control = asyncio.create_task(throttle.run(clock_origin))
+    try:
+        workers = [asyncio.create_task(s.run(sink, args.replace_uid)) for s in sessions]
+        sent, _ = await dispatch_inputs(throttle.track(iter_budgeted(records, args.max_messages, deadline)),
+                                        sessions)
+        await asyncio.gather(*workers)
+    finally:
+        control.cancel()
+        sink.close()
+
+    elapsed = time.monotonic() - clock_origin
+    if all_sessions_dead(sessions):
+        raise SystemExit(f"aborted: cannot connect to {args.uri} ({RECONNECT_MAX_TRIES} tries per session)")
+    if sent == 0:
+        print("campaign: budget is zero, nothing sent" if args.duration == 0 or args.max_messages == 0
+              else "No input JSON found.")
+        return
+    targets = []
+    if args.rate is not None:
+        targets.append(f"{args.rate:g}/s total")
+    if args.rate_per_connection is not None:
+        targets.append(f"{args.rate_per_connection:g}/s per connection")
+    print(latency.format())
+    sent -= throttle.not_sent
+    print(f"campaign: sent {sent} in {elapsed:.1f}s ({sent / elapsed:.1f}/s, target {', '.join(targets)}), "
+          f"backoffs {throttle.backoffs}, lowest rate {100.0 * throttle.min_scale:.0f}% of target, "
+          f"reconnects {sum(s.reconnects for s in sessions)}")
+    if throttle.not_sent:
+        print(f"campaign: duration budget reached, {throttle.not_sent} queued cases not sent "
+              f"(recorded as {NOT_SENT_RESULT})")
+    print(f"wrote CSV: {args.csv}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,179 @@
+# codec.py
+# JSON 인코딩/디코딩 단일 진입점 (sender / generator·corpus / server 공용)
+# - 백엔드: orjson → msgspec → 표준 json 순으로 설치된 것을 사용
+#   (환경변수 OCPP_FUZZING_JSON=stdlib|orjson|msgspec 또는 set_backend()로 강제)
+# - 결과는 항상 표준 json과 같아야 함 (퍼저가 일부러 만드는 비정상 입력 포함)
+#   빠른 백엔드가 다르게 처리할 수 있는 입력은 미리 걸러 표준 json으로 처리:
+#     디코드 - NaN/Infinity, 19자리 이상 정수(빠른 백엔드는 float로 바꿈), 서로게이트 \u 이스케이프,
+#              깊은 중첩(표준 json은 RecursionError), BOM/UTF-16 등 → 빠른 백엔드 오류 시 표준 json 재시도
+#     인코드 - 지수 표기/아주 작은 float, NaN(빠른 백엔드는 null), 64비트 초과 정수, 비문자열 키,
+#              ensure_ascii 요청 시 비ASCII 출력 → 표준 json으로 다시 인코딩
+# - 오류도 표준 json과 같은 예외(json.JSONDecodeError 등)로 올라옴
+
+import json
+import os
+import re
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # 선택 의존성
+    msgspec = None
+
+BACKENDS = ["orjson", "msgspec", "stdlib"]
+BACKEND_ENV = "OCPP_FUZZING_JSON"
+MAX_FAST_CONTAINERS = 256      # '['+'{' 개수가 이보다 많으면 표준 json (재귀 한도 동작 유지)
+
+# 디코드 시 표준 json으로 보낼 패턴: 긴 정수, 서로게이트 이스케이프, NaN/Infinity 리터럴
+# (orjson은 긴 정수 외에는 스스로 오류를 내므로 긴 정수만 확인, msgspec은 전체 패턴 확인)
+_DECODE_UNSAFE = re.compile(rb"\d{19}|\\u[dD][89a-fA-F]|NaN|Infinity")
+# 인코드 결과에서 문자열을 지운 뒤 찾을 패턴: 지수 표기, 1e-4 미만 소수, null(NaN일 수 있음)
+_JSON_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"')
+_ENCODE_UNSAFE = re.compile(rb"\de|\dE|0\.0000|null")
+
+# 정규식보다 빠른 1차 검사용 변환표: 숫자 → "0", e/E → "e", "." 은 그대로, 나머지 → " "
+# (변환 후 부분 문자열 검색만 하므로 짧은 프레임에서도 빠른 백엔드 이득이 남음)
+_DIGIT_TABLE = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+_NUMBER_TABLE = bytes(0x30 if 0x30 <= i <= 0x39 else 0x65 if i in (0x45, 0x65) else 0x2E if i == 0x2E else 0x20
+                      for i in range(256))
+_LONG_DIGITS = b"0" * 19
+
+
+def available_backends():
+    """
+    @return: 설치된 백엔드 이름 (빠른 순)
+    """
+    return [name for name, module in (("orjson", orjson), ("msgspec", msgspec)) if module is not None] + ["stdlib"]
+
+
+BACKEND = None
+_fast_loads = None
+_fast_dumps = None
+
+
+def set_backend(name=None):
+    """
+    @param name: "orjson" / "msgspec" / "stdlib" / None(설치된 것 중 가장 빠른 것)
+    @return: 적용된 백엔드 이름
+    """
+    global BACKEND, _fast_loads, _fast_dumps
+    name = name or os.environ.get(BACKEND_ENV) or available_backends()[0]
+    if name not in available_backends():
+        raise RuntimeError(f"JSON backend '{name}' is not installed (available: {', '.join(available_backends())})")
+
+    if name == "orjson":
+        passthrough = (orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME
+                       | orjson.OPT_PASSTHROUGH_SUBCLASS)
+
+        def _fast_dumps(obj, sort_keys):
+            option = passthrough | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+            return orjson.dumps(obj, default=_reject, option=option)
+        _fast_loads = orjson.loads
+    elif name == "msgspec":
+        encoder = msgspec.json.Encoder(enc_hook=_reject)
+        sorted_encoder = msgspec.json.Encoder(enc_hook=_reject, order="sorted")
+
+        def _fast_dumps(obj, sort_keys):
+            if not _is_plain(obj):
+                raise TypeError("non-JSON type")
+            return (sorted_encoder if sort_keys else encoder).encode(obj)
+        _fast_loads = msgspec.json.decode
+    else:
+        _fast_loads = None
+        _fast_dumps = None
+    BACKEND = name
+    return name
+
+
+def _reject(obj):
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _is_plain(obj):
+    # msgspec은 datetime/UUID/dataclass 등을 직접 직렬화하므로 표준 json과 맞추기 위해 타입 확인
+    kind = type(obj)
+    if kind is dict:
+        return all(type(k) is str and _is_plain(v) for k, v in obj.items())
+    if kind is list or kind is tuple:
+        return all(_is_plain(v) for v in obj)
+    return kind in (str, int, float, bool) or obj is None
+
+
+def _fast_decode_input(data):
+    """
+    @return: 빠른 백엔드에 넘길 바이트 (표준 json으로 처리해야 하면 None)
+    """
+    if isinstance(data, str):
+        try:
+            data = data.encode("utf-8")
+        except UnicodeEncodeError:  # 짝 없는 서로게이트 문자
+            return None
+    elif not isinstance(data, bytes):
+        return None
+    if data.count(b"[") + data.count(b"{") > MAX_FAST_CONTAINERS:
+        return None
+    if _LONG_DIGITS in data.translate(_DIGIT_TABLE):
+        return None
+    if BACKEND != "orjson" and _DECODE_UNSAFE.search(data) is not None:
+        return None
+    return data
+
+
+def _fast_encode_ok(out):
+    # 1차 검사(변환표)에 걸린 경우만 문자열을 지우고 정규식으로 다시 확인
+    numbers = out.translate(_NUMBER_TABLE)
+    if b"0e" not in numbers and b"0.0000" not in numbers and b"null" not in out:
+        return True
+    return _ENCODE_UNSAFE.search(_JSON_STRING.sub(b"", out)) is None
+
+
+def loads(data):
+    """
+    @param data: JSON 문자열 또는 바이트
+    @return: 파싱 결과 (json.loads()와 동일)
+    @note: 빠른 백엔드가 거부한 입력은 표준 json으로 다시 파싱해 같은 결과/예외를 냄
+    """
+    if _fast_loads is not None:
+        fast_input = _fast_decode_input(data)
+        if fast_input is not None:
+            try:
+                return _fast_loads(fast_input)
+            except Exception:
+                pass
+    return json.loads(data)
+
+
+def dumps(obj):
+    """
+    @param obj: JSON 객체
+    @return: json.dumps(obj)와 같은 문자열 (sender 전송 형식)
+    @note: 기본 구분자(", " / ": ")와 ASCII 이스케이프는 빠른 백엔드로 재현할 수 없어 항상 표준 json.
+        전송 바이트를 기존과 똑같이 유지하기 위함
+    """
+    return json.dumps(obj)
+
+
+def dumps_compact(obj, ensure_ascii=False, sort_keys=False, default=None):
+    """
+    @param obj: JSON 객체
+    @param ensure_ascii / sort_keys / default: json.dumps()와 같은 의미
+    @return: json.dumps(obj, separators=(",", ":"), ...).encode("utf-8") 과 같은 바이트
+    """
+    if _fast_dumps is not None:
+        try:
+            out = _fast_dumps(obj, sort_keys)
+        except Exception:
+            out = None
+        # ensure_ascii: 표준 json은 DEL(0x7f)도 \u007f 로 이스케이프하지만 orjson은 그대로 둠 → 표준 경로로
+        if out is not None and (not ensure_ascii or (out.isascii() and b"\x7f" not in out)) \
+                and _fast_encode_ok(out):
+            return out
+    return json.dumps(obj, ensure_ascii=ensure_ascii, sort_keys=sort_keys, default=default,
+                      separators=(",", ":")).encode("utf-8")
+
+
+set_backend()
@@ -0,0 +1,182 @@
+# corpus.py
+# 묶음(JSONL / shard) 코퍼스 입출력
+# - 케이스 1건 = compact JSON 한 줄
+# - shard 파일: shard_00000.jsonl[.gz|.zst] (압축은 선택)
+# - index.csv : case_id, shard, offset, length, action, kind, mutations
+#   (offset/length는 압축 해제된 스트림 기준 바이트 위치, mutations는 변형 trace - provenance.py)
+# - provenance.csv : json 형식(케이스별 파일) 코퍼스의 case_id별 변형 trace (index.csv 대신)
+
+import csv
+import gzip
+import io
+from pathlib import Path
+
+from . import codec
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성: zstd 압축을 쓸 때만 필요
+    zstandard = None
+
+INDEX_FILE_NAME = "index.csv"
+INDEX_FIELDS = ["case_id", "shard", "offset", "length", "action", "kind", "mutations"]
+PROVENANCE_FILE_NAME = "provenance.csv"
+PROVENANCE_FIELDS = ["case_id", "action", "kind", "mutations"]
+JSONL_FILE_NAME = "corpus.jsonl"
+COMPRESS_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def encode_case(frame):
+    """
+    @param frame: OCPP 프레임 또는 이미 직렬화된 프레임 바이트 (template splice 결과)
+    @return: 개행을 포함한 compact JSON 한 줄 (bytes)
+    """
+    if isinstance(frame, bytes):
+        return frame + b"\n"
+    return codec.dumps_compact(frame) + b"\n"
+
+
+def shard_file_name(shard_no, compress=None):
+    """
+    @param shard_no: shard 번호
+    @param compress: None / "gzip" / "zstd"
+    @return: shard 파일 이름 (예: shard_00003.jsonl.gz)
+    """
+    return f"shard_{shard_no:05d}.jsonl{COMPRESS_SUFFIXES[compress]}"
+
+
+def is_corpus_file(path):
+    """
+    @param path: 파일 경로
+    @return: JSONL/shard 파일 여부 (.jsonl, .jsonl.gz, .jsonl.zst)
+    """
+    name = Path(path).name.lower()
+    return name.endswith(".jsonl") or name.endswith(".jsonl.gz") or name.endswith(".jsonl.zst")
+
+
+def open_shard_write(path, compress=None):
+    """
+    @param path: 출력 경로
+    @param compress: None / "gzip" / "zstd"
+    @return: 바이너리 쓰기 파일 객체
+    """
+    if compress == "gzip":
+        return gzip.open(path, "wb")
+    if compress == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+    return open(path, "wb")
+
+
+def open_shard_read(path):
+    """
+    @param path: shard 경로 (확장자로 압축 형식 판단)
+    @return: 압축 해제된 바이너리 읽기 스트림
+    """
+    name = str(path).lower()
+    if name.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("reading .zst shards requires the 'zstandard' package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+
+class ShardWriter:
+    """
+    @param path: shard 파일 경로
+    @param compress: None / "gzip" / "zstd"
+    @note: 케이스를 한 줄씩 기록하며 index 행(offset/length 포함)을 만들어 둠
+    """
+
+    def __init__(self, path, compress=None):
+        self.path = Path(path)
+        self.file = open_shard_write(self.path, compress)
+        self.offset = 0
+        self.index_rows = []
+
+    def write(self, case_id, action, kind, frame, mutations=""):
+        line = encode_case(frame)
+        self.file.write(line)
+        self.index_rows.append([case_id, self.path.name, self.offset, len(line), action, kind, mutations])
+        self.offset += len(line)
+
+    def close(self):
+        self.file.close()
+        return self.index_rows
+
+
+def write_index(directory, rows, append=False, name=INDEX_FILE_NAME, fields=INDEX_FIELDS):
+    """
+    @param directory: 코퍼스 디렉터리
+    @param rows: fields 순서의 행들
+    @param append: 기존 index 뒤에 이어 쓰기
+    @param name / fields: 파일 이름과 컬럼 (기본: index.csv, json 형식의 trace는 provenance.csv)
+    """
+    path = Path(directory) / name
+    with path.open("a" if append else "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if not append:
+            writer.writerow(fields)
+        writer.writerows(rows)
+
+
+def load_provenance(directory):
+    """
+    @param directory: json 형식 코퍼스 디렉터리
+    @return: {case_id: 변형 trace} (provenance.csv가 없으면 빈 dict)
+    """
+    path = Path(directory) / PROVENANCE_FILE_NAME
+    if not path.exists():
+        return {}
+    with path.open("r", newline="", encoding="utf-8") as f:
+        return {row["case_id"]: row.get("mutations") or "" for row in csv.DictReader(f)}
+
+
+def iter_index(directory):
+    """
+    @param directory: 코퍼스 디렉터리
+    @return: index.csv 행(dict)을 순서대로 생성하는 Generator
+    """
+    with (Path(directory) / INDEX_FILE_NAME).open("r", newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def iter_shard_file(path):
+    """
+    @param path: JSONL/shard 파일 경로 (압축 가능)
+    @return: ("파일명:라인번호" Path, parsed JSON) 튜플 Generator
+    """
+    p = Path(path)
+    with open_shard_read(p) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            yield Path(f"{p.name}:{line_no}"), codec.loads(line)
+
+
+def iter_corpus_records(directory):
+    """
+    @param directory: index.csv가 있는 코퍼스 디렉터리
+    @return: (case_id Path, parsed JSON, 변형 trace) 튜플 Generator
+    @note: index 순서대로 shard를 처음부터 끝까지 순차 스트리밍 (전체 로딩 없음)
+        mutations 컬럼이 없는 이전 index는 trace를 빈 문자열로 반환
+    """
+    directory = Path(directory)
+    current_name = None
+    current_file = None
+    try:
+        for row in iter_index(directory):
+            if row["shard"] != current_name:
+                if current_file is not None:
+                    current_file.close()
+                current_name = row["shard"]
+                current_file = open_shard_read(directory / current_name)
+            line = current_file.readline()
+            yield Path(row["case_id"]), codec.loads(line), row.get("mutations") or ""
+    finally:
+        if current_file is not None:
+            current_file.close()
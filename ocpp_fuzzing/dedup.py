@@ -0,0 +1,122 @@
+# dedup.py
+# 생성 변형 중복 제거 인덱스
+# - 프레임의 정규화(canonical) 해시를 Bloom filter에 기록 (메모리 상한 고정)
+# - 중복이면 호출 측에서 재생성(re-roll)하거나 건너뜀
+# - 액션별 검사/중복 횟수를 모아 hit ratio 요약
+
+import hashlib
+import math
+
+from . import codec
+
+DEFAULT_CAPACITY = 1_000_000   # 예상 최대 원소 수
+DEFAULT_ERROR_RATE = 0.001     # 목표 오탐률 (이 값 기준으로 비트 수/해시 수 결정)
+MAX_REROLLS = 8                # 중복일 때 재생성 시도 횟수
+MAX_STALLED_CASES = 1000       # 재생성해도 중복인 케이스가 연속으로 이만큼 나오면 생성 중단 (변형 공간 소진)
+
+
+def canonical_hash(frame):
+    """
+    @param frame: OCPP 프레임 (객체) 또는 직렬화된 프레임 바이트
+    @return: 16바이트 digest
+    @note: 객체는 키 정렬 compact JSON으로 정규화 후 해시.
+        바이트(template splice 결과)는 이미 compact 형식이므로 그대로 해시
+    """
+    if isinstance(frame, bytes):
+        data = frame
+    else:
+        data = codec.dumps_compact(frame, sort_keys=True, default=repr)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class BloomFilter:
+    """
+    @param capacity: 예상 원소 수
+    @param error_rate: 목표 오탐률
+    @note: 비트 배열 크기 m = -n·ln(p) / (ln2)^2, 해시 수 k = m/n·ln2
+        128비트 digest를 두 64비트 값으로 나눠 double hashing으로 k개 위치 계산
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.n_bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.n_hashes = max(1, round(self.n_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.n_bits + 7) // 8)
+
+    def add(self, digest):
+        """
+        @param digest: canonical_hash() 결과
+        @return: 이미 있었는지 여부 (오탐 가능)
+        """
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        present = True
+        for i in range(self.n_hashes):
+            bit = (h1 + i * h2) % self.n_bits
+            byte_index, mask = bit >> 3, 1 << (bit & 7)
+            if not self.bits[byte_index] & mask:
+                present = False
+                self.bits[byte_index] |= mask
+        return present
+
+
+class DedupIndex:
+    """
+    @param capacity / error_rate: BloomFilter 설정
+    @note: seen(frame, action)로 검사+기록, 액션별 통계는 checks/hits
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.checks = {}         # action -> 검사 횟수
+        self.hits = {}           # action -> 중복 판정 횟수
+
+    def seen(self, frame, action="Unknown"):
+        """
+        @param frame: 검사할 프레임
+        @param action: 통계용 액션 이름
+        @return: 중복 여부 (처음이면 기록 후 False)
+        """
+        action = str(action)
+        self.checks[action] = self.checks.get(action, 0) + 1
+        duplicate = self.bloom.add(canonical_hash(frame))
+        if duplicate:
+            self.hits[action] = self.hits.get(action, 0) + 1
+        return duplicate
+
+    def stats(self):
+        """
+        @return: {action: [checks, hits]} (프로세스 간 전달/합산용)
+        """
+        return {action: [count, self.hits.get(action, 0)] for action, count in self.checks.items()}
+
+
+def merge_stats(total, stats):
+    """
+    @param total: 누적 {action: [checks, hits]}
+    @param stats: 더할 {action: [checks, hits]}
+    @return: total (제자리 갱신)
+    """
+    for action, (checks, hits) in stats.items():
+        entry = total.setdefault(action, [0, 0])
+        entry[0] += checks
+        entry[1] += hits
+    return total
+
+
+def format_stats(stats):
+    """
+    @param stats: {action: [checks, hits]}
+    @return: 액션별 dedup hit ratio 표 문자열
+    """
+    if not stats:
+        return "dedup: no checks"
+    lines = [f"{'dedup action':35s} {'checks':>9s} {'dups':>9s} {'hit%':>7s}"]
+    total_checks = total_hits = 0
+    for action in sorted(stats):
+        checks, hits = stats[action]
+        total_checks += checks
+        total_hits += hits
+        lines.append(f"{action[:35]:35s} {checks:9d} {hits:9d} {100.0 * hits / checks:6.1f}%")
+    lines.append(f"{'(total)':35s} {total_checks:9d} {total_hits:9d} {100.0 * total_hits / total_checks:6.1f}%")
+    return "\n".join(lines)
@@ -0,0 +1,610 @@
+# distributed.py
+# 여러 노드로 나눠 보내는 분산 퍼징 (코디네이터 1개 + 워커 N개, TCP 또는 Unix socket)
+# - 코디네이터: 작업(task)을 나눠 주고, 워커가 스트리밍하는 결과 행과 interesting 입력을 모아 결과 파일 하나로 병합
+#   작업 = generator 블록 (블록 번호 → derive_block_seed sub-seed, 워커 수와 무관하게 같은 케이스)
+#        또는 --input 입력을 --task-size 건씩 나눈 구간 (케이스를 메시지에 담아 보냄 → 공유 파일시스템 불필요)
+# - 워커: ReplaySession N개로 대상 CSMS에 전송 (CP ID "<경로>_W<워커 번호>_<세션 번호>"),
+#   작업을 받으면 바로 다음 작업을 요청해 두어 작업 사이에 전송이 끊기지 않음
+# - interesting: 워커가 처음 본 응답 시그니처(액션, 결과 분류, 지연 구간 - feedback.py와 같음)의 입력을 보내면
+#   코디네이터가 전체 기준으로 처음 본 것만 --interesting 디렉터리에 저장
+# - 워커 연결이 끊기면 끝나지 않은 작업을 다시 큐에 넣어 다른 워커가 실행 (이미 받은 input은 중복 기록하지 않음)
+# - 프로토콜: 줄 단위 compact JSON 메시지 (type 필드로 구분)
+#     워커 → hello / next / result(task, row) / interesting(task, input, signature, frame) / done(task)
+#     코디네이터 → config / task(task, kind, …) / stop
+#   인증이 없으므로 신뢰할 수 있는 네트워크에서만 사용 (기본 listen 주소는 127.0.0.1)
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import time
+from collections import deque
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from . import codec
+from .feedback import latency_bucket
+from .generator import GENERATION_BLOCK_SIZE, MUTATION_MODES, iter_block_cases, normalize_action_name
+from .results import ResultWriter, RESULT_FIELDS, is_delivered
+from .sender import (DEFAULT_CONNECTIONS, DEFAULT_INFLIGHT, DEFAULT_SUBPROTOCOLS, DEFAULT_URI, DEFAULT_WINDOW,
+                     DETAIL_FIELDS, FAULT_FIELDS, MUTATION_FIELDS, RECV_TIMEOUT_SEC, TIMING_FIELDS,
+                     ReplaySession, TargetUnreachable, build_session_uri, frame_action, iter_input_records)
+from .stats import LatencyReport
+
+DEFAULT_LISTEN = "127.0.0.1:9300"
+CSV_DEFAULT_PATH = "distributed_result.csv"
+DEFAULT_TASK_SIZE = GENERATION_BLOCK_SIZE   # 작업 1건의 케이스 수 (generator 블록 크기와 같음)
+WORKER_FIELDS = ["worker"]                  # 결과를 보낸 워커 이름
+RESULT_COLUMNS = RESULT_FIELDS + TIMING_FIELDS + FAULT_FIELDS + DETAIL_FIELDS + MUTATION_FIELDS
+MESSAGE_LINE_LIMIT = 64 * 1024 * 1024       # 메시지 한 줄 최대 크기 (작업 메시지에 케이스가 통째로 들어감)
+CONNECT_TRIES = 20                          # 워커의 코디네이터 접속 재시도 횟수
+CONNECT_RETRY_SEC = 0.5
+DRAIN_EVERY = 100                           # 워커가 N건 분배할 때마다 전송 버퍼 drain (결과 스트림 backpressure)
+STATUS_INTERVAL_SEC = 5.0                   # 코디네이터 진행 상황 출력 주기
+UNIX_PREFIX = "unix:"
+
+
+def parse_address(address):
+    """
+    @param address: "host:port" 또는 "unix:/path/to/socket"
+    @return: ("unix", path) 또는 ("tcp", host, port)
+    """
+    if address.startswith(UNIX_PREFIX):
+        return "unix", address[len(UNIX_PREFIX):]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"invalid address '{address}' (expected host:port or unix:/path)")
+    return "tcp", host.strip("[]"), int(port)
+
+
+def worker_uri(base_uri, worker_id):
+    """
+    @param base_uri: 기준 WebSocket URI
+    @param worker_id: 코디네이터가 붙인 워커 번호
+    @return: 워커별 CP ID 경로 ("<경로>_W<번호>") - 세션 번호는 build_session_uri()가 덧붙임
+    """
+    parts = urlsplit(base_uri)
+    cp_path = parts.path.rstrip("/") or "/CP_REPLAY"
+    return urlunsplit(parts._replace(path=f"{cp_path}_W{worker_id:02d}"))
+
+
+class MessageLink:
+    """
+    @param reader / writer: asyncio 스트림
+    @note: 줄 단위 compact JSON 메시지 송수신
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, message):
+        if not self.writer.is_closing():
+            self.writer.write(codec.dumps_compact(message) + b"\n")
+
+    async def receive(self):
+        """
+        @return: 메시지 dict, 연결이 끊겼으면 None
+        """
+        try:
+            line = await self.reader.readline()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            return None
+        if not line:
+            return None
+        return codec.loads(line)
+
+    async def drain(self):
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def open_link(address, tries=CONNECT_TRIES):
+    """
+    @param address: 코디네이터 주소 (parse_address 형식)
+    @return: MessageLink
+    @note: 코디네이터보다 먼저 뜬 워커를 위해 CONNECT_RETRY_SEC 간격으로 재시도
+    """
+    target = parse_address(address)
+    for attempt in range(1, tries + 1):
+        try:
+            if target[0] == "unix":
+                reader, writer = await asyncio.open_unix_connection(target[1], limit=MESSAGE_LINE_LIMIT)
+            else:
+                reader, writer = await asyncio.open_connection(target[1], target[2], limit=MESSAGE_LINE_LIMIT)
+            return MessageLink(reader, writer)
+        except OSError:
+            if attempt == tries:
+                raise
+            await asyncio.sleep(CONNECT_RETRY_SEC)
+
+
+# ---- 작업 ----
+
+def iter_generate_tasks(n_cases, task_size=DEFAULT_TASK_SIZE):
+    """
+    @param n_cases: 생성할 전체 케이스 수
+    @param task_size: 블록(작업) 크기
+    @return: generator 블록 작업 메시지 Generator (블록 번호/첫 번호는 generator.main과 같은 방식)
+    """
+    for block_no, start in enumerate(range(0, n_cases, task_size)):
+        yield {"type": "task", "kind": "block", "block": block_no, "first_index": start + 1,
+               "count": min(task_size, n_cases - start)}
+
+
+def iter_input_tasks(input_path, task_size=DEFAULT_TASK_SIZE):
+    """
+    @param input_path: sender --input 과 같은 입력
+    @param task_size: 작업 1건의 케이스 수
+    @return: 케이스 목록 작업 메시지 Generator (입력 순서 구간, 필요할 때만 읽음)
+    """
+    records = iter_input_records(input_path)
+    while True:
+        chunk = [[str(display), parsed, trace] for display, parsed, trace in itertools.islice(records, task_size)]
+        if not chunk:
+            return
+        yield {"type": "task", "kind": "cases", "cases": chunk}
+
+
+def iter_task_records(task, config):
+    """
+    @param task: 작업 메시지
+    @param config: 코디네이터의 config 메시지 (generator 블록 설정)
+    @return: (표시용 이름, parsed 프레임, 변형 trace) Generator - iter_input_records()와 같은 형식
+    """
+    if task["kind"] == "cases":
+        for display, parsed, trace in task["cases"]:
+            yield display, parsed, trace
+        return
+    cases = iter_block_cases(task["block"], task["first_index"], task["count"], config["seed"],
+                             config["min"], config["max"], config["baseline"], config["mode"])
+    for file_index, safe_action_name, kind, frame, trace in cases:
+        if isinstance(frame, bytes):
+            frame = codec.loads(frame)
+        yield f"{file_index:04d}_{safe_action_name}_{kind}", frame, trace
+
+
+# ---- 워커 ----
+
+class WorkerState:
+    """
+    @param link: 코디네이터 MessageLink
+    @note: ReplaySession의 결과 기록기(sink)와 on_result 콜백 역할.
+        결과 행은 바로 코디네이터로 보내고, 작업의 모든 결과가 나오면 done 전송
+    """
+
+    def __init__(self, link):
+        self.link = link
+        self.inflight = {}           # index -> (task id, parsed 프레임, 표시 이름)
+        self.remaining = {}          # task id -> 결과를 기다리는 케이스 수
+        self.dispatching = set()     # 아직 분배 중인 task id
+        self.signatures = set()
+        self.sent = 0
+
+    def begin(self, task_id):
+        self.remaining[task_id] = 0
+        self.dispatching.add(task_id)
+
+    def track(self, index, task_id, parsed, display):
+        self.inflight[index] = (task_id, parsed, display)
+        self.remaining[task_id] += 1
+
+    def end_dispatch(self, task_id):
+        self.dispatching.discard(task_id)
+        self._maybe_done(task_id)
+
+    def _maybe_done(self, task_id):
+        if task_id not in self.dispatching and self.remaining.get(task_id) == 0:
+            del self.remaining[task_id]
+            self.link.send({"type": "done", "task": task_id})
+
+    def add(self, index, row):
+        """
+        @note: ResultWriter.add()와 같은 형식 (ReplaySession이 호출)
+        """
+        self.sent += 1
+        self.link.send({"type": "result", "task": self.inflight[index][0], "row": row})
+
+    def on_result(self, index, result_class, latency_ms):
+        """
+        @note: ReplaySession.on_result 형식. 처음 보는 시그니처의 입력은 interesting으로 보고
+        """
+        task_id, parsed, display = self.inflight.pop(index)
+        signature = (frame_action(parsed), result_class, latency_bucket(latency_ms))
+        if signature not in self.signatures:
+            self.signatures.add(signature)
+            self.link.send({"type": "interesting", "task": task_id, "input": display,
+                            "signature": list(signature), "frame": parsed})
+        self.remaining[task_id] -= 1
+        self._maybe_done(task_id)
+
+
+async def run_worker(address, uri=None, name=None):
+    """
+    @param address: 코디네이터 주소
+    @param uri: 대상 CSMS URI (None이면 코디네이터 설정 사용, 노드별 엔드포인트가 다를 때 지정)
+    @param name: 워커 이름 (기본: "<호스트>-<pid>")
+    @return: 보낸 케이스 수
+    """
+    link = await open_link(address)
+    link.send({"type": "hello", "name": name or f"{socket.gethostname()}-{os.getpid()}"})
+    config = await link.receive()
+    if config is None or config.get("type") != "config":
+        await link.close()
+        raise ConnectionError(f"no config from coordinator {address}")
+
+    worker_id = config["worker"]
+    n_sessions = max(1, config["connections"])
+    base_uri = worker_uri(uri or config["uri"], worker_id)
+    sessions = [
+        ReplaySession(i, build_session_uri(base_uri, i, n_sessions), config["subp"], config["timeout"],
+                      config["inflight"], config["window"])
+        for i in range(n_sessions)
+    ]
+    state = WorkerState(link)
+    clock_origin = time.monotonic()
+    for session in sessions:
+        session.clock_origin = clock_origin
+        session.on_result = state.on_result
+    runners = [asyncio.create_task(s.run(state, config["replace_uid"])) for s in sessions]
+
+    index = 0
+    link.send({"type": "next"})
+    try:
+        while True:
+            task = await link.receive()
+            if task is None or task["type"] != "task":
+                break
+            task_id = task["task"]
+            state.begin(task_id)
+            link.send({"type": "next"})      # 이 작업을 보내는 동안 다음 작업을 미리 받아 둠
+            for display, parsed, trace in iter_task_records(task, config):
+                live = [s for s in sessions if not s.dead]
+                if not live:
+                    # 대상에 연결할 수 없음 → 연결을 끊어 코디네이터가 남은 작업을 다른 워커에 다시 배정
+                    raise TargetUnreachable(f"cannot connect to {base_uri}, worker {worker_id} stopped")
+                state.track(index, task_id, parsed, display)
+                target = min(live, key=lambda s: s.queue.qsize())
+                await target.queue.put((index, display, parsed, trace))
+                index += 1
+                if index % DRAIN_EVERY == 0:
+                    await link.drain()
+            state.end_dispatch(task_id)
+            await link.drain()
+    finally:
+        for session in sessions:
+            await session.queue.put(None)
+        await asyncio.gather(*runners, return_exceptions=True)
+        await link.drain()
+        await link.close()
+    return state.sent
+
+
+def _worker_process(address, uri, name):
+    """
+    @note: --spawn 로 띄우는 로컬 워커 프로세스 진입점
+    """
+    try:
+        asyncio.run(run_worker(address, uri, name))
+    except TargetUnreachable as e:
+        print(f"[WORKER] {name}: {e}")
+
+
+# ---- 코디네이터 ----
+
+class WorkerHandle:
+    """
+    @note: 코디네이터 쪽 워커 연결 1개 (owned: 이 워커가 맡아 아직 끝내지 않은 작업)
+    """
+
+    def __init__(self, worker_id, name, link):
+        self.worker_id = worker_id
+        self.name = name
+        self.link = link
+        self.owned = set()
+        self.stopped = False
+        self.sent = 0
+
+
+class Coordinator:
+    """
+    @param tasks: 작업 메시지 이터러블 (지연 평가, task 번호는 여기서 붙임)
+    @param config: 워커에 보낼 설정 (config 메시지 본문)
+    @param sink: ResultWriter (RESULT_COLUMNS + WORKER_FIELDS)
+    @param interesting_dir: interesting 입력 저장 디렉터리 (선택)
+    @note: 결과는 도착 순서대로 기록 (작업 간 순서는 보장하지 않음, input 이름으로 구분)
+    """
+
+    def __init__(self, tasks, config, sink, interesting_dir=None):
+        self.tasks = iter(tasks)
+        self.config = config
+        self.sink = sink
+        self.interesting_dir = Path(interesting_dir) if interesting_dir else None
+        if self.interesting_dir is not None:
+            self.interesting_dir.mkdir(parents=True, exist_ok=True)
+        self.task_ids = itertools.count()
+        self.worker_ids = itertools.count()
+        self.requeued = deque()
+        self.active = {}             # task id -> (작업 메시지, 이미 받은 input 집합)
+        self.waiting = []            # 할 작업이 없어 대기 중인 WorkerHandle (다른 워커의 작업이 재배정될 수 있음)
+        self.workers = {}
+        self.tasks_done = 0
+        self.tasks_requeued = 0
+        self.rows = 0
+        self.duplicates = 0
+        self.undelivered = 0
+        self.signatures = set()
+        self.latency = LatencyReport()
+        self.exhausted = False
+        self.finished = asyncio.Event()
+
+    def _next_task(self):
+        if self.requeued:
+            return self.requeued.popleft()
+        if self.exhausted:
+            return None
+        task = next(self.tasks, None)
+        if task is None:
+            self.exhausted = True
+            return None
+        task["task"] = next(self.task_ids)
+        self.active[task["task"]] = (task, set())
+        return task
+
+    def _assign(self, worker):
+        task = self._next_task()
+        if task is not None:
+            worker.owned.add(task["task"])
+            worker.link.send(task)
+        elif self.active:
+            self.waiting.append(worker)
+        else:
+            self._stop(worker)
+            self._check_finished()   # 작업이 하나도 없던 경우 (--generate 0 / 빈 --input)
+
+    def _stop(self, worker):
+        if not worker.stopped:
+            worker.stopped = True
+            worker.link.send({"type": "stop"})
+
+    def _check_finished(self):
+        if self.exhausted and not self.requeued and not self.active:
+            for worker in self.waiting:
+                self._stop(worker)
+            self.waiting.clear()
+            self.finished.set()
+
+    def _add_row(self, worker, task_id, row):
+        if not is_delivered(dict(zip(RESULT_COLUMNS, row))):
+            # 대상에 닿지 못한 행 (EXC:CONNECT_FAILED / collateral): 받은 input으로 치지 않아야
+            # 워커가 끊겨 재배정된 작업의 실제 결과가 중복으로 버려지지 않음
+            self.undelivered += 1
+            return
+        entry = self.active.get(task_id)
+        if entry is not None:
+            if row[0] in entry[1]:
+                self.duplicates += 1     # 재배정된 작업에서 이미 받은 input
+                return
+            entry[1].add(row[0])
+        self.sink.add(self.rows, row + [worker.name])
+        self.rows += 1
+        worker.sent += 1
+        try:
+            latency = float(row[4]) if row[4] else None
+        except (TypeError, ValueError):
+            latency = None
+        self.latency.record(row[6], row[1], latency)
+
+    def _add_interesting(self, message):
+        signature = tuple(message["signature"])
+        if signature in self.signatures:
+            return
+        self.signatures.add(signature)
+        if self.interesting_dir is not None:
+            name = f"{len(self.signatures):04d}_{normalize_action_name(signature[0])}_interesting.json"
+            (self.interesting_dir / name).write_text(json.dumps(message["frame"], ensure_ascii=False, indent=2),
+                                                     encoding="utf-8")
+
+    async def handle(self, reader, writer):
+        """
+        @note: asyncio 서버 연결 핸들러 (워커 1개)
+        """
+        link = MessageLink(reader, writer)
+        hello = await link.receive()
+        if hello is None or hello.get("type") != "hello":
+            await link.close()
+            return
+        worker = WorkerHandle(next(self.worker_ids), str(hello.get("name") or "worker"), link)
+        self.workers[worker.worker_id] = worker
+        print(f"[COORD] worker {worker.worker_id} connected: {worker.name}")
+        link.send(dict(self.config, type="config", worker=worker.worker_id))
+        try:
+            while True:
+                message = await link.receive()
+                if message is None:
+                    break
+                kind = message.get("type")
+                if kind == "result":
+                    self._add_row(worker, message["task"], message["row"])
+                elif kind == "interesting":
+                    self._add_interesting(message)
+                elif kind == "next":
+                    self._assign(worker)
+                elif kind == "done":
+                    worker.owned.discard(message["task"])
+                    if self.active.pop(message["task"], None) is not None:
+                        self.tasks_done += 1
+                    self._check_finished()
+                await link.drain()
+        finally:
+            self._release(worker)
+            await link.close()
+
+    def _release(self, worker):
+        """
+        @note: 연결이 끊긴 워커 정리. 끝내지 못한 작업은 재배정 큐로, 대기 중인 워커가 있으면 바로 배정
+        """
+        del self.workers[worker.worker_id]
+        if worker in self.waiting:
+            self.waiting.remove(worker)
+        for task_id in sorted(worker.owned):
+            if task_id in self.active:
+                self.requeued.append(self.active[task_id][0])
+                self.tasks_requeued += 1
+        if worker.owned:
+            print(f"[COORD] worker {worker.worker_id} lost, requeued tasks {sorted(worker.owned)}")
+            while self.waiting and self.requeued:
+                self._assign(self.waiting.pop())
+        print(f"[COORD] worker {worker.worker_id} ({worker.name}) finished: {worker.sent} results")
+
+    def format_status(self, elapsed):
+        rate = self.rows / elapsed if elapsed > 0 else 0.0
+        return (f"[COORD] {elapsed:7.1f}s workers {len(self.workers)} tasks done {self.tasks_done} "
+                f"active {len(self.active)} results {self.rows} ({rate:.1f}/s) interesting {len(self.signatures)}")
+
+
+async def serve_coordinator(coordinator, listen, spawn=0):
+    """
+    @param coordinator: Coordinator
+    @param listen: listen 주소 (parse_address 형식)
+    @param spawn: 같은 머신에 띄울 워커 프로세스 수
+    @note: 모든 작업이 끝나고 연결된 워커가 결과를 다 보낼 때까지 대기.
+        띄운 로컬 워커가 모두 끝났는데 외부 워커도 없고 작업이 남아 있으면 중단
+    """
+    target = parse_address(listen)
+    if target[0] == "unix":
+        server = await asyncio.start_unix_server(coordinator.handle, target[1], limit=MESSAGE_LINE_LIMIT)
+    else:
+        server = await asyncio.start_server(coordinator.handle, target[1], target[2], limit=MESSAGE_LINE_LIMIT)
+    print(f"[COORD] listening on {listen}")
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=_worker_process, name=f"fuzz-worker-{i}", args=(listen, None, f"local-{i}"))
+                 for i in range(spawn)]
+    for process in processes:
+        process.start()
+
+    started = time.monotonic()
+    last_status = started
+    try:
+        while not (coordinator.finished.is_set() and not coordinator.workers):
+            await asyncio.sleep(0.2)
+            now = time.monotonic()
+            if now - last_status >= STATUS_INTERVAL_SEC:
+                print(coordinator.format_status(now - started))
+                last_status = now
+            if processes and not coordinator.workers and not any(p.is_alive() for p in processes) \
+                    and not coordinator.finished.is_set():
+                print("[COORD] all local workers exited with work remaining")
+                break
+    finally:
+        server.close()
+        await server.wait_closed()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+    return time.monotonic() - started
+
+
+async def main_coordinator(args):
+    if (args.input is None) == (args.generate is None):
+        raise SystemExit("exactly one of --input or --generate is required")
+    task_size = max(1, args.task_size)
+    seed = args.seed
+    if args.generate is not None:
+        if seed is None:
+            seed = int.from_bytes(os.urandom(4), "big")
+            print(f"seed = {seed}")
+        tasks = iter_generate_tasks(max(0, args.generate), task_size)
+    else:
+        tasks = iter_input_tasks(args.input, task_size)
+
+    min_variants = max(0, args.min)
+    config = {"uri": args.uri, "subp": args.subp, "timeout": args.timeout, "connections": args.connections,
+              "inflight": args.inflight, "window": args.window, "replace_uid": args.replace_uid,
+              "seed": seed, "mode": args.mode, "min": min_variants, "max": max(min_variants, args.max),
+              "baseline": args.baseline}
+    sink = ResultWriter(args.csv, RESULT_COLUMNS + WORKER_FIELDS)
+    coordinator = Coordinator(tasks, config, sink, args.interesting)
+    try:
+        elapsed = await serve_coordinator(coordinator, args.listen, max(0, args.spawn))
+    finally:
+        sink.close()
+
+    print(coordinator.latency.format())
+    print(f"distributed: {coordinator.rows} results in {elapsed:.1f}s "
+          f"({coordinator.rows / elapsed if elapsed > 0 else 0.0:.1f}/s), tasks {coordinator.tasks_done} "
+          f"(requeued {coordinator.tasks_requeued}, duplicate rows dropped {coordinator.duplicates}, "
+          f"undelivered rows dropped {coordinator.undelivered}), "
+          f"interesting {len(coordinator.signatures)}")
+    print(f"wrote CSV: {args.csv}")
+
+
+async def main():
+    """
+    @note:
+    - coordinator : 작업 분배 + 결과 병합
+      --listen (host:port / unix:/path), --input 또는 --generate N (+ --seed/--mode/--min/--max/--baseline),
+      --task-size, --csv, --interesting DIR, --spawn N (로컬 워커 N개 실행)
+      전송 설정(--uri/--subp/--timeout/--connections/--inflight/--window/--replace-uid)은 워커에 전달 (연결 수는 워커당)
+    - worker : --connect (코디네이터 주소), --uri (노드별 대상 CSMS, 기본: 코디네이터 설정), --name
+    - 결과 컬럼: sender와 같음 + worker (도착 순서)
+    """
+    parser = argparse.ArgumentParser(description="Distributed OCPP fuzzing with a coordinator and workers.")
+    sub = parser.add_subparsers(dest="role", required=True)
+
+    coord = sub.add_parser("coordinator", help="작업 분배 + 결과 병합")
+    coord.add_argument("--listen", default=DEFAULT_LISTEN, help="listen 주소 (host:port 또는 unix:/path)")
+    coord.add_argument("--input", help="JSON 파일/JSONL/디렉터리 경로")
+    coord.add_argument("--generate", type=int, default=None, help="generator 블록으로 N개 케이스 생성")
+    coord.add_argument("--seed", type=int, default=None, help="--generate 기준 시드 (블록 sub-seed 유도)")
+    coord.add_argument("--mode", choices=MUTATION_MODES, default="tree", help="--generate 변형 방식 (기본: tree)")
+    coord.add_argument("--min", type=int, default=1, help="--generate 시드당 변형 최소값")
+    coord.add_argument("--max", type=int, default=5, help="--generate 시드당 변형 최대값")
+    coord.add_argument("--baseline", action="store_true", help="--generate 원본 프레임도 포함")
+    coord.add_argument("--task-size", type=int, default=DEFAULT_TASK_SIZE, help="작업 1건의 케이스 수 (기본: 1000)")
+    coord.add_argument("--csv", default=CSV_DEFAULT_PATH, help="병합 결과 경로 (.jsonl 이면 JSONL)")
+    coord.add_argument("--interesting", default=None, help="interesting 입력 저장 디렉터리")
+    coord.add_argument("--spawn", type=int, default=0, help="같은 머신에 띄울 워커 프로세스 수")
+    coord.add_argument("--uri", default=DEFAULT_URI, help="대상 CSMS WebSocket URI")
+    coord.add_argument("--subp", nargs="*", default=DEFAULT_SUBPROTOCOLS, help="WebSocket subprotocols")
+    coord.add_argument("--timeout", type=int, default=RECV_TIMEOUT_SEC, help="서버 응답 타임아웃(초)")
+    coord.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS, help="워커당 동시 WebSocket 세션 수")
+    coord.add_argument("--inflight", type=int, default=DEFAULT_INFLIGHT, help="세션별 대기 큐 길이")
+    coord.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="세션별 동시 응답 대기 요청 수")
+    coord.add_argument("--replace-uid", action="store_true", help="uniqueId를 실행 시 새 uuid4로 교체")
+
+    work = sub.add_parser("worker", help="작업을 받아 대상 CSMS로 전송")
+    work.add_argument("--connect", default=DEFAULT_LISTEN, help="코디네이터 주소 (host:port 또는 unix:/path)")
+    work.add_argument("--uri", default=None, help="대상 CSMS URI (기본: 코디네이터 설정)")
+    work.add_argument("--name", default=None, help="워커 이름 (기본: <호스트>-<pid>)")
+    args = parser.parse_args()
+
+    try:
+        if args.role == "coordinator":
+            parse_address(args.listen)
+            await main_coordinator(args)
+        else:
+            sent = await run_worker(args.connect, args.uri, args.name)
+            print(f"worker: sent {sent} cases")
+    except ValueError as e:
+        parser.error(str(e))
+    except TargetUnreachable as e:
+        raise SystemExit(f"worker: {e}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
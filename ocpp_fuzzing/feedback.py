@@ -0,0 +1,166 @@
+# feedback.py
+# 서버 응답 기반 coverage-guided 온라인 퍼징 (AFL 방식)
+# - 응답 시그니처: (액션, 결과 분류, 지연시간 버킷)
+#   처음 보는 시그니처(새 CallError 코드, 새 TIMEOUT/CLOSED 동작, 새 지연 구간)를 만든 입력은 "interesting"
+# - interesting 입력은 코퍼스에 추가되어 이후 우선적으로 재변형
+# - energy 스케줄: 발견이 많은 항목 ↑, 발견 없이 많이 보낸 항목 ↓, 같은 액션이 많은 항목 ↓
+#   → 제한된 전송 예산이 Heartbeat 류의 중복 변형에 몰리지 않도록 분배
+
+import json
+import math
+import random
+from pathlib import Path
+
+from .dedup import MAX_REROLLS, MAX_STALLED_CASES
+from .generator import make_variants, normalize_action_name
+from .seeds import DEFAULT_SEEDS
+from .sender import frame_action
+
+ENERGY_FIND_BONUS = 4.0        # 발견 1건당 energy 가중치
+ENERGY_DECAY_SENDS = 32        # 발견 없이 이만큼 보내면 energy 절반
+LATENCY_BUCKET_BASE = 4.0      # 지연 버킷: log4(ms) 단위 (1, 4, 16, 64ms …)
+
+
+def latency_bucket(latency_ms):
+    """
+    @param latency_ms: 응답 지연 (ms) 또는 None
+    @return: 지연 구간 번호 (응답 없음: None)
+    """
+    if latency_ms is None:
+        return None
+    return int(math.log(max(latency_ms, 1.0), LATENCY_BUCKET_BASE))
+
+
+class CorpusEntry:
+    """
+    @note: 온라인 코퍼스 항목 하나
+    - frame : 변형의 기준 프레임 ($UID$ 자리표시자 유지)
+    - sends : 이 항목에서 파생되어 전송된 횟수
+    - finds : 이 항목의 변형이 새 시그니처를 찾은 횟수
+    """
+
+    __slots__ = ("entry_id", "frame", "action", "parent_id", "signature", "sends", "finds")
+
+    def __init__(self, entry_id, frame, parent_id=None, signature=None):
+        self.entry_id = entry_id
+        self.frame = frame
+        self.action = frame_action(frame)
+        self.parent_id = parent_id
+        self.signature = signature
+        self.sends = 0
+        self.finds = 0
+
+
+class FeedbackCorpus:
+    """
+    @param seed_frames: 초기 코퍼스 (기본: DEFAULT_SEEDS)
+    @param save_dir: interesting 입력을 JSON 파일로 저장할 디렉터리 (선택)
+    @param dedup: DedupIndex (선택). 이미 보낸 변형이면 최대 MAX_REROLLS 회 재생성
+    @note: next_case()로 다음 전송 케이스를 고르고, report()로 결과를 되먹임
+    """
+
+    def __init__(self, seed_frames=None, save_dir=None, dedup=None):
+        self.dedup = dedup
+        self.entries = []
+        self.signatures = set()
+        self.action_counts = {}
+        self.pending = {}            # case index -> (entry, frame)
+        self.save_dir = Path(save_dir) if save_dir else None
+        if self.save_dir is not None:
+            self.save_dir.mkdir(parents=True, exist_ok=True)
+        for frame in (DEFAULT_SEEDS if seed_frames is None else seed_frames):
+            self._add_entry(frame)
+
+    def _add_entry(self, frame, parent_id=None, signature=None):
+        entry = CorpusEntry(len(self.entries), frame, parent_id, signature)
+        self.entries.append(entry)
+        self.action_counts[entry.action] = self.action_counts.get(entry.action, 0) + 1
+        return entry
+
+    def energy(self, entry):
+        """
+        @param entry: CorpusEntry
+        @return: 선택 가중치
+        """
+        productivity = 1.0 + ENERGY_FIND_BONUS * entry.finds
+        staleness = 2.0 ** (-(entry.sends - entry.finds * ENERGY_DECAY_SENDS) / ENERGY_DECAY_SENDS)
+        return productivity * min(1.0, staleness) / self.action_counts[entry.action]
+
+    def next_case(self, index):
+        """
+        @param index: 케이스 순번 (report()에서 결과와 매칭)
+        @return: (표시 이름, 변형된 프레임, 변형 trace),
+            dedup 사용 시 MAX_REROLLS 회 재생성해도 중복이면 None (iter_generated_records()와 같이 건너뜀)
+        """
+        weights = [self.energy(entry) for entry in self.entries]
+        entry = random.choices(self.entries, weights=weights, k=1)[0]
+        traces = []
+        frame = make_variants(entry.frame, 1, traces)[0]
+        if self.dedup is not None:
+            rerolls = 0
+            while self.dedup.seen(frame, entry.action):
+                if rerolls >= MAX_REROLLS:
+                    return None
+                rerolls += 1
+                traces.clear()
+                frame = make_variants(entry.frame, 1, traces)[0]
+        entry.sends += 1
+        self.pending[index] = (entry, frame)
+        display = f"online:{index + 1:06d}_{normalize_action_name(entry.action)}_e{entry.entry_id}"
+        return display, frame, traces[0]
+
+    def report(self, index, result_class, latency_ms):
+        """
+        @param index: next_case()에 넘긴 순번
+        @param result_class: classify_response() 결과
+        @param latency_ms: 응답 지연 (ms, 없으면 None)
+        @return: 새 코퍼스 항목 (interesting이 아니면 None)
+        """
+        parent, frame = self.pending.pop(index, (None, None))
+        if parent is None:
+            return None
+
+        signature = (frame_action(frame), result_class, latency_bucket(latency_ms))
+        if signature in self.signatures:
+            return None
+
+        self.signatures.add(signature)
+        parent.finds += 1
+        entry = self._add_entry(frame, parent.entry_id, signature)
+        if self.save_dir is not None:
+            name = f"{entry.entry_id:04d}_{normalize_action_name(entry.action)}_interesting.json"
+            (self.save_dir / name).write_text(json.dumps(frame, ensure_ascii=False, indent=2), encoding="utf-8")
+        return entry
+
+    def iter_records(self, budget):
+        """
+        @param budget: 전체 전송 예산 (케이스 수)
+        @return: (표시용 Path, 프레임, 변형 trace) Generator - iter_input_records()와 같은 형식
+        @note: 지연 평가되므로 앞선 결과가 되먹임된 뒤 다음 케이스가 선택됨
+            (되먹임 지연은 전송 큐 길이만큼으로 제한).
+            중복으로 건너뛴 케이스는 예산에 넣지 않으며, MAX_STALLED_CASES 개 연속이면 예산 전에 멈춤
+        """
+        index = 0
+        stalled = 0
+        while index < budget:
+            case = self.next_case(index)
+            if case is None:
+                stalled += 1
+                if stalled >= MAX_STALLED_CASES:
+                    print(f"dedup: no new variant in {stalled} tries, stopped after {index} cases")
+                    return
+                continue
+            stalled = 0
+            display, frame, trace = case
+            yield Path(display), frame, trace
+            index += 1
+
+    def format_summary(self, top=10):
+        """
+        @return: 코퍼스 요약 문자열 (발견 수 상위 항목)
+        """
+        lines = [f"online corpus: {len(self.entries)} entries, {len(self.signatures)} signatures"]
+        ranked = sorted(self.entries, key=lambda e: (-e.finds, e.entry_id))[:top]
+        for entry in ranked:
+            lines.append(f"  #{entry.entry_id:<5d} {entry.action[:32]:32s} sends={entry.sends:<6d} finds={entry.finds}")
+        return "\n".join(lines)
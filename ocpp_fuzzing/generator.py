@@ -1,8 +1,25 @@
-import json, random, argparse, copy
+import json, random, argparse
 import string
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Union, Any
-from .seeds import DEFAULT_SEEDS, DICT_MUTATE_PROB, DICT_JUNK_PROB, LIST_APPEND_PROB, ACTION_SWAP_PROB, HEADER_CORRUPT_PROB, BASELINE_SAVE_PROB
+from . import codec
+from .corpus import (ShardWriter, encode_case, shard_file_name, write_index, JSONL_FILE_NAME, PROVENANCE_FIELDS,
+                     PROVENANCE_FILE_NAME, zstandard)
+from .template import get_templates, splice_variants
+from .schema_mutator import get_schema_mutator
+from .dedup import DedupIndex, MAX_REROLLS, MAX_STALLED_CASES, merge_stats, format_stats
+from . import seeds
+from .seeds import DEFAULT_SEEDS
+from .provenance import apply_tuning, join_trace, load_tuning, trace_op
+
+GENERATION_BLOCK_SIZE = 1000   # 블록(파일 번호 구간) 단위로 sub-seed를 나눠 생성
+PENDING_BLOCKS_PER_WORKER = 2  # 워커당 동시에 제출해 두는 블록 수 (완료된 블록 결과가 부모에 쌓이지 않도록)
+OUTPUT_FORMATS = ["json", "jsonl", "shards"]
+MUTATION_MODES = ["tree", "splice", "schema", "schema-all"]
 
 
 def make_dir(path):
@@ -24,11 +41,16 @@ def normalize_action_name(action):
         for ch in raw_name
     )
 
-def mutate_payload(payload):
+def mutate_payload(payload, path=(), trace=None):
     """
     @param payload: 변형할 원본 payload
+    @param path: payload 기준 현재 위치 (재귀 호출용)
+    @param trace: 적용한 연산을 "op@경로"로 덧붙일 리스트 (선택, provenance.trace_op 형식)
     @return: 변형된 payload (원본은 보존)
-    @note: 주어진 payload를 (깊은 복사 후) 무작위 규칙으로 재귀 변형하여 반환합니다.
+    @note: 주어진 payload를 무작위 규칙으로 재귀 변형하여 반환합니다.
+        copy-on-write: 실제로 바뀌는 경로의 dict/list만 얕은 복사하고,
+        바뀌지 않은 하위 구조는 원본과 공유합니다. (깊은 복사 없음)
+        → 반환값의 하위 구조를 직접 수정하면 원본(시드)까지 바뀌므로 읽기 전용으로 사용
 
     규칙
     1) dict
@@ -45,42 +67,55 @@ def mutate_payload(payload):
     반환값:
     - 변형된 payload (원본은 보존)
     """
-    # 원본 변경 방지
-    payload = copy.deepcopy(payload)
-
     # dict 처리
     if isinstance(payload, dict):
         field_names = list(payload.keys())
+        mutated = payload    # 바뀌기 전까지는 원본 공유
 
         # 50% 확률로 임의의 필드 하나를 제거하거나 그 값만 재귀 변형
-        if field_names and random.random() < DICT_MUTATE_PROB:
+        if field_names and random.random() < seeds.DICT_MUTATE_PROB:
             key_to_change = random.choice(field_names)
-            if random.random() < DICT_MUTATE_PROB:
+            if random.random() < seeds.DICT_MUTATE_PROB:
                 # 필드 누락
-                payload.pop(key_to_change, None)
+                mutated = dict(payload)
+                mutated.pop(key_to_change, None)
+                if trace is not None:
+                    trace.append(trace_op("drop", path + (key_to_change,)))
             else:
-                # 재귀 변형
-                payload[key_to_change] = mutate_payload(payload.get(key_to_change))
+                # 재귀 변형 (값이 그대로면 복사 생략)
+                new_value = mutate_payload(payload.get(key_to_change), path + (key_to_change,), trace)
+                if new_value is not payload.get(key_to_change):
+                    mutated = dict(payload)
+                    mutated[key_to_change] = new_value
 
         # 30% 확률로 쓰레기(junk) 필드 추가
-        if random.random() < DICT_JUNK_PROB:
+        if random.random() < seeds.DICT_JUNK_PROB:
             junk_length = random.randint(1, 50)
-            payload["__junk__"] = "".join(
+            if mutated is payload:
+                mutated = dict(payload)
+            mutated["__junk__"] = "".join(
                 random.choices(string.ascii_letters + string.digits, k=junk_length)
             )
+            if trace is not None:
+                trace.append(trace_op("junk", path))
+        return mutated
 
     # list 처리
     elif isinstance(payload, list):
-        # 각 원소 재귀 변형
-        payload = [mutate_payload(element) for element in payload]
+        # 각 원소 재귀 변형 (새 list, 바뀌지 않은 원소는 공유)
+        payload = [mutate_payload(element, path + (i,), trace) for i, element in enumerate(payload)]
 
         # 20% 확률로 None 추가
-        if random.random() < LIST_APPEND_PROB :
+        if random.random() < seeds.LIST_APPEND_PROB :
             payload.append(None)
+            if trace is not None:
+                trace.append(trace_op("list_append_none", path))
 
     # str
     elif isinstance(payload, str):
         mutation_kind = random.choice(["keep", "empty", "oversize", "as_int"])
+        if trace is not None and mutation_kind != "keep":
+            trace.append(trace_op(mutation_kind, path))
         if mutation_kind == "empty":
             return ""
         if mutation_kind == "oversize":
@@ -93,15 +128,19 @@ def mutate_payload(payload):
 
     # 숫자 처리 (int/float)
     elif isinstance(payload, (int, float)):
-        payload = random.choice([-1, 0, payload, 10**9])
+        boundary = random.choice([-1, 0, payload, 10**9])
+        if trace is not None and boundary is not payload:
+            trace.append(trace_op("num_boundary", path))
+        payload = boundary
 
     # 기타 타입은 그대로 반환
     return payload
 
-def make_variants(message_frame: list, n_variants: int):
+def make_variants(message_frame: list, n_variants: int, traces: list = None):
     """
     @param message_frame: 원본 메시지 프레임
     @param n_variants: 생성할 변형 개수
+    @param traces: 변형마다 적용한 연산 trace 문자열을 순서대로 덧붙일 리스트 (선택)
     @note: 주어진 OCPP 프레임을 여러 개 변형하여 반환합니다.
 
     프레임 구조 가정:
@@ -125,38 +164,323 @@ def make_variants(message_frame: list, n_variants: int):
 
     Returns:
         List[list]: 변형된 메시지 프레임들의 리스트
+            (payload 하위 구조는 원본과 공유될 수 있으므로 읽기 전용으로 사용)
     """
     variants = []
 
     for _ in range(n_variants):
-        # 원본을 깊은 복사하여 변형 시작
-        frame_copy = copy.deepcopy(message_frame)
+        # 프레임 최상위만 얕은 복사 (payload는 mutate_payload가 copy-on-write로 처리)
+        frame_copy = list(message_frame)
+        trace = [] if traces is not None else None
 
         # 액션(Action) 스왑
-        if len(frame_copy) >= 3 and random.random() < ACTION_SWAP_PROB:
+        if len(frame_copy) >= 3 and random.random() < seeds.ACTION_SWAP_PROB:
             frame_copy[2] = random.choice([
                 "BootNotification", "Authorize", "StartTransaction",
                 "StatusNotification", "MeterValues", "TotallyUnknownAction"
             ])
+            if trace is not None:
+                trace.append(trace_op("action"))
 
         # 페이로드 변형 - payload가 dict 또는 list인 경우
         if len(frame_copy) >= 4 and isinstance(frame_copy[3], (dict, list)):
-            frame_copy[3] = mutate_payload(frame_copy[3])
+            frame_copy[3] = mutate_payload(frame_copy[3], (), trace)
 
         # 헤더 파괴 - 10% 확률로 첫 번째 요소를 이상한 값으로 바꿈
-        if random.random() < HEADER_CORRUPT_PROB:
+        if random.random() < seeds.HEADER_CORRUPT_PROB:
             frame_copy[0] = random.choice(["2", -1, 999])
+            if trace is not None:
+                trace.append(trace_op("header"))
 
         variants.append(frame_copy)
+        if traces is not None:
+            traces.append(join_trace(trace))
 
     return variants
 
+def derive_block_seed(base_seed, block_no):
+    """
+    @param base_seed: --seed 값
+    @param block_no: 블록 번호 (0부터)
+    @return: 블록 전용 난수 시드
+    @note: 워커 수와 무관하게 같은 블록은 항상 같은 sub-seed를 사용
+    """
+    digest = hashlib.sha256(f"{base_seed}:{block_no}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def iter_block_cases(block_no, first_index, n_files, base_seed, min_variants, max_variants, baseline,
+                     mode="tree", dedup=None):
+    """
+    @param block_no: 블록 번호
+    @param first_index: 블록의 첫 파일 번호 (1부터)
+    @param n_files: 블록에서 생성할 케이스 수
+    @param base_seed: --seed 값 (블록 sub-seed 유도용)
+    @param min_variants / max_variants: 시드당 변형 개수 범위
+    @param baseline: baseline 프레임 포함 여부
+    @param mode: "tree"(make_variants 객체 변형) / "splice"(사전 직렬화 템플릿 바이트 splice)
+        / "schema"(OCPP 1.6 스키마 기반 변형, 시드 대신 스키마로 만든 액션별 기본 payload 사용)
+        / "schema-all"(schema + 서버 핸들러가 없는 Security 확장 액션 포함)
+    @param dedup: DedupIndex (선택). 이미 만든 프레임이면 최대 MAX_REROLLS 회 재생성, 그래도 중복이면 건너뜀
+    @return: (파일 번호, 안전한 액션명, "fuzz"/"baseline", 프레임, 변형 trace) Generator
+        splice 모드의 프레임은 compact JSON 바이트, baseline의 trace는 빈 문자열
+    @note: 블록 시작 시 전역 random을 sub-seed로 초기화 → 블록 출력은 워커 수와 무관
+        (같은 이유로 dedup 범위도 블록 단위)
+    """
+    random.seed(derive_block_seed(base_seed, block_no))
+    seed_pool = list(DEFAULT_SEEDS)
+    templates = get_templates() if mode == "splice" else None
+    schema = None
+    if mode in ("schema", "schema-all"):
+        schema = get_schema_mutator(include_security=mode == "schema-all")
+
+    file_index = first_index - 1    # 파일명 번호(0001, 0002, …)
+    written_count = 0               # 블록에서 실제로 만든 케이스 수
+    stalled_rounds = 0              # dedup으로 새 케이스를 하나도 못 만든 연속 반복 수
+
+    # 랜덤 생성 루프: n_files 개수 채울 때까지
+    while written_count < n_files:
+        if stalled_rounds >= MAX_STALLED_CASES:
+            # 고유 변형 공간이 목표 개수보다 작은 경우 무한 반복 방지
+            break
+        round_start_count = written_count
+
+        if schema is not None:
+            seed_frame = schema.baseline(random.choice(schema.actions))
+        else:
+            seed_no = random.randrange(len(seed_pool))
+            seed_frame = seed_pool[seed_no]
+
+        # 액션명 추출 → 파일명 안전화
+        if isinstance(seed_frame, list) and len(seed_frame) > 2:
+            action_name = seed_frame[2]
+        else:
+            action_name = "Unknown"
+        safe_action_name = normalize_action_name(str(action_name))
+
+        # (옵션) baseline 저장: baseline 플래그 on 이고, 확률에 당첨되면 저장
+        if baseline and random.random() < seeds.BASELINE_SAVE_PROB and written_count < n_files:
+            baseline_frame = templates[seed_no].data if templates else seed_frame
+            if dedup is None or not dedup.seen(baseline_frame, action_name):
+                file_index += 1
+                yield file_index, safe_action_name, "baseline", baseline_frame, ""
+                written_count += 1
+                if written_count >= n_files:
+                    break
+
+        # 변형 개수 결정 및 변형 생성
+        n_variants = random.randint(min_variants, max_variants)
+        traces = []
+        if templates is not None:
+            variant_frames = splice_variants(templates[seed_no], n_variants, traces)
+        elif schema is not None:
+            variant_frames = schema.make_variants(seed_frame, n_variants, traces)
+        else:
+            variant_frames = make_variants(seed_frame, n_variants, traces)
+
+        # 각 변형 기록
+        for variant, trace in zip(variant_frames, traces):
+            if written_count >= n_files:
+                break
+            if dedup is not None:
+                variant, trace = reroll_duplicate(dedup, variant, trace, action_name, seed_frame,
+                                                  templates[seed_no] if templates else None, schema)
+                if variant is None:
+                    continue
+            file_index += 1
+            yield file_index, safe_action_name, "fuzz", variant, trace
+            written_count += 1
+
+        stalled_rounds = stalled_rounds + 1 if written_count == round_start_count else 0
+
+
+def reroll_duplicate(dedup, variant, trace, action_name, seed_frame, template=None, schema=None):
+    """
+    @param dedup: DedupIndex
+    @param variant: 검사할 변형
+    @param trace: variant의 변형 trace
+    @param action_name: 통계용 액션 이름
+    @param seed_frame: 재생성에 쓸 원본 시드
+    @param template: splice 모드의 SeedTemplate (tree 모드는 None)
+    @param schema: schema 모드의 SchemaMutator (그 외 None)
+    @return: 중복이 아닌 (변형, trace), MAX_REROLLS 회 재생성 후에도 중복이면 (None, None)
+    """
+    for _ in range(MAX_REROLLS):
+        if not dedup.seen(variant, action_name):
+            return variant, trace
+        if template is not None:
+            variant, ops = template.mutate()
+            trace = join_trace(ops)
+        elif schema is not None:
+            variant, ops = schema.mutate(seed_frame)
+            trace = join_trace(ops)
+        else:
+            traces = []
+            variant = make_variants(seed_frame, 1, traces)[0]
+            trace = traces[0]
+    if dedup.seen(variant, action_name):
+        return None, None
+    return variant, trace
+
+
+def write_block_cases(cases, block_no, output_dir, out_format="json", compress=None):
+    """
+    @param cases: iter_block_cases() 형식의 케이스 이터러블
+    @param block_no: 블록 번호 (shard 파일 이름)
+    @param output_dir: 출력 디렉터리
+    @param out_format: "json"(케이스별 파일) / "jsonl"(단일 파일) / "shards"(블록별 shard 파일)
+    @param compress: shards 형식의 압축 (None / "gzip" / "zstd")
+    @return: (기록한 케이스 수, index 행 목록, jsonl 형식이면 인코딩된 바이트 아니면 None)
+        json 형식의 index 행은 provenance.csv 행 (PROVENANCE_FIELDS)
+    @note: jsonl은 단일 파일이므로 인코딩 결과만 반환하고 실제 기록은 main이 순서대로 수행
+    """
+    output_dir = Path(output_dir)
+
+    if out_format == "shards":
+        writer = ShardWriter(output_dir / shard_file_name(block_no, compress), compress)
+        for file_index, safe_action_name, kind, frame, trace in cases:
+            writer.write(f"{file_index:04d}_{safe_action_name}_{kind}", safe_action_name, kind, frame, trace)
+        index_rows = writer.close()
+        return len(index_rows), index_rows, None
+
+    if out_format == "jsonl":
+        chunks = []
+        index_rows = []
+        offset = 0
+        for file_index, safe_action_name, kind, frame, trace in cases:
+            line = encode_case(frame)
+            chunks.append(line)
+            index_rows.append([f"{file_index:04d}_{safe_action_name}_{kind}", JSONL_FILE_NAME,
+                               offset, len(line), safe_action_name, kind, trace])
+            offset += len(line)
+        return len(index_rows), index_rows, b"".join(chunks)
+
+    provenance_rows = []
+    for file_index, safe_action_name, kind, frame, trace in cases:
+        if isinstance(frame, bytes):
+            frame = codec.loads(frame)
+        case_id = f"{file_index:04d}_{safe_action_name}_{kind}"
+        (output_dir / f"{case_id}.json").write_text(
+            json.dumps(frame, ensure_ascii=False, indent=2),
+            encoding="utf-8"
+        )
+        provenance_rows.append([case_id, safe_action_name, kind, trace])
+    return len(provenance_rows), provenance_rows, None
+
+
+def generate_block(block_no, first_index, n_files, base_seed, output_dir, min_variants, max_variants, baseline,
+                   out_format="json", compress=None, mode="tree", use_dedup=False, tuning=None):
+    """
+    @param out_format / compress: write_block_cases() 참고
+    @param mode: 변형 방식 (MUTATION_MODES)
+    @param use_dedup: 중복 변형 제거 여부
+    @param tuning: seeds 확률 덮어쓰기 {상수 이름: 확률} (--tuning, 워커 프로세스마다 적용)
+    @return: (기록한 케이스 수, index 행 목록, jsonl 바이트 또는 None, dedup 통계, 미기록 케이스 목록 또는 None)
+    @note: 나머지 인자는 iter_block_cases() 참고.
+        프로세스 워커에서도 실행되므로 모든 인자는 pickle 가능한 값만 사용.
+        - dedup 미사용: 워커가 바로 기록 (json 파일 / 자기 블록의 shard, 블록 = shard)
+        - dedup 사용  : 블록 내 중복은 워커에서 재생성, 블록 간 중복은 main이 블록 순서대로
+                        걸러낸 뒤 기록하도록 케이스 목록을 그대로 반환 → 워커 수와 무관한 출력 유지
+    """
+    apply_tuning(tuning)
+    dedup = DedupIndex(capacity=max(1024, n_files * (MAX_REROLLS + 1))) if use_dedup else None
+    cases = iter_block_cases(block_no, first_index, n_files, base_seed, min_variants, max_variants, baseline,
+                             mode, dedup)
+
+    if dedup is not None:
+        cases = list(cases)
+        return 0, [], None, dedup.stats(), cases
+
+    count, index_rows, payload = write_block_cases(cases, block_no, output_dir, out_format, compress)
+    return count, index_rows, payload, {}, None
+
+
+def iter_pool_blocks(pool, blocks, common, window):
+    """
+    @param pool: ProcessPoolExecutor
+    @param blocks: (블록 번호, 첫 파일 번호, 파일 수) 리스트
+    @param common: generate_block()의 나머지 인자
+    @param window: 동시에 제출해 둘 최대 블록 수
+    @return: generate_block() 결과 Generator (블록 순서대로)
+    @note: 하나를 꺼낼 때마다 다음 블록을 제출 → 부모에 보관되는 블록 결과는 window개 이내
+    """
+    pending = deque()
+    blocks = iter(blocks)
+    for block in blocks:
+        pending.append(pool.submit(generate_block, *block, *common))
+        if len(pending) >= window:
+            break
+    while pending:
+        result = pending.popleft().result()
+        for block in blocks:
+            pending.append(pool.submit(generate_block, *block, *common))
+            break
+        yield result
+
+
+def collect_block_results(block_results, output_dir, out_format, compress=None, dedup_totals=None):
+    """
+    @param block_results: generate_block() 반환값들 (블록 순서대로)
+    @param output_dir: 출력 디렉터리
+    @param out_format / compress: 출력 형식 (dedup 모드에서 main이 직접 기록할 때 사용)
+    @param dedup_totals: dedup 통계를 합산할 dict (dedup 모드에서만 전달)
+    @return: 전체 케이스 수
+    @note: 블록 순서대로 index.csv(및 jsonl 본문)를 이어 써서 블록 하나 분량만 메모리에 유지.
+        dedup 모드에서는 블록 간 중복을 전역 DedupIndex로 건너뜀 (재생성 없이 제외)
+    """
+    total = 0
+    global_dedup = DedupIndex() if dedup_totals is not None else None
+    jsonl_file = open(output_dir / JSONL_FILE_NAME, "wb") if out_format == "jsonl" else None
+    try:
+        for block_no, (count, index_rows, payload, dedup_stats, cases) in enumerate(block_results):
+            if cases is not None:
+                merge_stats(dedup_totals, dedup_stats)
+                unique_cases = [case for case in cases if not global_dedup.seen(case[3], case[1])]
+                count, index_rows, payload = write_block_cases(unique_cases, block_no, output_dir,
+                                                               out_format, compress)
+            if jsonl_file is not None:
+                # 블록 내부 offset → 파일 전체 기준 offset
+                base = jsonl_file.tell()
+                for row in index_rows:
+                    row[2] += base
+                jsonl_file.write(payload)
+            if out_format == "json":
+                write_index(output_dir, index_rows, append=block_no > 0, name=PROVENANCE_FILE_NAME,
+                            fields=PROVENANCE_FIELDS)
+            else:
+                write_index(output_dir, index_rows, append=block_no > 0)
+            total += count
+    finally:
+        if jsonl_file is not None:
+            jsonl_file.close()
+
+    # 블록 간 중복은 hit로만 합산 (검사 횟수는 블록 단계에서 이미 집계)
+    if global_dedup is not None:
+        for action, hits in global_dedup.hits.items():
+            dedup_totals.setdefault(action, [0, 0])[1] += hits
+    return total
+
+
 def main():
     """
     @note: OCPP Fuzz JSON 코퍼스를 생성합니다.
         입력 시드: DEFAULT_SEEDS (각 시드는 [2, unique_id, Action, payload] 가정)
-        출력: --dir 에 fuzz/baseline JSON 파일들 기록
+        출력: --dir 에 fuzz/baseline 케이스 기록 (--format)
+              - json  : 케이스별 pretty JSON 파일 (기본)
+              - jsonl : corpus.jsonl 한 파일 + index.csv
+              - shards: --shard-size 케이스씩 shard_NNNNN.jsonl[.gz|.zst] + index.csv
         개수: --target 개수 맞출 때까지 생성 (baseline 포함 여부는 옵션/확률에 따름)
+        병렬: 파일 번호를 GENERATION_BLOCK_SIZE 단위 블록으로 나누고, 블록마다 --seed에서 유도한
+              sub-seed로 생성 → --workers 값과 무관하게 같은 --seed면 같은 출력
+              (shards 형식은 블록 크기 = --shard-size)
+        변형: --mode tree(기본, make_variants) / splice(사전 직렬화 템플릿 바이트 splice, jsonl/shards에 적합)
+              / schema(OCPP 1.6 스키마의 enum/maxLength/required/date-time 기반 경계값·타입 혼동 변형)
+              / schema-all(schema + server.py 핸들러가 없는 Security 확장 액션, 기본은 제외)
+        중복: --dedup 이면 같은 프레임을 Bloom filter로 걸러 블록 내에서는 재생성, 블록 간에는 건너뜀
+              (건너뛴 만큼 --target보다 적게 기록될 수 있음). 종료 시 액션별 hit ratio 출력
+        이력: 케이스별 변형 trace("op@경로;…")를 index.csv의 mutations 컬럼에 기록
+              (json 형식은 provenance.csv). sender가 결과 파일에 이어 써서 연산자별 수율 계산에 사용
+        조정: --tuning 이면 run_analysis.py --tune-out 으로 만든 seeds 확률을 적용해 생성
     """
     parser = argparse.ArgumentParser(description="Create OCPP Fuzz JSON corpus")
     parser.add_argument("--dir", default="corpus_out", help="출력 디렉터리")
@@ -165,65 +489,64 @@ def main():
     parser.add_argument("--max", type=int, default=5, help="Variant 최대값")
     parser.add_argument("--baseline", action="store_true", help="원본 프레임도 포함(일부 확률)")
     parser.add_argument("--seed", type=int, default=None, help="재현성용 난수 시드(예: 42)")
+    parser.add_argument("--workers", type=int, default=1, help="생성 프로세스 수 (기본: 1)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="json", help="출력 형식 (기본: json)")
+    parser.add_argument("--shard-size", type=int, default=GENERATION_BLOCK_SIZE,
+                        help="shard 하나에 담을 케이스 수 (기본: 1000)")
+    parser.add_argument("--compress", choices=["gzip", "zstd"], default=None, help="shard 압축 형식")
+    parser.add_argument("--mode", choices=MUTATION_MODES, default="tree", help="변형 방식 (기본: tree)")
+    parser.add_argument("--dedup", action="store_true", help="중복 변형 제거(재생성)")
+    parser.add_argument("--tuning", default=None, help="변형 확률 조정 파일 (run_analysis.py --tune-out)")
     args = parser.parse_args()
 
-    # 재현성(옵션)
-    if args.seed is not None:
-        random.seed(args.seed)
+    if args.compress == "zstd" and zstandard is None:
+        parser.error("--compress zstd requires the 'zstandard' package")
+    try:
+        tuning = load_tuning(args.tuning) if args.tuning else None
+    except (OSError, ValueError) as e:
+        parser.error(f"--tuning: {e}")
+
+    # 재현성(옵션): 시드가 없으면 임의로 정하고 출력 (재실행 시 --seed로 지정 가능)
+    base_seed = args.seed
+    if base_seed is None:
+        base_seed = int.from_bytes(os.urandom(4), "big")
+        print(f"seed = {base_seed}")
 
     # 출력 디렉터리 준비
     output_dir = Path(args.dir)
     make_dir(output_dir)
 
-    # 시드 풀 준비
-    seed_pool = list(DEFAULT_SEEDS)
-
     # 파라미터 정리 (하한/상한 방어)
     min_variants = max(0, args.min)
     max_variants = max(min_variants, args.max)
     target_files = max(1, args.target)
-
-    file_index = 0          # 파일명 번호(0001, 0002, …)
-    written_count = 0       # 실제로 쓴 파일 수
-
-    # 랜덤 생성 루프: target_files 개수 채울 때까지
-    while written_count < target_files:
-        seed_frame = random.choice(seed_pool)
-
-        # 액션명 추출 → 파일명 안전화
-        if isinstance(seed_frame, list) and len(seed_frame) > 2:
-            action_name = seed_frame[2]
-        else:
-            action_name = "Unknown"
-        safe_action_name = normalize_action_name(str(action_name))
-
-        # (옵션) baseline 저장: baseline 플래그 on 이고, 확률에 당첨되면 저장
-        if args.baseline and random.random() < BASELINE_SAVE_PROB and written_count < target_files:
-            file_index += 1
-            (output_dir / f"{file_index:04d}_{safe_action_name}_baseline.json").write_text(
-                json.dumps(seed_frame, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
-            written_count += 1
-            if written_count >= target_files:
-                break
-
-        # 변형 개수 결정 및 변형 생성
-        n_variants = random.randint(min_variants, max_variants)
-        variant_frames = make_variants(seed_frame, n_variants)
-
-        # 각 변형을 파일로 기록
-        for variant in variant_frames:
-            if written_count >= target_files:
-                break
-            file_index += 1
-            (output_dir / f"{file_index:04d}_{safe_action_name}_fuzz.json").write_text(
-                json.dumps(variant, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
-            written_count += 1
-
-    print(f"wrote {written_count} files to {output_dir}")
+    n_workers = max(1, args.workers)
+    block_size = max(1, args.shard_size) if args.format == "shards" else GENERATION_BLOCK_SIZE
+    compress = args.compress if args.format == "shards" else None
+
+    # 블록 분할: (블록 번호, 첫 파일 번호, 파일 수)
+    blocks = [
+        (block_no, start + 1, min(block_size, target_files - start))
+        for block_no, start in enumerate(range(0, target_files, block_size))
+    ]
+    common = (base_seed, str(output_dir), min_variants, max_variants, args.baseline, args.format, compress, args.mode,
+              args.dedup, tuning)
+    dedup_totals = {} if args.dedup else None
+
+    if n_workers == 1:
+        block_results = (generate_block(*block, *common) for block in blocks)
+        written_count = collect_block_results(block_results, output_dir, args.format, compress, dedup_totals)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            block_results = iter_pool_blocks(pool, blocks, common, n_workers * PENDING_BLOCKS_PER_WORKER)
+            written_count = collect_block_results(block_results, output_dir, args.format, compress, dedup_totals)
+
+    if args.format == "json":
+        print(f"wrote {written_count} files to {output_dir}")
+    else:
+        print(f"wrote {written_count} cases ({args.format}) to {output_dir}")
+    if dedup_totals is not None:
+        print(format_stats(dedup_totals))
 
 if __name__ == "__main__":
     main()
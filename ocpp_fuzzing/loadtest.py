@@ -0,0 +1,374 @@
+# loadtest.py
+# CSMS 부하 테스트 (충전기 대수 기준 용량 산정용)
+# - 시뮬레이션 CP N대: 접속 → BootNotification → Heartbeat / StatusNotification / MeterValues 주기 전송
+#   (프레임은 seeds.NORMAL_SEEDS 사용, 주기는 CP마다 임의 위상으로 분산)
+# - 서버: 같은 프로세스의 별도 스레드/이벤트 루프에서 CentralSystem 구동 (또는 --uri 로 외부 서버)
+# - 보고: 접속 속도, 메시지 처리량, 왕복/핸들러 지연 p50/p90/p99, 연결당 RSS, 이벤트 루프 지연
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import resource
+import threading
+import time
+
+import websockets
+
+from .sender import CallDispatcher, classify_response, replace_uid_if_enabled, DEFAULT_SUBPROTOCOLS
+from .seeds import NORMAL_SEEDS
+from .metrics import monitor_loop_lag
+from .recorder import MetricsRecorder
+from .server import serve
+from .stats import LatencyHistogram, LatencyReport
+
+DEFAULT_CPS = 100
+DEFAULT_RAMP_RATE = 200            # 초당 접속 시작 CP 수
+DEFAULT_DURATION_SEC = 30          # 첫 접속 시작부터 측정 종료까지
+DEFAULT_HEARTBEAT_SEC = 30.0       # CP당 전송 주기 (0 = 보내지 않음)
+DEFAULT_STATUS_SEC = 60.0
+DEFAULT_METER_SEC = 10.0
+DEFAULT_TIMEOUT_SEC = 10
+CONNECT_TIMEOUT_SEC = 10
+
+
+def seed_frame(action):
+    """
+    @param action: 액션 이름
+    @return: NORMAL_SEEDS 중 해당 액션의 첫 프레임
+    """
+    for frame in NORMAL_SEEDS:
+        if frame[2] == action:
+            return frame
+    raise KeyError(f"no NORMAL_SEEDS frame for {action}")
+
+
+def read_rss_kb(pid="self"):
+    """
+    @param pid: 프로세스 ID (기본: 현재 프로세스)
+    @return: 현재 RSS (kB). /proc가 없으면 최대 RSS(ru_maxrss)로 대체
+    """
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def raise_fd_limit():
+    """
+    @return: 적용된 열린 파일 수 soft limit
+    @note: 수천 개 연결을 위해 soft limit을 hard limit까지 올림
+    """
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            soft = hard
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+class InProcessServer:
+    """
+    @param host / port: 바인드 주소 (port=0 이면 임의 포트)
+    @note: 별도 스레드의 이벤트 루프에서 CentralSystem 서버를 구동.
+        클라이언트 부하 생성과 루프를 공유하지 않으므로 서버 루프 지연을 따로 측정 가능
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.metrics = MetricsRecorder()
+        self.loop_lag = LatencyHistogram()
+        self.ready = threading.Event()
+        self.error = None
+        self.loop = None
+        self._stop = None
+        self._thread = threading.Thread(target=self._run, name="loadtest-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def stop(self):
+        if self.loop is not None and self._stop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+        finally:
+            self.loop.close()
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        server = await serve(self.host, self.port, self.metrics)
+        self.port = server.sockets[0].getsockname()[1]
+        lag_task = asyncio.create_task(monitor_loop_lag(self.loop_lag, self._stop))
+        self.ready.set()
+        await self._stop.wait()
+        server.close()
+        await server.wait_closed()
+        await lag_task
+
+
+class LoadStats:
+    """
+    @note: 시뮬레이션 CP 전체의 집계 (클라이언트 루프에서만 갱신)
+    - connect  : 접속(핸드셰이크) 소요 시간 히스토그램
+    - latency  : 액션별/결과 분류별 왕복 지연
+    - results  : 결과 분류별 건수
+    """
+
+    def __init__(self):
+        self.connect = LatencyHistogram()
+        self.connect_failed = 0
+        self.first_connect_at = None
+        self.last_connect_at = None
+        self.disconnected = 0
+        self.latency = LatencyReport()
+        self.results = {}
+        self.sent = 0
+
+    def record_connect(self, started, finished):
+        self.connect.record((finished - started) * 1000.0)
+        if self.first_connect_at is None:
+            self.first_connect_at = started
+        self.last_connect_at = finished
+
+    def record_result(self, action, result, latency_ms):
+        cls = classify_response(result)
+        self.sent += 1
+        self.results[cls] = self.results.get(cls, 0) + 1
+        self.latency.record(action, cls, latency_ms)
+
+
+class SimulatedChargePoint:
+    """
+    @param cp_id: 충전기 ID (URI 경로)
+    @param uri: 서버 기준 URI (ws://host:port)
+    @param intervals: {액션: 전송 주기(초)} (0 이하는 보내지 않음)
+    @param timeout: 응답 대기 타임아웃(초)
+    @param stats: LoadStats
+    """
+
+    def __init__(self, cp_id, uri, intervals, timeout, stats):
+        self.cp_id = cp_id
+        self.uri = f"{uri.rstrip('/')}/{cp_id}"
+        self.intervals = {a: i for a, i in intervals.items() if i and i > 0}
+        self.timeout = timeout
+        self.stats = stats
+
+    async def _call(self, dispatcher, action):
+        frame = replace_uid_if_enabled(seed_frame(action), True)
+        result, timing = await dispatcher.call(frame, self.timeout)
+        self.stats.record_result(action, result, timing.parsed_ms())
+
+    async def run(self, start_delay, stop):
+        """
+        @param start_delay: 접속 시작 전 대기 (ramp-up)
+        @param stop: 종료 asyncio.Event
+        """
+        await asyncio.sleep(start_delay)
+        if stop.is_set():
+            return
+        started = time.monotonic()
+        try:
+            ws = await websockets.connect(self.uri, subprotocols=DEFAULT_SUBPROTOCOLS,
+                                          ping_interval=None, open_timeout=CONNECT_TIMEOUT_SEC)
+        except Exception:
+            self.stats.connect_failed += 1
+            return
+        self.stats.record_connect(started, time.monotonic())
+
+        dispatcher = CallDispatcher(ws)
+        try:
+            await self._call(dispatcher, "BootNotification")
+            # 고정 주기 스케줄 (CP마다 임의 위상) - 응답이 늦어도 전송 시각이 밀리지 않음
+            now = time.monotonic()
+            next_due = {a: now + random.uniform(0, i) for a, i in self.intervals.items()}
+            while not stop.is_set() and dispatcher.closed_result is None:
+                if not next_due:
+                    await stop.wait()
+                    break
+                action = min(next_due, key=next_due.get)
+                delay = next_due[action] - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(stop.wait(), delay)
+                        break
+                    except asyncio.TimeoutError:
+                        pass
+                await self._call(dispatcher, action)
+                next_due[action] += self.intervals[action]
+            if dispatcher.closed_result is not None:
+                self.stats.disconnected += 1
+        finally:
+            await dispatcher.close()
+
+
+def format_histogram_row(name, hist):
+    if hist.total == 0:
+        return f"{name[:35]:35s} {0:8d}"
+    return (f"{name[:35]:35s} {hist.total:8d} {hist.percentile(50):9.2f} {hist.percentile(90):9.2f} "
+            f"{hist.percentile(99):9.2f} {hist.max_ms:9.2f}")
+
+
+def build_summary(n_cps, stats, elapsed, rss_before, rss_connected, server=None):
+    """
+    @return: 요약 dict (--report-json 출력과 format_summary() 입력)
+    """
+    connected = stats.connect.total
+    ramp_sec = (stats.last_connect_at - stats.first_connect_at) if connected else 0.0
+    summary = {
+        "cps": n_cps,
+        "connected": connected,
+        "connect_failed": stats.connect_failed,
+        "disconnected": stats.disconnected,
+        "connect_rate_per_sec": connected / ramp_sec if ramp_sec > 0 else float(connected),
+        "connect_ms_p50": stats.connect.percentile(50),
+        "connect_ms_p99": stats.connect.percentile(99),
+        "messages": stats.sent,
+        "elapsed_sec": elapsed,
+        "throughput_msg_per_sec": stats.sent / elapsed if elapsed > 0 else 0.0,
+        "results": dict(stats.results),
+        "rss_kb_before": rss_before,
+        "rss_kb_connected": rss_connected,
+        "rss_kb_per_connection": (rss_connected - rss_before) / connected if connected else None,
+    }
+    if server is not None:
+        summary["server_loop_lag_ms_p99"] = server.loop_lag.percentile(99)
+        summary["server_loop_lag_ms_max"] = server.loop_lag.max_ms
+    return summary
+
+
+def format_summary(summary, stats, client_lag, server=None):
+    """
+    @return: 사람이 읽는 보고서 문자열
+    """
+    lines = [
+        f"simulated CPs      : {summary['cps']} (connected {summary['connected']}, "
+        f"failed {summary['connect_failed']}, dropped {summary['disconnected']})",
+        f"connection setup   : {summary['connect_rate_per_sec']:.1f} conn/s, "
+        f"handshake p50 {summary['connect_ms_p50'] or 0:.2f} ms / p99 {summary['connect_ms_p99'] or 0:.2f} ms",
+        f"message throughput : {summary['messages']} msgs in {summary['elapsed_sec']:.1f} s "
+        f"= {summary['throughput_msg_per_sec']:.1f} msg/s",
+        "results            : " + ", ".join(f"{k}={v}" for k, v in sorted(summary["results"].items())),
+    ]
+    if summary["rss_kb_per_connection"] is not None:
+        lines.append(f"RSS per connection : {summary['rss_kb_per_connection']:.1f} kB "
+                     f"({summary['rss_kb_before']} -> {summary['rss_kb_connected']} kB)")
+    lines.append("")
+    lines.append(stats.latency.format())
+
+    header = f"{'':35s} {'count':>8s} {'p50':>9s} {'p90':>9s} {'p99':>9s} {'max':>9s}"
+    if server is not None:
+        lines += ["", "server handler time (ms, frame received -> reply sent)", header]
+        by_action = server.metrics.report.by_action
+        for action in sorted(by_action):
+            lines.append(format_histogram_row(action, by_action[action]))
+    lines += ["", "event-loop lag (ms)", header]
+    if server is not None:
+        lines.append(format_histogram_row("server loop", server.loop_lag))
+    lines.append(format_histogram_row("client loop (load generator)", client_lag))
+    return "\n".join(lines)
+
+
+async def main():
+    """
+    @note:
+    - --cps : 시뮬레이션 CP 수
+    - --ramp-rate : 초당 접속 시작 CP 수
+    - --duration : 첫 접속 시작부터 측정 종료까지(초)
+    - --heartbeat / --status / --meter : CP당 각 메시지 전송 주기(초, 0 = 끔)
+    - --uri : 외부 서버 기준 URI (없으면 같은 프로세스에서 CentralSystem 구동)
+    - --server-pid : 외부 서버 PID (연결당 RSS를 그 프로세스 기준으로 측정)
+    - --report-json : 요약을 JSON으로 저장
+    - 연결당 RSS: (전체 접속 후 RSS - 시작 전 RSS) / 접속 수.
+      내장 서버 모드에서는 클라이언트 측 객체도 포함되므로 상한값으로 해석
+    - 내장 서버는 부하 생성기와 GIL을 나눠 쓰므로, 노드 용량 산정 수치는 --uri 외부 서버 기준으로 볼 것
+    """
+    parser = argparse.ArgumentParser(description="Load-test the OCPP CSMS with simulated charge points.")
+    parser.add_argument("--cps", type=int, default=DEFAULT_CPS, help="시뮬레이션 CP 수")
+    parser.add_argument("--ramp-rate", type=float, default=DEFAULT_RAMP_RATE, help="초당 접속 시작 CP 수")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION_SEC, help="측정 시간(초)")
+    parser.add_argument("--heartbeat", type=float, default=DEFAULT_HEARTBEAT_SEC, help="Heartbeat 주기(초)")
+    parser.add_argument("--status", type=float, default=DEFAULT_STATUS_SEC, help="StatusNotification 주기(초)")
+    parser.add_argument("--meter", type=float, default=DEFAULT_METER_SEC, help="MeterValues 주기(초)")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT_SEC, help="응답 타임아웃(초)")
+    parser.add_argument("--uri", default=None, help="외부 서버 URI (예: ws://127.0.0.1:9000)")
+    parser.add_argument("--server-pid", type=int, default=None, help="외부 서버 PID (RSS 측정용)")
+    parser.add_argument("--cp-prefix", default="LOADCP", help="CP ID 접두어")
+    parser.add_argument("--report-json", default=None, help="요약 JSON 저장 경로")
+    parser.add_argument("--seed", type=int, default=None, help="전송 위상 난수 시드")
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    fd_limit = raise_fd_limit()
+    if args.cps * 2 + 64 > fd_limit:
+        print(f"warning: open file limit {fd_limit} may be too low for {args.cps} connections")
+
+    server = None
+    rss_pid = "self"
+    if args.uri is None:
+        logging.getLogger("ocpp-server").setLevel(logging.WARNING)
+        server = InProcessServer().start()
+        base_uri = f"ws://127.0.0.1:{server.port}"
+    else:
+        base_uri = args.uri
+        if args.server_pid is not None:
+            rss_pid = args.server_pid
+
+    intervals = {"Heartbeat": args.heartbeat, "StatusNotification": args.status, "MeterValues": args.meter}
+    stats = LoadStats()
+    client_lag = LatencyHistogram()
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(monitor_loop_lag(client_lag, stop))
+
+    rss_before = read_rss_kb(rss_pid)
+    cps = [SimulatedChargePoint(f"{args.cp_prefix}_{i:05d}", base_uri, intervals, args.timeout, stats)
+           for i in range(args.cps)]
+    ramp_rate = max(args.ramp_rate, 1e-6)
+    started = time.monotonic()
+    tasks = [asyncio.create_task(cp.run(i / ramp_rate, stop)) for i, cp in enumerate(cps)]
+
+    # 모든 CP의 접속 시도가 끝난 시점의 RSS를 기록
+    while stats.connect.total + stats.connect_failed < args.cps and time.monotonic() - started < args.duration:
+        await asyncio.sleep(0.1)
+    rss_connected = read_rss_kb(rss_pid)
+
+    remaining = args.duration - (time.monotonic() - started)
+    if remaining > 0:
+        await asyncio.sleep(remaining)
+    stop.set()
+    elapsed = time.monotonic() - started
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await lag_task
+    if server is not None:
+        server.stop()
+
+    summary = build_summary(args.cps, stats, elapsed, rss_before, rss_connected, server)
+    print(format_summary(summary, stats, client_lag, server))
+    if args.report_json:
+        with open(args.report_json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"wrote report: {args.report_json}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
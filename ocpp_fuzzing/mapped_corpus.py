@@ -0,0 +1,453 @@
+# mapped_corpus.py
+# 임의 접근용 코퍼스 리더 (mmap + 배열 offset 인덱스)
+# - index.csv를 한 번 읽어 index.bin(고정 폭 배열)으로 컴파일, 이후에는 index.bin을 mmap으로 열어
+#   필요한 부분만 페이지 단위로 읽음 (코퍼스 크기와 무관하게 바로 열림, index.csv가 바뀌면 다시 컴파일)
+#   배열: offset/csv_offset(Q), length/shard/number/by_action(I), action(H)
+#   by_action: 액션별로 묶은 행 번호 (액션 필터/층화 표본이 payload를 읽지 않고 구간 slice로 끝남)
+# - 케이스 조회: case_id 앞 번호로 O(1) (번호가 연속이면 계산, 아니면 번호→행 dict 한 번 생성)
+# - shard: 비압축은 mmap (zero-copy memoryview slice), .gz/.zst는 한 번 통째로 해제해 메모리에 둠
+#   (압축 shard는 임의 접근이 안 되므로 큰 코퍼스를 표본 추출할 때는 비압축 shard 권장)
+#   열어 두는 shard 수는 MAX_OPEN_SHARDS 이내 (LRU)
+# - iter_records(raw=True): (case_id, None, trace, 원본 줄 memoryview) - 파싱하지 않음, sender --raw-send 가 그대로 전송
+
+import argparse
+import array
+import csv
+import io
+import json
+import mmap
+import os
+import random
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+from . import codec
+from .corpus import INDEX_FILE_NAME, open_shard_read
+
+BIN_FILE_NAME = "index.bin"
+BIN_FORMAT = 1
+# index.bin 배열 (이름, array 타입 코드) - 정렬을 위해 큰 타입부터
+INDEX_ARRAYS = [("offset", "Q"), ("csv_offset", "Q"), ("length", "I"), ("shard", "I"), ("number", "I"),
+                ("by_action", "I"), ("action", "H")]
+HEADER_ALIGN = 8               # 헤더 줄 길이를 맞출 바이트 수 (배열 시작 정렬)
+MAX_OPEN_SHARDS = 64           # 동시에 열어 두는 shard 수 (mmap / 해제된 압축 shard)
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+
+def case_number(case_id):
+    """
+    @param case_id: "0042_Authorize_fuzz" 형태 또는 번호 문자열
+    @return: 앞 번호 (없으면 None)
+    """
+    head = str(case_id).split("_", 1)[0]
+    return int(head) if head.isdigit() else None
+
+
+def _iter_index_rows(f):
+    """
+    @param f: index.csv 바이너리 파일 객체
+    @return: (행 시작 바이트 위치, 행 리스트) Generator (헤더 포함)
+    @note: csv.reader는 한 행에 필요한 줄만 읽으므로 읽은 줄의 첫 위치가 행 시작 위치
+    """
+    starts = []
+
+    def lines():
+        pos = f.tell()
+        for line in f:
+            starts.append(pos)
+            pos += len(line)
+            yield line.decode("utf-8")
+
+    for row in csv.reader(lines()):
+        start = starts[0]
+        starts.clear()
+        if row:
+            yield start, row
+
+
+def compile_index(directory):
+    """
+    @param directory: index.csv가 있는 코퍼스 디렉터리
+    @return: (헤더 dict, {배열 이름: array.array})
+    """
+    directory = Path(directory)
+    source = directory / INDEX_FILE_NAME
+    columns = {name: array.array(code) for name, code in INDEX_ARRAYS}
+    shard_ids = {}
+    action_ids = {}
+    numbered = True
+    with source.open("rb") as f:
+        rows = _iter_index_rows(f)
+        _, header = next(rows)
+        col = {name: header.index(name) for name in ("case_id", "shard", "offset", "length", "action")}
+        for start, row in rows:
+            number = case_number(row[col["case_id"]])
+            if number is None:
+                numbered = False
+                number = 0
+            columns["offset"].append(int(row[col["offset"]]))
+            columns["csv_offset"].append(start)
+            columns["length"].append(int(row[col["length"]]))
+            columns["shard"].append(shard_ids.setdefault(row[col["shard"]], len(shard_ids)))
+            columns["number"].append(number)
+            columns["action"].append(action_ids.setdefault(row[col["action"]], len(action_ids)))
+
+    count = len(columns["offset"])
+    # 액션별 구간: 액션 번호 순서로 행 번호를 묶음 (구간 안은 코퍼스 순서 유지)
+    totals = [0] * len(action_ids)
+    for action_id in columns["action"]:
+        totals[action_id] += 1
+    ranges = []
+    position = 0
+    for total in totals:
+        ranges.append([position, position + total])
+        position += total
+    cursor = [start for start, _ in ranges]
+    by_action = columns["by_action"] = array.array("I", [0]) * count
+    for row_no, action_id in enumerate(columns["action"]):
+        by_action[cursor[action_id]] = row_no
+        cursor[action_id] += 1
+
+    numbers = columns["number"]
+    first = numbers[0] if count else 0
+    contiguous = numbered and all(n == first + i for i, n in enumerate(numbers))
+    stat = source.stat()
+    header = {"format": BIN_FORMAT, "count": count, "source_size": stat.st_size,
+              "source_mtime_ns": stat.st_mtime_ns, "shards": list(shard_ids), "actions": list(action_ids),
+              "action_ranges": ranges, "numbered": numbered, "contiguous": contiguous, "first_number": first}
+    return header, columns
+
+
+def write_index_bin(path, header, columns):
+    """
+    @param path: index.bin 경로
+    @note: 헤더(JSON 한 줄, HEADER_ALIGN 배수 길이) + INDEX_ARRAYS 순서의 배열 원본 바이트.
+        임시 파일에 쓴 뒤 교체하므로 읽는 쪽이 반쯤 쓴 파일을 보지 않음
+    """
+    line = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    line += b" " * (-(len(line) + 1) % HEADER_ALIGN) + b"\n"
+    tmp = Path(f"{path}.tmp{os.getpid()}")
+    with tmp.open("wb") as f:
+        f.write(line)
+        for name, _ in INDEX_ARRAYS:
+            columns[name].tofile(f)
+    os.replace(tmp, path)
+
+
+def _is_fresh(header, source):
+    stat = source.stat()
+    return (header.get("format") == BIN_FORMAT and header.get("source_size") == stat.st_size
+            and header.get("source_mtime_ns") == stat.st_mtime_ns)
+
+
+class MappedCorpus:
+    """
+    @param directory: index.csv가 있는 코퍼스 디렉터리 (generator --format jsonl/shards)
+    @param rebuild: index.bin을 무조건 다시 컴파일
+    @note: index.bin을 쓸 수 없는 디렉터리(읽기 전용)면 메모리에만 컴파일해 사용
+    """
+
+    def __init__(self, directory, rebuild=False):
+        self.directory = Path(directory)
+        source = self.directory / INDEX_FILE_NAME
+        bin_path = self.directory / BIN_FILE_NAME
+        self._index_map = None
+        self.header = None
+        if not rebuild and bin_path.exists():
+            self._open_bin(bin_path)
+            if not _is_fresh(self.header, source):
+                self._close_index_map()
+                self.header = None
+        if self.header is None:
+            header, columns = compile_index(self.directory)
+            try:
+                write_index_bin(bin_path, header, columns)
+                self._open_bin(bin_path)
+            except OSError:
+                self.header = header
+                self.columns = {name: memoryview(columns[name]) for name, _ in INDEX_ARRAYS}
+        self.count = self.header["count"]
+        self.shards = self.header["shards"]
+        self.actions = self.header["actions"]
+        self._action_ids = {name: i for i, name in enumerate(self.actions)}
+        self._by_number = None
+        self._by_case_id = None
+        self._open_shards = OrderedDict()
+        self._index_file = None
+
+    def _open_bin(self, path):
+        with open(path, "rb") as f:
+            self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        line_end = self._index_map.find(b"\n") + 1
+        self.header = json.loads(self._index_map[:line_end])
+        view = memoryview(self._index_map)
+        position = line_end
+        self.columns = {}
+        for name, code in INDEX_ARRAYS:
+            size = array.array(code).itemsize * self.header["count"]
+            self.columns[name] = view[position:position + size].cast(code)
+            position += size
+
+    def _close_index_map(self):
+        if self._index_map is not None:
+            for column in getattr(self, "columns", {}).values():
+                column.release()
+            self.columns = {}
+            self._index_map.close()
+            self._index_map = None
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        for buf in self._open_shards.values():
+            if isinstance(buf, mmap.mmap):
+                try:
+                    buf.close()
+                except BufferError:  # 밖에서 아직 쓰는 slice가 있으면 GC에 맡김
+                    pass
+        self._open_shards.clear()
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+        try:
+            self._close_index_map()
+        except BufferError:
+            pass
+
+    # ---- 조회 ----
+
+    def action_counts(self):
+        """
+        @return: {액션 이름: 케이스 수}
+        """
+        return {name: end - start for name, (start, end) in zip(self.actions, self.header["action_ranges"])}
+
+    def action(self, row):
+        return self.actions[self.columns["action"][row]]
+
+    def rows_for_action(self, action):
+        """
+        @param action: 액션 이름
+        @return: 그 액션의 행 번호 시퀀스 (memoryview slice, 코퍼스 순서), 없으면 빈 시퀀스
+        """
+        action_id = self._action_ids.get(action)
+        if action_id is None:
+            return ()
+        start, end = self.header["action_ranges"][action_id]
+        return self.columns["by_action"][start:end]
+
+    def index_row(self, row):
+        """
+        @param row: 행 번호
+        @return: index.csv 행 dict (case_id, shard, offset, length, action, kind, mutations)
+        """
+        if self._index_file is None:
+            self._index_file = (self.directory / INDEX_FILE_NAME).open("rb")
+            _, self._index_header = next(_iter_index_rows(self._index_file))
+        self._index_file.seek(self.columns["csv_offset"][row])
+        line = self._index_file.readline().decode("utf-8")
+        values = next(csv.reader(io.StringIO(line)))
+        return dict(zip(self._index_header, values))
+
+    def find(self, case_id):
+        """
+        @param case_id: case_id 전체 또는 앞 번호 (예: "0042_Authorize_fuzz", "42", 42)
+        @return: 행 번호, 없으면 None
+        @note: 번호가 연속이면 계산만으로 O(1), 아니면 처음 한 번 번호→행 dict 생성
+        """
+        number = case_number(case_id)
+        if self.header["numbered"] and number is not None:
+            if self.header["contiguous"]:
+                row = number - self.header["first_number"]
+                row = row if 0 <= row < self.count else None
+            else:
+                if self._by_number is None:
+                    self._by_number = {n: i for i, n in enumerate(self.columns["number"])}
+                row = self._by_number.get(number)
+        else:
+            if self._by_case_id is None:
+                self._by_case_id = {}
+                with (self.directory / INDEX_FILE_NAME).open("rb") as f:
+                    rows = _iter_index_rows(f)
+                    _, header = next(rows)
+                    column = header.index("case_id")
+                    for row_no, (_, row) in enumerate(rows):
+                        self._by_case_id[row[column]] = row_no
+            row = self._by_case_id.get(str(case_id))
+        if row is None or (isinstance(case_id, str) and "_" in case_id
+                           and self.index_row(row)["case_id"] != case_id):
+            return None
+        return row
+
+    def _shard_buffer(self, shard_id):
+        buf = self._open_shards.get(shard_id)
+        if buf is not None:
+            self._open_shards.move_to_end(shard_id)
+            return buf
+        path = self.directory / self.shards[shard_id]
+        if path.name.lower().endswith(COMPRESSED_SUFFIXES):
+            with open_shard_read(path) as f:
+                buf = f.read()
+        elif path.stat().st_size == 0:
+            buf = b""
+        else:
+            with open(path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._open_shards[shard_id] = buf
+        if len(self._open_shards) > MAX_OPEN_SHARDS:
+            _, old = self._open_shards.popitem(last=False)
+            if isinstance(old, mmap.mmap):
+                try:
+                    old.close()
+                except BufferError:
+                    pass
+        return buf
+
+    def raw(self, row):
+        """
+        @param row: 행 번호
+        @return: 케이스 한 줄 (개행 제외) memoryview - 복사 없이 shard 버퍼를 가리킴
+        """
+        columns = self.columns
+        buf = self._shard_buffer(columns["shard"][row])
+        start = columns["offset"][row]
+        end = start + columns["length"][row]
+        if end > start and buf[end - 1:end] == b"\n":
+            end -= 1
+        return memoryview(buf)[start:end]
+
+    def frame(self, row):
+        """
+        @param row: 행 번호
+        @return: 파싱한 프레임
+        """
+        return codec.loads(bytes(self.raw(row)))
+
+    # ---- 표본 ----
+
+    def sample(self, count=None, rate=None, stratify=False, actions=None, rng=None):
+        """
+        @param count: 표본 수 (rate와 둘 중 하나)
+        @param rate: 표본 비율 (0~1)
+        @param stratify: 액션별 층화 - rate면 액션마다 max(1, 비율), count면 액션마다 같은 수(부족하면 전부)
+        @param actions: 대상 액션 이름 목록 (None = 전체)
+        @param rng: random.Random (재현용, 기본: 모듈 random)
+        @return: 정렬된 행 번호 리스트 (shard 순서로 읽히도록)
+        """
+        rng = rng or random
+        names = self.actions if actions is None else [a for a in actions if a in self._action_ids]
+        groups = [self.rows_for_action(name) for name in names]
+        if actions is None and not stratify:
+            groups = [range(self.count)]
+        elif not stratify:
+            groups = [[row for group in groups for row in group]]
+
+        def take(group, k):
+            k = max(0, min(len(group), k))
+            return [group[i] for i in rng.sample(range(len(group)), k)]
+
+        picked = []
+        if stratify:
+            groups = [g for g in groups if len(g)]
+            if rate is not None:
+                for group in groups:
+                    picked.extend(take(group, max(1, round(len(group) * rate))))
+            elif groups:
+                per_action = -(-count // len(groups))
+                for group in groups:
+                    picked.extend(take(group, per_action))
+        else:
+            group = groups[0]
+            picked = take(group, round(len(group) * rate) if rate is not None else count)
+        return sorted(picked)
+
+    def iter_records(self, rows=None, raw=False):
+        """
+        @param rows: 행 번호 이터러블 (None = 전체, 코퍼스 순서)
+        @param raw: True면 줄을 파싱하지 않고 parsed 자리에 None, 원본 줄 memoryview를 4번째 값으로 반환
+        @return: (Path(case_id), parsed, 변형 trace[, 원본 줄]) Generator - sender.iter_input_records() 형식
+        """
+        for row in (range(self.count) if rows is None else rows):
+            entry = self.index_row(row)
+            line = self.raw(row)
+            if raw:
+                yield Path(entry["case_id"]), None, entry.get("mutations") or "", line
+            else:
+                yield Path(entry["case_id"]), codec.loads(bytes(line)), entry.get("mutations") or ""
+
+
+def select_rows(corpus, actions=None, rate=None, count=None, stratify=False, seed=None):
+    """
+    @param corpus: MappedCorpus
+    @param actions: 대상 액션 목록 (None = 전체)
+    @param rate / count: 표본 비율 / 수 (둘 다 None이면 대상 전체)
+    @param stratify: 액션별 층화
+    @param seed: 재현용 시드
+    @return: 정렬된 행 번호 시퀀스
+    """
+    if rate is None and count is None:
+        if actions is None:
+            return range(len(corpus))
+        return sorted(row for action in actions for row in corpus.rows_for_action(action))
+    return corpus.sample(count=count, rate=rate, stratify=stratify, actions=actions, rng=random.Random(seed))
+
+
+def main():
+    """
+    @note:
+    - 코퍼스 디렉터리(index.csv)의 index.bin 컴파일 + 조회
+    - --actions : 액션별 케이스 수
+    - --find ID : 케이스 프레임 출력 (여러 번 지정 가능)
+    - --sample-rate / --sample-count (+ --stratify, --action, --seed) : 표본을 JSONL로 출력 (--out, 기본 stdout)
+      출력 JSONL은 sender / minimizer --input 으로 바로 사용
+    """
+    parser = argparse.ArgumentParser(description="Random access and sampling over an indexed corpus directory.")
+    parser.add_argument("directory", help="index.csv가 있는 코퍼스 디렉터리")
+    parser.add_argument("--rebuild", action="store_true", help="index.bin 다시 컴파일")
+    parser.add_argument("--actions", action="store_true", help="액션별 케이스 수 출력")
+    parser.add_argument("--find", action="append", default=[], help="case_id 또는 번호로 케이스 출력")
+    parser.add_argument("--action", action="append", default=None, help="표본 대상 액션 (여러 번 지정 가능)")
+    parser.add_argument("--sample-rate", type=float, default=None, help="표본 비율 (0~1)")
+    parser.add_argument("--sample-count", type=int, default=None, help="표본 수")
+    parser.add_argument("--stratify", action="store_true", help="액션별 층화 표본")
+    parser.add_argument("--seed", type=int, default=None, help="표본 재현용 시드")
+    parser.add_argument("--out", default=None, help="표본 JSONL 출력 경로 (기본: stdout)")
+    args = parser.parse_args()
+    if args.sample_rate is not None and args.sample_count is not None:
+        parser.error("use only one of --sample-rate or --sample-count")
+
+    corpus = MappedCorpus(args.directory, rebuild=args.rebuild)
+    try:
+        if args.actions:
+            for name, count in sorted(corpus.action_counts().items(), key=lambda kv: (-kv[1], kv[0])):
+                print(f"{name:35s} {count:10d}")
+            print(f"{'(total)':35s} {len(corpus):10d}")
+        for case_id in args.find:
+            row = corpus.find(case_id)
+            if row is None:
+                print(f"{case_id}: not found", file=sys.stderr)
+                continue
+            entry = corpus.index_row(row)
+            print(f"# {entry['case_id']} ({entry['shard']}:{entry['offset']}) mutations={entry.get('mutations', '')}")
+            print(bytes(corpus.raw(row)).decode("utf-8"))
+        selected = args.action is not None or args.sample_rate is not None or args.sample_count is not None
+        if selected:
+            rows = select_rows(corpus, args.action, args.sample_rate, args.sample_count, args.stratify, args.seed)
+            out = open(args.out, "wb") if args.out else sys.stdout.buffer
+            try:
+                for row in rows:
+                    out.write(corpus.raw(row))
+                    out.write(b"\n")
+            finally:
+                if args.out:
+                    out.close()
+            if args.out:
+                print(f"wrote {len(rows)} cases: {args.out}")
+    finally:
+        corpus.close()
+
+
+if __name__ == "__main__":
+    main()
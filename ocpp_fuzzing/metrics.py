@@ -0,0 +1,320 @@
+# metrics.py
+# 실행 중 지표 노출 (Prometheus text format 0.0.4) + 주기적 상태 줄
+# - Counter / Gauge / Histogram: 이벤트 루프 스레드 하나에서만 갱신하므로 락 없이 dict 값만 더함
+#   (스레드 간 공유하지 않음. 멀티 프로세스 서버는 워커마다 자기 포트에 엔드포인트를 염)
+# - 라벨 값 종류가 MAX_LABEL_SERIES 를 넘으면 이후 값은 "other"로 합침 (퍼징 입력의 임의 액션 이름 등)
+# - serve_metrics(): 같은 이벤트 루프에서 도는 최소 HTTP 서버, GET /metrics 에 현재 값을 텍스트로 응답
+# - SenderMetrics: 전송/결과 분류/응답 대기 수/재연결/fault/응답 지연/이벤트 루프 지연
+# - ServerMetrics: CentralSystem recorder 자리에 끼워 액션별 처리 시간/응답 종류/파싱 오류 집계
+# - StatusLine: 케이스마다 출력하는 대신 interval 초마다 요약 한 줄 출력 (콘솔 출력 비용 제한)
+
+import asyncio
+import bisect
+import re
+import time
+
+from .recorder import reply_kind
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# 히스토그램 버킷 상한 (초)
+DEFAULT_BUCKETS_SEC = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_LABEL_SERIES = 64           # 메트릭 하나의 라벨 조합 최대 수 (넘으면 "other")
+OVERFLOW_LABEL = "other"
+HTTP_READ_TIMEOUT_SEC = 5.0     # /metrics 요청 헤더 읽기 타임아웃
+LOOP_LAG_INTERVAL_SEC = 0.05    # 이벤트 루프 지연 측정 주기
+DEFAULT_STATUS_INTERVAL_SEC = 5.0
+STATUS_TOP_RESULTS = 4          # 상태 줄에 보일 결과 분류 수
+EXC_LABEL_RE = re.compile(r"EXC:[A-Z_]+")   # 라벨로 그대로 쓸 EXC 결과 (예외 메시지 문장은 "EXC"로 합침)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """
+    @param name: 메트릭 이름 (단위 접미사 포함, 예: ocpp_fuzz_sends_total)
+    @param help_text: HELP 설명
+    @param labelnames: 라벨 이름 튜플
+    @note: series = {라벨 값 튜플: 값}. 라벨 값 개수는 labelnames와 같아야 함
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.series = {}
+
+    def _key(self, labels):
+        key = tuple(str(v) for v in labels)
+        if key not in self.series and len(self.series) >= MAX_LABEL_SERIES:
+            key = (OVERFLOW_LABEL,) * len(self.labelnames)
+        return key
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for key in sorted(self.series):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(self.series[key])}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        self.series[key] = self.series.get(key, 0) + amount
+
+    def value(self, *labels):
+        return self.series.get(tuple(str(v) for v in labels), 0)
+
+    def total(self):
+        return sum(self.series.values())
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        self.series[self._key(labels)] = value
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        self.series[key] = self.series.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels):
+        return self.series.get(tuple(str(v) for v in labels), 0)
+
+
+class Histogram(Metric):
+    """
+    @param buckets: 버킷 상한 (초, 오름차순)
+    @note: record()는 ms 단위로 받아 초 단위로 저장 (stats.LatencyHistogram.record와 같은 호출 형식).
+        series 값 = [버킷별 개수 리스트(+Inf 포함), 합계(초), 개수]
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS_SEC):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def record(self, value_ms, *labels):
+        if value_ms is None:
+            return
+        value = max(0.0, float(value_ms)) / 1000.0
+        key = self._key(labels)
+        entry = self.series.get(key)
+        if entry is None:
+            entry = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for key in sorted(self.series):
+            counts, total, count = self.series[key]
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    @note: 메트릭 모음. render()가 /metrics 응답 본문
+    """
+
+    def __init__(self):
+        self.metrics = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._add(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS_SEC):
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+async def serve_metrics(registry, host=DEFAULT_METRICS_HOST, port=0):
+    """
+    @param registry: MetricsRegistry
+    @param host / port: 바인드 주소 (port=0 이면 임의 포트, server.sockets로 확인)
+    @return: asyncio 서버
+    @note: GET /metrics 만 응답 (그 외 404). 요청마다 연결을 닫는 HTTP/1.0 방식
+    """
+    async def handle(reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readline(), HTTP_READ_TIMEOUT_SEC)
+            while True:
+                header = await asyncio.wait_for(reader.readline(), HTTP_READ_TIMEOUT_SEC)
+                if header in (b"\r\n", b"\n", b""):
+                    break
+            parts = request.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1].split(b"?")[0] == b"/metrics":
+                status, body = "200 OK", registry.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(f"HTTP/1.0 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii") + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def monitor_loop_lag(hist, stop, interval=LOOP_LAG_INTERVAL_SEC):
+    """
+    @param hist: 지연을 기록할 히스토그램 (stats.LatencyHistogram 또는 Histogram, ms 단위 record)
+    @param stop: 종료 asyncio.Event
+    @note: sleep(interval)이 예정보다 늦게 깨어난 시간 = 이벤트 루프가 막혀 있던 시간
+    """
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        hist.record(max(0.0, loop.time() - expected) * 1000.0)
+
+
+def result_label(result_class):
+    """
+    @param result_class: sender.classify_response() 결과
+    @return: 라벨 값 (예외 메시지가 들어간 "EXC:<문장>"은 "EXC"로 합침)
+    """
+    if result_class.startswith("EXC:") and not EXC_LABEL_RE.fullmatch(result_class):
+        return "EXC"
+    return result_class
+
+
+class SenderMetrics:
+    """
+    @param registry: MetricsRegistry (기본: 새로 생성)
+    @note: ReplaySession.metrics 로 주입. 재전송(연결 장애)도 전송 1건으로 셈
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.sends = r.counter("ocpp_fuzz_sends_total", "Frames written to the WebSocket, including resends")
+        self.results = r.counter("ocpp_fuzz_results_total", "Finished cases by result class", ("result",))
+        self.inflight = r.gauge("ocpp_fuzz_inflight", "Frames sent and still waiting for a reply")
+        self.reconnects = r.counter("ocpp_fuzz_reconnects_total", "Session reconnects after a closed connection")
+        self.faults = r.counter("ocpp_fuzz_faults_total", "Cases tagged with a connection fault", ("fault",))
+        self.reply_seconds = r.histogram("ocpp_fuzz_reply_seconds", "Send to parsed reply latency", ("action",))
+        self.loop_lag = r.histogram("ocpp_fuzz_event_loop_lag_seconds", "Event-loop wake-up delay")
+
+    def record_result(self, action, result_class, parsed_ms, fault=""):
+        self.results.inc(result_label(result_class))
+        self.reply_seconds.record(parsed_ms, action)
+        if fault:
+            self.faults.inc(fault)
+
+
+class ServerMetrics:
+    """
+    @param registry: MetricsRegistry (기본: 새로 생성)
+    @param inner: 레코드를 이어서 넘길 recorder (예: CaseRecorder, 선택)
+    @note: CentralSystem recorder 자리에 끼우는 집계기 (recorder.MetricsRecorder와 같은 방식)
+    """
+
+    def __init__(self, registry=None, inner=None):
+        self.registry = registry or MetricsRegistry()
+        self.inner = inner
+        r = self.registry
+        self.messages = r.counter("ocpp_server_messages_total", "Received frames by action and reply kind",
+                                  ("action", "reply"))
+        self.parse_errors = r.counter("ocpp_server_parse_errors_total", "Frames that failed to parse", ("code",))
+        self.handler_seconds = r.histogram("ocpp_server_handler_seconds", "CentralSystem handling time per frame",
+                                           ("action",))
+        self.loop_lag = r.histogram("ocpp_server_event_loop_lag_seconds", "Event-loop wake-up delay")
+
+    def add(self, record):
+        action = record.get("action") or "(non-call)"
+        self.messages.inc(action, reply_kind(record.get("reply")))
+        if record.get("parse", "ok") != "ok":
+            self.parse_errors.inc(record["parse"])
+        self.handler_seconds.record(record["handler_ms"], action)
+        if self.inner is not None:
+            self.inner.add(record)
+
+    def close(self):
+        if self.inner is not None:
+            self.inner.close()
+
+
+class StatusLine:
+    """
+    @param metrics: SenderMetrics
+    @param interval: 출력 주기 (초)
+    @note: 직전 출력 이후 전송률과 누적 결과 분류 상위 STATUS_TOP_RESULTS개를 한 줄로 출력
+    """
+
+    def __init__(self, metrics, interval=DEFAULT_STATUS_INTERVAL_SEC):
+        self.metrics = metrics
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last = (self.started, 0)
+
+    def format(self):
+        now = time.monotonic()
+        finished = int(self.metrics.results.total())
+        last_time, last_finished = self._last
+        self._last = (now, finished)
+        rate = (finished - last_finished) / (now - last_time) if now > last_time else 0.0
+        top = sorted(self.metrics.results.series.items(), key=lambda kv: (-kv[1], kv[0]))[:STATUS_TOP_RESULTS]
+        classes = ", ".join(f"{key[0]} {count}" for key, count in top)
+        return (f"[STATUS] {now - self.started:7.1f}s done {finished} ({rate:.1f}/s) "
+                f"sends {int(self.metrics.sends.total())} inflight {int(self.metrics.inflight.value())} "
+                f"reconnects {int(self.metrics.reconnects.total())}" + (f" | {classes}" if classes else ""))
+
+    async def run(self, stop):
+        """
+        @param stop: 종료 asyncio.Event
+        """
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                print(self.format())
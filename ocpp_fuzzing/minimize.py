@@ -0,0 +1,361 @@
+# minimize.py
+# crash/hang 재현기 최소화 (delta debugging)
+# - sender가 감지한 crash/hang 케이스(FaultCase)를 새 연결로 다시 보내 같은 장애가 나는지 확인
+#   1) 같은 연결에서 직전에 보낸 프레임(window)을 ddmin으로 줄임 (장애 프레임은 항상 마지막)
+#   2) 장애 프레임 페이로드의 leaf(값 / 빈 컨테이너)를 ddmin으로 줄임
+#   3) 남은 문자열을 재현되는 가장 짧은 앞부분으로 줄임
+# - 시험 1회 = 새 연결 1개 (CP ID "<경로>_MIN<번호>"). 한 단계의 후보 시험은 여러 연결로 동시에 실행
+# - 결과: DIR/<순번>_<fault>_<action>.jsonl (window 프레임 + 장애 프레임, sender --input 으로 재생 가능)
+#         DIR/minimize_summary.csv (케이스별 최소화 전후 크기, 시험 횟수)
+
+import argparse
+import asyncio
+import itertools
+import re
+import time
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import websockets
+
+from . import codec
+from .corpus import encode_case
+from .results import ResultWriter
+from .sender import (DEFAULT_SUBPROTOCOLS, FAULT_CRASH, FAULT_HANG, RECONNECT_BASE_DELAY_SEC,
+                     RECONNECT_MAX_DELAY_SEC, RECONNECT_MAX_TRIES, RECV_TIMEOUT_SEC, CallDispatcher, FaultCase,
+                     health_probe_frame, is_connection_failure, iter_input_records)
+
+DEFAULT_URI = "ws://127.0.0.1:9000/CP_MINIMIZE"
+DEFAULT_CONNECTIONS = 8          # 동시 시험 연결 수
+REPRODUCE_TRIES = 2              # 원본 케이스 재현 확인 횟수 (한 번이라도 재현되면 최소화)
+SUMMARY_FILE_NAME = "minimize_summary.csv"
+MINIMIZE_FIELDS = ["input", "fault", "result", "reproduced", "window_before", "window_after",
+                   "bytes_before", "bytes_after", "tests", "elapsed_s", "reproducer"]
+PAYLOAD_INDEX = 3                # [2, uniqueId, action, payload]
+
+OUTCOME_WINDOW_FAULT = "window"  # 장애 프레임 전에 window 프레임에서 먼저 장애 발생
+OUTCOME_CONNECT_FAILED = "connect"
+
+
+def minimize_uri(base_uri, serial):
+    """
+    @param base_uri: 기준 WebSocket URI
+    @param serial: 시험 번호
+    @return: 시험마다 다른 CP ID를 쓰는 URI (서버 쪽 CP 상태가 시험 사이에 섞이지 않도록)
+    """
+    parts = urlsplit(base_uri)
+    cp_path = parts.path.rstrip("/") or "/CP_MINIMIZE"
+    return urlunsplit(parts._replace(path=f"{cp_path}_MIN{serial:05d}"))
+
+
+def split_chunks(items, n):
+    """
+    @return: items를 순서대로 n개(이하)로 나눈 리스트
+    """
+    size, extra = divmod(len(items), n)
+    chunks, start = [], 0
+    for i in range(n):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+async def ddmin(items, test):
+    """
+    @param items: 줄일 요소 리스트
+    @param test: async test(부분 리스트) -> 재현 여부 (부분 리스트는 items 순서 유지)
+    @return: 재현되는 1-minimal 부분 리스트 (items 자체는 재현된다고 가정)
+    @note: 한 단계의 부분집합/여집합 후보를 모두 동시에 시험 (동시 연결 수는 test 쪽에서 제한)
+    """
+    items = list(items)
+    if items and await test([]):
+        return []
+    n = 2
+    while len(items) >= 2:
+        chunks = split_chunks(items, n)
+        candidates = chunks
+        if len(chunks) > 2:
+            candidates = chunks + [[x for c in chunks if c is not chunk for x in c] for chunk in chunks]
+        results = await asyncio.gather(*(test(c) for c in candidates))
+        found = next((i for i, ok in enumerate(results) if ok), None)
+        if found is not None:
+            items = candidates[found]
+            n = 2 if found < len(chunks) else max(len(chunks) - 1, 2)
+            continue
+        if n >= len(items):
+            break
+        n = min(n * 2, len(items))
+    return items
+
+
+def payload_leaves(value, path=()):
+    """
+    @return: value 안의 leaf 경로 리스트 (스칼라와 빈 dict/list, 경로는 키/인덱스 튜플)
+    """
+    if isinstance(value, dict) and value:
+        return [leaf for k, v in value.items() for leaf in payload_leaves(v, path + (k,))]
+    if isinstance(value, list) and value:
+        return [leaf for i, v in enumerate(value) for leaf in payload_leaves(v, path + (i,))]
+    return [path]
+
+
+def prune(value, prefixes, path=()):
+    """
+    @param prefixes: 남길 leaf 경로와 그 모든 앞부분의 집합
+    @return: prefixes에 없는 요소를 뺀 새 값 (원본 유지, 리스트 인덱스는 당겨짐)
+    """
+    if isinstance(value, dict) and value:
+        return {k: prune(v, prefixes, path + (k,)) for k, v in value.items() if path + (k,) in prefixes}
+    if isinstance(value, list) and value:
+        return [prune(v, prefixes, path + (i,)) for i, v in enumerate(value) if path + (i,) in prefixes]
+    return value
+
+
+def keep_leaves(value, leaves):
+    prefixes = {leaf[:n] for leaf in leaves for n in range(len(leaf) + 1)}
+    return prune(value, prefixes)
+
+
+def get_path(value, path):
+    for key in path:
+        value = value[key]
+    return value
+
+
+def set_path(value, path, new):
+    """
+    @return: path 위치만 new로 바꾼 복사본 (원본 유지)
+    """
+    if not path:
+        return new
+    copied = dict(value) if isinstance(value, dict) else list(value)
+    copied[path[0]] = set_path(value[path[0]], path[1:], new)
+    return copied
+
+
+def with_payload(frame, payload):
+    new_frame = list(frame)
+    new_frame[PAYLOAD_INDEX] = payload
+    return new_frame
+
+
+def reproducer_file_name(case):
+    action = case.frame[2] if len(case.frame) > 2 else ""
+    action = re.sub(r"[^A-Za-z0-9]+", "", str(action))[:40] or "frame"
+    return f"{case.index:06d}_{case.fault}_{action}.jsonl"
+
+
+class Reproducer:
+    """
+    @param uri: 기준 URI (시험마다 "<경로>_MIN<번호>" CP ID)
+    @param subprotocols: WebSocket subprotocols
+    @param timeout: 응답 대기 타임아웃(초). hang 판정에는 장애 프레임 + Heartbeat 확인으로 최대 2배 소요
+    @param connections: 동시 시험 연결 수
+    @note: outcome(window, frame) 결과는 (window, frame) 직렬화 바이트로 캐시
+        - tests : 실제로 연결을 열어 실행한 시험 횟수
+    """
+
+    def __init__(self, uri, subprotocols, timeout, connections=DEFAULT_CONNECTIONS):
+        self.uri = uri
+        self.subprotocols = subprotocols
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(max(1, connections))
+        self.width = max(1, connections)
+        self.tests = 0
+        self.cache = {}
+        self._serial = itertools.count()
+
+    async def _connect(self, uri):
+        delay = RECONNECT_BASE_DELAY_SEC
+        for attempt in range(1, RECONNECT_MAX_TRIES + 1):
+            try:
+                return CallDispatcher(await websockets.connect(uri, subprotocols=self.subprotocols))
+            except Exception:
+                if attempt < RECONNECT_MAX_TRIES:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY_SEC)
+        return None
+
+    async def _hangs(self, dispatcher):
+        probe, _ = await dispatcher.call(health_probe_frame(), timeout=self.timeout)
+        return is_connection_failure(probe) or probe == "TIMEOUT"
+
+    async def _run(self, window, frame):
+        dispatcher = await self._connect(minimize_uri(self.uri, next(self._serial)))
+        if dispatcher is None:
+            return OUTCOME_CONNECT_FAILED
+        try:
+            for prior in window:
+                result, _ = await dispatcher.call(prior, timeout=self.timeout)
+                if dispatcher.closed_result is not None or (result == "TIMEOUT" and await self._hangs(dispatcher)):
+                    return OUTCOME_WINDOW_FAULT
+            result, _ = await dispatcher.call(frame, timeout=self.timeout)
+            if result == "TIMEOUT":
+                return FAULT_HANG if await self._hangs(dispatcher) else ""
+            if is_connection_failure(result) and dispatcher.closed_result is not None:
+                return FAULT_CRASH
+            return ""
+        finally:
+            await dispatcher.close()
+
+    async def outcome(self, window, frame):
+        """
+        @param window: 먼저 보낼 프레임 리스트 (응답을 기다리며 차례로 전송)
+        @param frame: 장애 프레임
+        @return: "" (정상) / FAULT_CRASH / FAULT_HANG / OUTCOME_WINDOW_FAULT / OUTCOME_CONNECT_FAILED
+        """
+        try:
+            key = codec.dumps_compact([window, frame])
+        except (TypeError, ValueError, RecursionError):
+            key = None
+        if key is not None and key in self.cache:
+            return self.cache[key]
+        async with self.slots:
+            self.tests += 1
+            result = await self._run(window, frame)
+        if key is not None and result != OUTCOME_CONNECT_FAILED:
+            self.cache[key] = result
+        return result
+
+
+async def shrink_string(reproduces, value, width):
+    """
+    @param reproduces: async reproduces(문자열) -> 재현 여부
+    @param value: 줄일 문자열 (재현된다고 가정)
+    @param width: 한 번에 시험할 길이 후보 수
+    @return: 재현되는 가장 짧은 앞부분 (width갈래 탐색, 단조성은 가정하지 않음)
+    """
+    lo, hi = 0, len(value)
+    while lo < hi:
+        points = sorted({lo + (hi - lo) * i // (width + 1) for i in range(width + 1)})
+        results = await asyncio.gather(*(reproduces(value[:p]) for p in points))
+        passing = [p for p, ok in zip(points, results) if ok]
+        if passing:
+            hi = passing[0]
+            lo = max([p + 1 for p in points if p < hi] + [lo])
+        else:
+            lo = points[-1] + 1
+    return value[:hi]
+
+
+async def minimize_case(case, reproducer):
+    """
+    @param case: FaultCase (sender가 감지한 crash/hang)
+    @param reproducer: Reproducer
+    @return: (재현 여부, 최소 window, 최소 프레임)
+    """
+    fault = case.fault
+
+    async def reproduces_with(window, frame):
+        return await reproducer.outcome(window, frame) == fault
+
+    reproduced = False
+    for _ in range(REPRODUCE_TRIES):
+        if await reproduces_with(case.window, case.frame):
+            reproduced = True
+            break
+    if not reproduced:
+        return False, case.window, case.frame
+
+    window = await ddmin(case.window, lambda subset: reproduces_with(subset, case.frame))
+    frame = case.frame
+    if len(frame) > PAYLOAD_INDEX:
+        payload = frame[PAYLOAD_INDEX]
+        leaves = payload_leaves(payload)
+        if leaves != [()]:
+            kept = await ddmin(leaves, lambda subset: reproduces_with(
+                window, with_payload(frame, keep_leaves(payload, subset))))
+            payload = keep_leaves(payload, kept)
+            frame = with_payload(frame, payload)
+
+        for path in payload_leaves(payload):
+            value = get_path(payload, path)
+            if not isinstance(value, str) or not value:
+                continue
+            shorter = await shrink_string(
+                lambda s: reproduces_with(window, with_payload(frame, set_path(payload, path, s))),
+                value, reproducer.width)
+            payload = set_path(payload, path, shorter)
+            frame = with_payload(frame, payload)
+    return True, window, frame
+
+
+def frames_size(frames):
+    return sum(len(encode_case(f)) for f in frames)
+
+
+async def minimize_faults(faults, out_dir, uri, subprotocols=None, timeout=RECV_TIMEOUT_SEC,
+                          connections=DEFAULT_CONNECTIONS):
+    """
+    @param faults: FaultCase 리스트
+    @param out_dir: 재현 파일/요약 저장 디렉터리
+    @param uri: 대상 서버 URI
+    @return: 요약 행 리스트 (MINIMIZE_FIELDS 순서)
+    @note: 케이스들을 동시에 최소화 (모든 시험이 connections개 연결 슬롯을 공유)
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    reproducer = Reproducer(uri, subprotocols or DEFAULT_SUBPROTOCOLS, timeout, connections)
+    summary = ResultWriter(out / SUMMARY_FILE_NAME, MINIMIZE_FIELDS)
+    rows = []
+
+    async def run(position, case):
+        started = time.monotonic()
+        tests_before = reproducer.tests
+        reproduced, window, frame = await minimize_case(case, reproducer)
+        path = out / reproducer_file_name(case)
+        path.write_bytes(b"".join(encode_case(f) for f in window + [frame]))
+        row = [case.input, case.fault, case.result, reproduced, len(case.window), len(window),
+               frames_size([case.frame]), frames_size([frame]), reproducer.tests - tests_before,
+               f"{time.monotonic() - started:.3f}", str(path)]
+        print(f"[MIN] {case.input} {case.fault}: " + (
+            f"window {len(case.window)} -> {len(window)}, frame {row[6]} -> {row[7]} bytes"
+            if reproduced else "not reproduced, saved as is") + f" ({row[8]} tests)")
+        summary.add(position, row)
+        rows.append(row)
+
+    try:
+        await asyncio.gather(*(run(i, case) for i, case in enumerate(faults)))
+    finally:
+        summary.close()
+    print(f"minimized {sum(1 for r in rows if r[3])}/{len(rows)} faults with {reproducer.tests} tests: {out}")
+    return rows
+
+
+async def main():
+    """
+    @note:
+    - --input : 재현 입력 (JSON 파일 / JSONL). 마지막 프레임이 장애 프레임, 그 앞은 같은 연결에서 먼저 보낼 프레임
+    - --fault : crash / hang / auto (auto: 입력을 한 번 보내 나온 장애 종류로 최소화)
+    - --out : 최소화 결과 디렉터리 (재현 JSONL + minimize_summary.csv)
+    - --connections : 동시 시험 연결 수
+    - --timeout : 응답 대기 타임아웃(초). hang 판정은 최대 2배 소요
+    """
+    parser = argparse.ArgumentParser(description="Minimize an OCPP crash/hang reproducer with delta debugging.")
+    parser.add_argument("--input", required=True, help="재현 입력 (JSON 파일 / JSONL, 마지막 프레임이 장애 프레임)")
+    parser.add_argument("--fault", choices=["auto", FAULT_CRASH, FAULT_HANG], default="auto",
+                        help="재현할 장애 종류 (기본: auto)")
+    parser.add_argument("--out", default="minimized", help="결과 디렉터리")
+    parser.add_argument("--uri", default=DEFAULT_URI, help="WebSocket 서버 URI")
+    parser.add_argument("--subp", nargs="*", default=DEFAULT_SUBPROTOCOLS, help="WebSocket subprotocols")
+    parser.add_argument("--timeout", type=int, default=RECV_TIMEOUT_SEC, help="서버 응답 타임아웃(초)")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS, help="동시 시험 연결 수")
+    args = parser.parse_args()
+
+    frames = [parsed for _, parsed, _ in iter_input_records(args.input)]
+    if not frames or not isinstance(frames[-1], list) or len(frames[-1]) < 3:
+        raise SystemExit(f"no OCPP frame in {args.input}")
+    fault = args.fault
+    if fault == "auto":
+        fault = await Reproducer(args.uri, args.subp, args.timeout, 1).outcome(frames[:-1], frames[-1])
+        if fault not in (FAULT_CRASH, FAULT_HANG):
+            raise SystemExit(f"input does not crash or hang the server (outcome: {fault or 'reply'})")
+        print(f"fault = {fault}")
+    case = FaultCase(0, str(args.input), fault, "", frames[-1], frames[:-1])
+    await minimize_faults([case], args.out, args.uri, args.subp, args.timeout, args.connections)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+# provenance.py
+# 변형 이력(mutation trace) + 연산자별 수율 + 변형 확률 자동 조정
+# - trace: 케이스 하나에 적용한 변형 연산을 "op@경로" 형태로 ";"로 이은 문자열
+#   (예: "drop@idTag;oversize@meterValue.0.timestamp;header"). 프레임에는 넣지 않고
+#   shard index.csv / provenance.csv(json 형식) 의 mutations 컬럼에 저장 → sender가 결과 파일에 그대로 이어 씀
+# - 수율(yield): 연산자별 전송 1,000건당 고유 실패(액션, 결과 분류, 원인 시그니처) 수
+# - 조정: 수율이 평균보다 높은 연산자의 seeds.py 확률은 올리고 낮으면 내림 → JSON 파일로 저장해
+#   generator / sender --tuning 으로 적용
+
+import json
+import math
+
+from . import seeds
+
+TRACE_SEPARATOR = ";"
+ROOT_PATH = "$"                # payload 자체(최상위)를 가리키는 경로
+OK_RESULTS = ("CallResult", "ok")  # 실패로 세지 않는 결과 분류 (sender / scenario)
+TUNE_MIN_SENDS = 200           # 이보다 적게 보낸 연산자는 확률을 바꾸지 않음
+TUNE_STEP = 0.5                # 확률 배율 = (수율 / 평균 수율) ** TUNE_STEP
+TUNE_MIN_PROB = 0.02           # 조정 후 확률 범위 (연산자가 완전히 꺼지거나 항상 켜지지 않도록)
+TUNE_MAX_PROB = 0.9
+# 연산자 → 발생 확률을 정하는 seeds.py 상수 (나머지 연산자는 조정 대상 아님)
+# drop은 DICT_MUTATE_PROB에 묶여 있어 필드 재귀 변형 빈도도 함께 바뀜
+TUNABLE_OPS = {
+    "drop": "DICT_MUTATE_PROB",
+    "junk": "DICT_JUNK_PROB",
+    "list_append_none": "LIST_APPEND_PROB",
+    "action": "ACTION_SWAP_PROB",
+    "header": "HEADER_CORRUPT_PROB",
+}
+# 조정 전 seeds.py 확률 (apply_tuning()이 덮어쓰기 전에 기록, splice 후보 가중치의 기준)
+UNTUNED_PROBS = {name: getattr(seeds, name) for name in TUNABLE_OPS.values()}
+
+
+def format_path(path):
+    """
+    @param path: payload 기준 경로 튜플 (dict 키 / list 인덱스)
+    @return: "." 으로 이은 경로 문자열 (빈 경로는 "$")
+    """
+    return ".".join(map(str, path)) or ROOT_PATH
+
+
+def trace_op(op_name, path=None):
+    """
+    @param op_name: 연산 이름 (예: "drop", "oversize")
+    @param path: payload 기준 경로 튜플 (액션/헤더처럼 경로가 없으면 None)
+    @return: trace 항목 문자열 ("op@경로" 또는 "op")
+    """
+    if path is None:
+        return op_name
+    return f"{op_name}@{format_path(path)}"
+
+
+def join_trace(ops):
+    """
+    @param ops: trace 항목 리스트
+    @return: mutations 컬럼 값 (";" 구분)
+    """
+    return TRACE_SEPARATOR.join(ops)
+
+
+def operator_yields(report):
+    """
+    @param report: analysis.TriageReport (버킷 키의 mutation은 "+"로 이은 연산 이름)
+    @return: [(연산자, 전송 수, 실패 수, 고유 실패 수, 1,000건당 고유 실패)] 수율 내림차순
+    @note: 한 케이스에 연산이 여러 개면 각 연산자에 모두 집계 (기여도를 나누지 않음).
+        고유 실패 = 그 연산자가 포함된 실패 버킷의 (액션, 결과 분류, 시그니처) 종류 수
+    """
+    sends = {}
+    failures = {}
+    unique = {}
+    for key, bucket in report.buckets.items():
+        if not key[1]:
+            continue
+        failed = key[2] not in OK_RESULTS
+        for op in key[1].split("+"):
+            sends[op] = sends.get(op, 0) + bucket.count
+            if failed:
+                failures[op] = failures.get(op, 0) + bucket.count
+                unique.setdefault(op, set()).add((key[0], key[2], key[3]))
+    rows = [(op, n, failures.get(op, 0), len(unique.get(op, ())), 1000.0 * len(unique.get(op, ())) / n)
+            for op, n in sends.items()]
+    return sorted(rows, key=lambda row: (-row[4], -row[1], row[0]))
+
+
+def tune_probabilities(yields, current=None, min_sends=TUNE_MIN_SENDS):
+    """
+    @param yields: operator_yields() 결과
+    @param current: {seeds 상수 이름: 현재 확률} (기본: 현재 seeds 모듈 값)
+    @param min_sends: 조정에 필요한 최소 전송 수
+    @return: {seeds 상수 이름: 조정한 확률} (TUNABLE_OPS 전체, 표본이 부족하면 현재 값 유지)
+    @note: 표본이 충분한 조정 대상 연산자들의 평균 수율을 기준으로 배율을 정함.
+        평균 수율이 0이면 (아무 실패도 못 찾았으면) 바꾸지 않음
+    """
+    if current is None:
+        current = {name: getattr(seeds, name) for name in TUNABLE_OPS.values()}
+    tuned = {name: current[name] for name in TUNABLE_OPS.values()}
+    measured = {op: per_1k for op, n_sends, _, _, per_1k in yields
+                if op in TUNABLE_OPS and n_sends >= min_sends}
+    if not measured:
+        return tuned
+    mean = sum(measured.values()) / len(measured)
+    if mean <= 0:
+        return tuned
+    for op, value in measured.items():
+        name = TUNABLE_OPS[op]
+        scale = math.pow(max(value, mean * 0.01) / mean, TUNE_STEP)
+        tuned[name] = round(min(TUNE_MAX_PROB, max(TUNE_MIN_PROB, current[name] * scale)), 3)
+    return tuned
+
+
+def save_tuning(path, values):
+    """
+    @param path: 저장할 JSON 파일 경로
+    @param values: {seeds 상수 이름: 확률}
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(values, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_tuning(path):
+    """
+    @param path: save_tuning()으로 만든 JSON 파일 경로
+    @return: {seeds 상수 이름: 확률}
+    @note: 조정 대상이 아닌 이름이나 0~1 밖의 값이 있으면 ValueError
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        values = json.load(f)
+    allowed = set(TUNABLE_OPS.values())
+    for name, value in values.items():
+        if name not in allowed:
+            raise ValueError(f"{path}: unknown probability '{name}'")
+        if not isinstance(value, (int, float)) or not 0.0 <= value <= 1.0:
+            raise ValueError(f"{path}: {name} must be a number in [0, 1]")
+    return values
+
+
+def apply_tuning(values):
+    """
+    @param values: {seeds 상수 이름: 확률} (load_tuning() 결과, None이면 무시)
+    @note: seeds 모듈 값을 바꿈. generator / template 변형은 seeds.<이름>을 호출 시점에 읽으므로 바로 반영.
+        프로세스 워커는 각자 적용해야 함 (generate_block의 tuning 인자)
+    """
+    for name, value in (values or {}).items():
+        setattr(seeds, name, float(value))
+
+
+def tuning_weight(op_name):
+    """
+    @param op_name: TUNABLE_OPS 의 연산자 이름 (예: "drop")
+    @return: 현재 seeds 확률 / 조정 전 확률 (조정하지 않았으면 1.0)
+    @note: splice 변형은 필드마다 확률을 굴리지 않으므로 이 배율을 후보 가중치로 사용
+    """
+    name = TUNABLE_OPS[op_name]
+    return getattr(seeds, name) / UNTUNED_PROBS[name]
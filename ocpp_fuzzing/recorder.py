@@ -0,0 +1,209 @@
+# recorder.py
+# 서버 측 케이스 단위 구조화 로그
+# - 수신 프레임 1건 = 레코드 1건 (CP ID, uniqueId, 액션, 파싱/검증 결과, 처리 시간, 응답 종류)
+# - 이벤트 루프에서는 큐에 넣기만 하고, 파일 기록은 백그라운드 스레드가 묶음(batch) 단위로 처리
+# - 출력: CSV (기본) 또는 Parquet (.parquet 경로, pyarrow 필요 - 묶음 1개 = row group 1개)
+
+import csv
+import queue
+import threading
+import time
+from pathlib import Path
+
+from . import codec
+from .stats import LatencyReport
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # 선택 의존성: Parquet 출력을 쓸 때만 필요
+    pyarrow = None
+
+CASE_LOG_FIELDS = ["ts", "cp_id", "unique_id", "message_type", "action",
+                   "parse", "validation", "handler_ms", "response"]
+BATCH_ROWS = 500               # 이만큼 모이면 기록
+BATCH_INTERVAL_SEC = 1.0       # 또는 이 시간이 지나면 기록
+QUEUE_MAX_ROWS = 100_000       # 큐 상한 (초과분은 버리고 dropped 로 집계)
+
+# ocpp 라이브러리의 스키마 검증 실패 시 CallError 코드 (필수 필드 누락은 ProtocolError로 응답)
+VALIDATION_ERROR_CODES = {
+    "FormatViolation", "FormationViolation", "PropertyConstraintViolation",
+    "OccurrenceConstraintViolation", "OccurenceConstraintViolation", "TypeConstraintViolation",
+    "ProtocolError",
+}
+
+
+def is_parquet_path(path):
+    """
+    @param path: 출력 경로
+    @return: 확장자가 .parquet 이면 True
+    """
+    return str(path).lower().endswith(".parquet")
+
+
+def finalize_record(record):
+    """
+    @param record: CentralSystem이 넣은 레코드 (reply = 보낸 응답 원문 또는 None)
+    @return: CASE_LOG_FIELDS 형식 dict
+    @note: 응답 파싱/분류는 기록 스레드에서 수행 (이벤트 루프 비용 없음)
+        - response   : CallResult / CallError:<code> / none (응답 원문 파싱 실패: unparsed)
+        - validation : Call 에 대해 ok 또는 검증 실패 CallError 코드 (그 외 빈 값)
+    """
+    reply = record.pop("reply", None)
+    response = "none"
+    error_code = None
+    if reply is not None:
+        try:
+            frame = codec.loads(reply)
+            if frame[0] == 3:
+                response = "CallResult"
+            elif frame[0] == 4:
+                error_code = str(frame[2])
+                response = f"CallError:{error_code}"
+        except (ValueError, TypeError, IndexError, KeyError):
+            response = "unparsed"
+    validation = ""
+    if record.get("action"):
+        validation = error_code if error_code in VALIDATION_ERROR_CODES else "ok"
+    record["response"] = response
+    record["validation"] = validation
+    return record
+
+
+def reply_kind(reply):
+    """
+    @param reply: 보낸 응답 원문 (없으면 None)
+    @return: CallResult / CallError / none (파싱 없이 앞부분만 확인)
+    """
+    if reply is None:
+        return "none"
+    if reply.startswith("[3"):
+        return "CallResult"
+    if reply.startswith("[4"):
+        return "CallError"
+    return "other"
+
+
+class MetricsRecorder:
+    """
+    @param inner: 레코드를 이어서 넘길 recorder (예: CaseRecorder, 선택)
+    @note: CentralSystem recorder 자리에 끼우는 메모리 집계기 (서버 루프에서 add() 호출).
+        - report : 액션별/응답 종류별 처리 시간(handler_ms) LatencyReport
+        - frames : 수신 프레임 수, cp_ids : 접속했던 CP ID 집합
+        snapshot()은 pickle 가능한 dict라서 프로세스 간 전달/합산에 사용
+    """
+
+    def __init__(self, inner=None):
+        self.inner = inner
+        self.report = LatencyReport()
+        self.frames = 0
+        self.cp_ids = set()
+
+    def add(self, record):
+        self.frames += 1
+        self.cp_ids.add(record["cp_id"])
+        self.report.record(record.get("action") or "(non-call)", reply_kind(record.get("reply")),
+                           record["handler_ms"])
+        if self.inner is not None:
+            self.inner.add(record)
+
+    def snapshot(self):
+        return {"frames": self.frames, "cps": len(self.cp_ids), "report": self.report}
+
+
+class CaseRecorder:
+    """
+    @param path: 출력 파일 경로 (.csv / .parquet)
+    @param batch_rows: 묶음 크기
+    @param batch_interval: 묶음 최대 대기 시간 (초)
+    @note: add()는 스레드 안전하며 블로킹하지 않음 (이벤트 루프에서 호출).
+        기록 스레드는 close() 시 남은 레코드를 모두 기록하고 종료
+    """
+
+    def __init__(self, path, batch_rows=BATCH_ROWS, batch_interval=BATCH_INTERVAL_SEC):
+        self.path = Path(path)
+        self.parquet = is_parquet_path(path)
+        if self.parquet and pyarrow is None:
+            raise RuntimeError("Parquet case log requires the 'pyarrow' package")
+        self.batch_rows = batch_rows
+        self.batch_interval = batch_interval
+        self.queue = queue.Queue(maxsize=QUEUE_MAX_ROWS)
+        self.written = 0
+        self.dropped = 0
+        self._stop = object()
+        self._thread = threading.Thread(target=self._run, name="case-recorder", daemon=True)
+        self._thread.start()
+
+    def add(self, record):
+        """
+        @param record: CentralSystem.route_message()가 만든 dict (finalize_record() 입력 형식)
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self.queue.put(self._stop)
+        self._thread.join()
+
+    def _run(self):
+        if self.parquet:
+            sink = _ParquetSink(self.path)
+        else:
+            sink = _CsvSink(self.path)
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                deadline = time.monotonic() + self.batch_interval
+                while len(batch) < self.batch_rows:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self.queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is self._stop:
+                        stopping = True
+                        break
+                    batch.append(finalize_record(item))
+                if batch:
+                    sink.write(batch)
+                    self.written += len(batch)
+        finally:
+            sink.close()
+
+
+class _CsvSink:
+    def __init__(self, path):
+        new_file = not path.exists() or path.stat().st_size == 0
+        self.file = path.open("a", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=CASE_LOG_FIELDS)
+        if new_file:
+            self.writer.writeheader()
+            self.file.flush()
+
+    def write(self, batch):
+        self.writer.writerows(batch)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetSink:
+    def __init__(self, path):
+        self.schema = pyarrow.schema([
+            (name, pyarrow.float64() if name in ("ts", "handler_ms") else pyarrow.string())
+            for name in CASE_LOG_FIELDS
+        ])
+        self.writer = pyarrow.parquet.ParquetWriter(str(path), self.schema)
+
+    def write(self, batch):
+        columns = {name: [row.get(name) for row in batch] for name in CASE_LOG_FIELDS}
+        self.writer.write_table(pyarrow.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
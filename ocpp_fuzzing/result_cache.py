@@ -0,0 +1,330 @@
+# result_cache.py
+# 빌드별 결과 캐시 (SQLite) + 증분(diff) 리플레이
+# - 키: 정규화 프레임 해시 (dedup.canonical_hash, uniqueId는 비워서 해시 → $UID$/--replace-uid와 무관)
+#   + 사용자가 붙이는 대상/빌드 태그 (예: "csms-2.4.1")
+# - sender --cache DB --build TAG: 보낸 케이스의 결과(result, fault, action, detail)를 TAG로 기록 (묶음 커밋)
+# - --diff: 기준 빌드(--diff-from, 기본: 가장 최근에 기록한 다른 빌드)에 결과가 있는 케이스는 건너뛰고
+#   새 케이스 + 기존 케이스 중 --sample 비율만 보냄. 표본은 (키, 빌드 태그) 해시로 정하므로
+#   같은 빌드를 다시 돌리면 같은 부분집합, 빌드가 바뀌면 다른 부분집합
+# - 건너뛴 케이스는 기준 빌드의 결과 행을 현재 빌드로 복사 → 현재 빌드가 항상 전체 케이스를 가지므로
+#   다음 --diff 가 이 빌드를 기준으로 삼아도 건너뛴 케이스를 "새 케이스"로 보지 않음
+# - 종료 시 기준 빌드와 분류(result, fault)가 달라진 케이스를 보고 (--diff-report CSV)
+# - 조회는 LOOKUP_BATCH 개씩 묶어 PRIMARY KEY (build, key) 인덱스로 IN 조회 (수백만 키에서도 케이스당 µs 단위)
+
+import argparse
+import csv
+import hashlib
+import itertools
+import sqlite3
+import time
+
+from . import codec
+from .dedup import canonical_hash
+from .results import is_delivered
+
+UID_MAX_CHARS = 36             # 이 길이 이하의 문자열 uniqueId는 키에서 제외 (더 긴/다른 타입은 변형으로 보고 유지)
+LOOKUP_BATCH = 500             # IN 조회 한 번에 묶는 키 수 (SQLite 변수 한도 999 이내)
+COMMIT_ROWS = 2000             # N건마다 커밋
+DEFAULT_DIFF_SAMPLE = 0.05     # --diff 에서 기존 케이스를 다시 보낼 기본 비율
+DIFF_REPORT_FIELDS = ["input", "action", "old_result", "old_fault", "new_result", "new_fault",
+                      "old_detail", "new_detail"]
+TOP_TRANSITIONS = 10           # 요약에 보일 분류 변화 종류 수
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    build TEXT PRIMARY KEY,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    build TEXT NOT NULL,
+    key BLOB NOT NULL,
+    input TEXT,
+    action TEXT,
+    result TEXT,
+    fault TEXT,
+    detail TEXT,
+    PRIMARY KEY (build, key)
+) WITHOUT ROWID;
+"""
+
+
+def cache_key(frame):
+    """
+    @param frame: OCPP 프레임 (객체) 또는 직렬화된 프레임 바이트
+    @return: 16바이트 키
+    @note: uniqueId 자리가 UID_MAX_CHARS 이하 문자열이면 ""로 바꾼 뒤 canonical_hash()
+    """
+    if isinstance(frame, bytes):
+        try:
+            frame = codec.loads(frame)
+        except ValueError:
+            return canonical_hash(frame)
+    if isinstance(frame, list) and len(frame) > 1 and isinstance(frame[1], str) and len(frame[1]) <= UID_MAX_CHARS:
+        frame = [frame[0], ""] + frame[2:]
+    return canonical_hash(frame)
+
+
+def in_sample(key, build, rate):
+    """
+    @param key: cache_key() 결과
+    @param build: 현재 빌드 태그 (표본 선택 salt)
+    @param rate: 표본 비율 (0~1)
+    @return: 기존 케이스를 다시 보낼지 여부
+    """
+    if rate <= 0:
+        return False
+    if rate >= 1:
+        return True
+    digest = hashlib.blake2b(key, digest_size=8, key=build.encode("utf-8")[:64]).digest()
+    return int.from_bytes(digest, "big") < rate * 2 ** 64
+
+
+class ResultCache:
+    """
+    @param path: SQLite 파일 경로 (없으면 생성)
+    @note: 이벤트 루프 스레드 하나에서만 사용 (조회/기록 모두 짧은 배치 단위)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.pending = []
+        self.written = 0
+
+    def register_build(self, build):
+        self.conn.execute("INSERT OR IGNORE INTO builds (build, created) VALUES (?, ?)", (build, time.time()))
+        self.conn.commit()
+
+    def builds(self):
+        """
+        @return: [(빌드 태그, 기록 시작 시각, 케이스 수)] 오래된 순
+        """
+        return self.conn.execute(
+            "SELECT b.build, b.created, (SELECT COUNT(*) FROM results r WHERE r.build = b.build) "
+            "FROM builds b ORDER BY b.created").fetchall()
+
+    def latest_build(self, exclude=None):
+        """
+        @param exclude: 제외할 빌드 태그 (보통 현재 빌드)
+        @return: 가장 최근에 등록한 다른 빌드 태그, 없으면 None
+        """
+        row = self.conn.execute("SELECT build FROM builds WHERE build != ? ORDER BY created DESC, rowid DESC LIMIT 1",
+                                (exclude or "",)).fetchone()
+        return row[0] if row else None
+
+    def lookup(self, build, keys):
+        """
+        @param build: 조회할 빌드 태그
+        @param keys: cache_key() 리스트 (LOOKUP_BATCH 이하)
+        @return: {key: (result, fault)} - 결과가 있는 키만
+        """
+        if not keys:
+            return {}
+        marks = ",".join("?" * len(keys))
+        rows = self.conn.execute(f"SELECT key, result, fault FROM results WHERE build = ? AND key IN ({marks})",
+                                 [build, *keys])
+        return {key: (result, fault) for key, result, fault in rows}
+
+    def copy_results(self, source, build, keys):
+        """
+        @param source: 결과를 가져올 빌드 태그 (기준 빌드)
+        @param build: 복사해 넣을 빌드 태그 (현재 빌드)
+        @param keys: cache_key() 리스트 (LOOKUP_BATCH 이하)
+        @note: 현재 빌드에 이미 결과가 있는 키는 그대로 둠 (INSERT OR IGNORE)
+        """
+        if not keys:
+            return
+        marks = ",".join("?" * len(keys))
+        self.conn.execute(f"INSERT OR IGNORE INTO results (build, key, input, action, result, fault, detail) "
+                          f"SELECT ?, key, input, action, result, fault, detail FROM results "
+                          f"WHERE build = ? AND key IN ({marks})", [build, source, *keys])
+        self.conn.commit()
+
+    def put(self, build, key, input_name, action, result, fault, detail):
+        self.pending.append((build, key, input_name, action, result, fault, detail))
+        if len(self.pending) >= COMMIT_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.conn.executemany("INSERT OR REPLACE INTO results (build, key, input, action, result, fault, detail) "
+                              "VALUES (?, ?, ?, ?, ?, ?, ?)", self.pending)
+        self.conn.commit()
+        self.written += len(self.pending)
+        self.pending = []
+
+    def iter_changed(self, build, baseline):
+        """
+        @param build / baseline: 비교할 두 빌드 태그
+        @return: 두 빌드 모두 결과가 있고 (result, fault)가 다른 케이스 Generator
+            (DIFF_REPORT_FIELDS 순서 튜플)
+        """
+        self.flush()
+        return self.conn.execute(
+            "SELECT n.input, n.action, o.result, o.fault, n.result, n.fault, o.detail, n.detail "
+            "FROM results n JOIN results o ON o.build = ? AND o.key = n.key "
+            "WHERE n.build = ? AND (n.result IS NOT o.result OR n.fault IS NOT o.fault) "
+            "ORDER BY n.input", (baseline, build))
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class CachingSink:
+    """
+    @param inner: 실제 결과 기록기 (ResultWriter)
+    @param cache: ResultCache
+    @param build: 현재 빌드 태그
+    @note: ReplaySession sink 자리에 끼워 결과 행을 그대로 넘기고 캐시에도 기록.
+        키는 iter_cached_records()가 input 이름으로 맡겨 둔 값을 사용.
+        대상에 닿지 못한 행(results.is_delivered()가 False, --resume 과 같은 기준)은 캐시에 넣지 않음
+        → 다음 --diff 에서 새 케이스로 다시 보냄
+    """
+
+    def __init__(self, inner, cache, build):
+        self.inner = inner
+        self.cache = cache
+        self.build = build
+        self.keys = {}
+
+    def remember(self, display, key):
+        self.keys[str(display)] = key
+
+    def add(self, index, row):
+        self.inner.add(index, row)
+        key = self.keys.pop(row[0], None)
+        # 행 순서: input, result, send_start_s, received_ms, parsed_ms, fault, action, detail, mutations
+        if key is not None and is_delivered({"result": row[1], "fault": row[5]}):
+            self.cache.put(self.build, key, row[0], row[6], row[1], row[5], row[7])
+
+    def close(self):
+        self.inner.close()
+        self.cache.flush()
+
+
+class DiffStats:
+    """
+    @note: 증분 리플레이 선택 결과 (new: 기준 빌드에 없음, sampled: 표본으로 다시 보냄, skipped: 건너뜀)
+    """
+
+    def __init__(self, baseline=None):
+        self.baseline = baseline
+        self.new = 0
+        self.sampled = 0
+        self.skipped = 0
+
+    def format(self):
+        if self.baseline is None:
+            return f"cache: {self.new} cases recorded"
+        return (f"diff vs '{self.baseline}': new {self.new}, sampled old {self.sampled}, "
+                f"skipped old {self.skipped}")
+
+
+def iter_cached_records(records, sink, baseline=None, sample=0.0, stats=None):
+    """
+    @param records: (display_path, parsed, trace[, raw]) 이터러블 (parsed가 None이면 raw 사용)
+    @param sink: CachingSink (키를 맡겨 둠)
+    @param baseline: 기준 빌드 태그 (None이면 선택 없이 모두 보내고 기록만)
+    @param sample: 기준 빌드에 결과가 있는 케이스를 다시 보낼 비율
+    @param stats: DiffStats (선택)
+    @return: 보낼 레코드 Generator (받은 튜플 그대로)
+    @note: 건너뛴 케이스의 기준 빌드 결과는 배치마다 현재 빌드로 복사 (ResultCache.copy_results)
+    """
+    stats = stats if stats is not None else DiffStats(baseline)
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, LOOKUP_BATCH))
+        if not batch:
+            return
+        # --raw-send 레코드는 parsed가 None → 원본 바이트로 키 계산
+        keys = [cache_key(record[1] if record[1] is not None else bytes(record[3])) for record in batch]
+        known = sink.cache.lookup(baseline, keys) if baseline is not None else {}
+        selected = []
+        skipped = []
+        for record, key in zip(batch, keys):
+            if key in known:
+                if not in_sample(key, sink.build, sample):
+                    skipped.append(key)
+                    continue
+                stats.sampled += 1
+            else:
+                stats.new += 1
+            selected.append((record, key))
+        if skipped:
+            sink.cache.copy_results(baseline, sink.build, skipped)
+            stats.skipped += len(skipped)
+        for record, key in selected:
+            sink.remember(record[0], key)
+            yield record
+
+
+def report_changes(cache, build, baseline, out_path=None):
+    """
+    @param cache: ResultCache
+    @param build / baseline: 비교할 빌드 태그
+    @param out_path: 달라진 케이스를 기록할 CSV 경로 (선택)
+    @return: 요약 문자열 (달라진 수 + 많이 나온 분류 변화)
+    """
+    transitions = {}
+    changed = 0
+    writer = f = None
+    if out_path:
+        f = open(out_path, "w", newline="", encoding="utf-8")
+        writer = csv.writer(f)
+        writer.writerow(DIFF_REPORT_FIELDS)
+    try:
+        for row in cache.iter_changed(build, baseline):
+            changed += 1
+            old = row[2] + (f"/{row[3]}" if row[3] else "")
+            new = row[4] + (f"/{row[5]}" if row[5] else "")
+            transitions[(old, new)] = transitions.get((old, new), 0) + 1
+            if writer is not None:
+                writer.writerow(row)
+    finally:
+        if f is not None:
+            f.close()
+    lines = [f"changed classification vs '{baseline}': {changed}"]
+    for (old, new), count in sorted(transitions.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_TRANSITIONS]:
+        lines.append(f"  {count:7d}  {old} -> {new}")
+    if out_path:
+        lines.append(f"wrote diff report: {out_path}")
+    return "\n".join(lines)
+
+
+def main():
+    """
+    @note:
+    - --db : 결과 캐시 파일 (sender --cache)
+    - --list : 기록된 빌드 태그와 케이스 수 출력
+    - --build / --against : 두 빌드를 비교해 분류가 달라진 케이스 보고 (--against 기본: 가장 최근의 다른 빌드)
+    - --out : 달라진 케이스 CSV 경로
+    """
+    parser = argparse.ArgumentParser(description="Inspect the replay result cache and diff two builds.")
+    parser.add_argument("--db", required=True, help="결과 캐시 SQLite 파일")
+    parser.add_argument("--list", action="store_true", help="빌드 목록 출력")
+    parser.add_argument("--build", help="비교할 빌드 태그")
+    parser.add_argument("--against", help="기준 빌드 태그 (기본: 가장 최근의 다른 빌드)")
+    parser.add_argument("--out", default=None, help="달라진 케이스 CSV 경로")
+    args = parser.parse_args()
+
+    cache = ResultCache(args.db)
+    try:
+        if args.list or not args.build:
+            for build, created, count in cache.builds():
+                print(f"{build:30s} {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created))} {count:10d}")
+        if args.build:
+            baseline = args.against or cache.latest_build(exclude=args.build)
+            if baseline is None:
+                parser.error("no other build in the cache to compare with")
+            print(report_changes(cache, args.build, baseline, args.out))
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# results.py
+# 리플레이 결과 스트리밍 기록기
+# - 결과를 메모리에 모으지 않고 완료되는 대로 CSV/JSONL 파일에 append
+# - 동시 전송으로 결과가 순서 없이 도착해도 입력 순서(index)대로 기록
+# - --resume 용: 기존 결과 파일에 이미 있는 input 목록 로드 (서버에 전달되지 못한 결과는 제외 → 다시 전송)
+# - 이어 쓰기 전에 기존 파일의 컬럼이 현재 컬럼과 같은지 확인하고, 다시 보낼 (전달되지 못한) 행은 파일에서 제거
+#   → 이어 쓴 뒤에도 input 하나에 결과 행 하나
+
+import csv
+import json
+import os
+import time
+from pathlib import Path
+
+RESULT_FIELDS = ["input", "result"]
+FLUSH_EVERY_ROWS = 100       # N행마다 flush
+FLUSH_INTERVAL_SEC = 2.0     # 또는 마지막 flush 후 N초 경과 시 flush
+NOT_SENT_RESULT = "NOT_SENT"                 # 시간 예산이 끝나 큐에 남은 케이스를 보내지 않음 (campaign --duration)
+UNDELIVERED_RESULTS = {"EXC:CONNECT_FAILED", NOT_SENT_RESULT}  # 보내지 못한 결과 (--resume 에서 다시 전송)
+UNDELIVERED_FAULTS = {"collateral"}           # 다른 프레임의 장애로 결과를 얻지 못함 (재전송도 실패)
+
+
+def is_jsonl_path(path):
+    """
+    @param path: 결과 파일 경로
+    @return: JSONL 형식 여부 (확장자 .jsonl)
+    """
+    return Path(path).suffix.lower() == ".jsonl"
+
+
+def is_delivered(row):
+    """
+    @param row: 결과 행 dict (input, result[, fault] ...)
+    @return: 서버에 전달되어 결과가 확정된 행인지 (UNDELIVERED_RESULTS / UNDELIVERED_FAULTS가 아님)
+    """
+    result = row.get("result")
+    return result is not None and result not in UNDELIVERED_RESULTS \
+        and row.get("fault") not in UNDELIVERED_FAULTS
+
+
+def load_completed_inputs(path):
+    """
+    @param path: 기존 결과 파일 (CSV/JSONL)
+    @return: 이미 결과가 확정된 input 값 집합 (파일이 없으면 빈 집합)
+    @note: 기록 도중 중단되어 마지막 줄이 깨진 경우 해당 줄은 무시.
+        전달되지 못한 행(is_delivered() 가 False)은 제외하므로 --resume 이 다시 보냄
+    """
+    p = Path(path)
+    if not p.exists():
+        return set()
+
+    completed = set()
+    with p.open("r", newline="", encoding="utf-8") as f:
+        if is_jsonl_path(p):
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    if is_delivered(row):
+                        completed.add(row["input"])
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+        else:
+            for row in csv.DictReader(f):
+                if row.get("input") and is_delivered(row):
+                    completed.add(row["input"])
+    return completed
+
+
+def read_columns(path):
+    """
+    @param path: 기존 결과 파일 (CSV/JSONL)
+    @return: 컬럼 이름 리스트 (CSV 헤더 / JSONL 첫 행의 키), 비어 있으면 None
+    """
+    with Path(path).open("r", newline="", encoding="utf-8") as f:
+        if not is_jsonl_path(path):
+            return next(csv.reader(f), None)
+        for line in f:
+            if line.strip():
+                try:
+                    return list(json.loads(line))
+                except ValueError:
+                    return None
+    return None
+
+
+def drop_undelivered_rows(path):
+    """
+    @param path: 기존 결과 파일 (CSV/JSONL)
+    @return: 제거한 행 수
+    @note: is_delivered()가 False인 행(--resume 이 다시 보내는 입력)을 지우고 임시 파일로 교체.
+        JSONL의 깨진 줄도 함께 제거 (load_completed_inputs()와 같이 결과가 없는 것으로 봄). 지울 행이 없으면 그대로 둠
+    """
+    p = Path(path)
+    tmp = p.with_name(p.name + ".tmp")
+    dropped = 0
+    with p.open("r", newline="", encoding="utf-8") as src, tmp.open("w", newline="", encoding="utf-8") as dst:
+        if is_jsonl_path(p):
+            for line in src:
+                try:
+                    keep = is_delivered(json.loads(line))
+                except (ValueError, TypeError, AttributeError):
+                    keep = False
+                if keep:
+                    dst.write(line if line.endswith("\n") else line + "\n")
+                elif line.strip():
+                    dropped += 1
+        else:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            header = next(reader, None)
+            if header is not None:
+                writer.writerow(header)
+            for row in reader:
+                if is_delivered(dict(zip(header, row))):
+                    writer.writerow(row)
+                else:
+                    dropped += 1
+    if dropped:
+        os.replace(tmp, p)
+    else:
+        tmp.unlink()
+    return dropped
+
+
+class ResultWriter:
+    """
+    @param path: 결과 파일 경로 (.jsonl 이면 JSONL, 그 외 CSV)
+    @param fieldnames: 컬럼 이름 목록
+    @param append: 기존 파일 뒤에 이어 쓰기 (--resume). 기존 컬럼이 fieldnames와 다르면 ValueError.
+        전달되지 못한 기존 행은 drop_undelivered_rows()로 먼저 제거 (제거한 수: dropped)
+    @note: add(index, row)로 받은 결과를 index 순서대로 기록.
+        앞선 index가 아직 끝나지 않았으면 reorder 버퍼에 보관
+        (버퍼 크기는 전송 쪽 backpressure로 제한됨)
+    """
+
+    def __init__(self, path, fieldnames=RESULT_FIELDS, append=False):
+        self.path = Path(path)
+        self.fieldnames = list(fieldnames)
+        self.jsonl = is_jsonl_path(self.path)
+
+        append = append and self.path.exists() and self.path.stat().st_size > 0
+        if append:
+            columns = read_columns(self.path)
+            if columns != self.fieldnames:
+                raise ValueError(f"{self.path}: existing columns {columns} do not match {self.fieldnames}, "
+                                 f"cannot append")
+        self.dropped = drop_undelivered_rows(self.path) if append else 0
+        self.file = self.path.open("a" if append else "w", newline="", encoding="utf-8")
+        self.writer = None if self.jsonl else csv.writer(self.file)
+        if self.writer is not None and not append:
+            self.writer.writerow(self.fieldnames)
+
+        self.next_index = 0
+        self.pending = {}            # index -> row (순서 대기)
+        self.written = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def add(self, index, row):
+        """
+        @param index: 입력 순번 (0부터 연속)
+        @param row: 컬럼 순서의 값 리스트
+        """
+        self.pending[index] = row
+        while self.next_index in self.pending:
+            self._write(self.pending.pop(self.next_index))
+            self.next_index += 1
+        self._maybe_flush()
+
+    def _write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps(dict(zip(self.fieldnames, row)), ensure_ascii=False) + "\n")
+        else:
+            self.writer.writerow(row)
+        self.written += 1
+        self._unflushed += 1
+
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if self._unflushed >= FLUSH_EVERY_ROWS or now - self._last_flush >= FLUSH_INTERVAL_SEC:
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """
+        @note: 중단된 경우 순서가 비어 있는 결과도 index 순으로 모두 기록 후 닫음
+        """
+        for index in sorted(self.pending):
+            self._write(self.pending[index])
+        self.pending.clear()
+        self.flush()
+        self.file.close()
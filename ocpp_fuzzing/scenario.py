@@ -0,0 +1,526 @@
+# scenario.py
+# 상태 기반(stateful) 시나리오 퍼징
+# - NORMAL_SEEDS 프레임으로 충전 세션 흐름 구성:
+#   BootNotification → StatusNotification → Authorize → StartTransaction → MeterValues… → StopTransaction
+# - 응답 값을 이후 프레임에 연결 (StartTransaction 응답 transactionId → MeterValues / StopTransaction),
+#   timestamp 필드는 전송 시각으로 갱신
+# - 시나리오 변형: 순서 바꾸기 / 단계 제거 / 반복 / 이전 거래 ID 재사용 / 잘못된 거래 ID /
+#   지연 / 응답 대기 없이 연속 전송(burst) / 시각 역전 / payload 변형(make_variants)
+# - 연결(CP ID)마다 시나리오를 차례로 실행 (연결 상태는 시나리오 간에도 유지),
+#   연결 여러 개를 동시에 돌리고 --processes 로 프로세스를 나눠 코어 수만큼 확장
+# - 결과: 시나리오 1건 = 결과 1행 (input = scenario:<번호>, result = ok 또는 처음 실패한 단계)
+
+import argparse
+import asyncio
+import multiprocessing
+import queue
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+
+from .generator import derive_block_seed, make_variants
+from .metrics import DEFAULT_STATUS_INTERVAL_SEC, SenderMetrics, StatusLine, result_label
+from .results import ResultWriter, RESULT_FIELDS
+from .seeds import NORMAL_SEEDS
+from .sender import (DEFAULT_SUBPROTOCOLS, RECONNECT_MAX_TRIES, RECV_TIMEOUT_SEC, ReplaySession,
+                     TargetUnreachable, all_sessions_dead, build_session_uri, classify_response)
+from .stats import LatencyReport
+
+DEFAULT_URI = "ws://127.0.0.1:9000/CP_SCENARIO"
+CSV_DEFAULT_PATH = "scenario_result.csv"
+DEFAULT_CONNECTIONS = 8       # 프로세스당 동시 연결(CP) 수
+SCENARIO_FLOW = ["BootNotification", "StatusNotification", "Authorize", "StartTransaction",
+                 "MeterValues", "StopTransaction"]
+METER_STEPS_MIN = 1           # 흐름 안의 MeterValues 반복 횟수 범위
+METER_STEPS_MAX = 4
+BASELINE_SCENARIO_PROB = 0.1  # 변형 없이 정상 흐름 그대로 보낼 확률
+SCENARIO_MUTATIONS_MAX = 3    # 시나리오 1건에 적용할 변형 최대 개수
+DELAY_MAX_SEC = 2.0           # delay 변형의 최대 대기 시간
+BOGUS_TRANSACTION_IDS = [0, -1, 2 ** 31 - 1, 2 ** 31, 12345]
+RESULT_POLL_SEC = 0.5         # 감독 프로세스가 결과 큐를 기다리는 단위 (자식 프로세스 생존 확인 주기)
+
+# 응답 payload 에서 읽어 둘 값: {액션: {필드: 상태 이름}}
+CAPTURE_FIELDS = {"StartTransaction": {"transactionId": "transaction_id"}}
+# 전송 전에 채울 값: {액션: {필드: 상태 이름}}
+BIND_FIELDS = {
+    "MeterValues": {"transactionId": "transaction_id"},
+    "StopTransaction": {"transactionId": "transaction_id"},
+}
+
+SCENARIO_RESULT_FIELDS = RESULT_FIELDS + ["steps", "mutations", "results", "transaction_id", "anomalies",
+                                          "elapsed_ms"]
+
+_SEEDS_BY_ACTION = {}
+for _frame in NORMAL_SEEDS:
+    _SEEDS_BY_ACTION.setdefault(_frame[2], []).append(_frame)
+
+
+class Step:
+    """
+    @param action: 흐름상의 액션 이름 (BIND_FIELDS / CAPTURE_FIELDS 조회용)
+    @param frame: 보낼 프레임 원본 (uniqueId/바인딩/timestamp는 전송 시 채움)
+    @note:
+    - delay : 전송 전 대기(초)
+    - burst : 앞 단계 응답을 기다리지 않고 같이 전송
+    - tx    : None(현재 거래 ID) / "stale"(이 연결의 이전 시나리오 거래 ID) / 정수(그 값 그대로)
+    - clock : timestamp 필드에 더할 초 (음수 = 과거 시각)
+    """
+
+    __slots__ = ("action", "frame", "delay", "burst", "tx", "clock")
+
+    def __init__(self, action, frame):
+        self.action = action
+        self.frame = frame
+        self.delay = 0.0
+        self.burst = False
+        self.tx = None
+        self.clock = 0
+
+    def copy(self):
+        step = Step(self.action, self.frame)
+        step.delay, step.burst, step.tx, step.clock = self.delay, self.burst, self.tx, self.clock
+        return step
+
+
+def _bound_steps(steps):
+    return [step for step in steps if step.action in BIND_FIELDS]
+
+
+def _mutate_swap(steps):
+    if len(steps) < 2:
+        return None
+    i = random.randrange(len(steps) - 1)
+    steps[i], steps[i + 1] = steps[i + 1], steps[i]
+    return f"swap:{steps[i + 1].action}<->{steps[i].action}"
+
+
+def _mutate_drop(steps):
+    if len(steps) < 2:
+        return None
+    return f"drop:{steps.pop(random.randrange(len(steps))).action}"
+
+
+def _mutate_repeat(steps):
+    i = random.randrange(len(steps))
+    steps.insert(i + 1, steps[i].copy())
+    return f"repeat:{steps[i].action}"
+
+
+def _mutate_stale_tx(steps):
+    candidates = _bound_steps(steps)
+    if not candidates:
+        return None
+    step = random.choice(candidates)
+    step.tx = "stale"
+    return f"stale_tx:{step.action}"
+
+
+def _mutate_bogus_tx(steps):
+    candidates = _bound_steps(steps)
+    if not candidates:
+        return None
+    step = random.choice(candidates)
+    step.tx = random.choice(BOGUS_TRANSACTION_IDS)
+    return f"bogus_tx:{step.action}={step.tx}"
+
+
+def _mutate_delay(steps):
+    step = random.choice(steps)
+    step.delay = round(random.uniform(0, DELAY_MAX_SEC), 3)
+    return f"delay:{step.action}={step.delay}"
+
+
+def _mutate_burst(steps):
+    if len(steps) < 2:
+        return None
+    step = steps[random.randrange(1, len(steps))]
+    step.burst = True
+    return f"burst:{step.action}"
+
+
+def _mutate_clock(steps):
+    step = random.choice(steps)
+    step.clock = -random.randint(60, 86400 * 365)
+    return f"clock_back:{step.action}"
+
+
+def _mutate_payload(steps):
+    step = random.choice(steps)
+    step.frame = make_variants(step.frame, 1)[0]
+    return f"payload:{step.action}"
+
+
+SCENARIO_MUTATORS = {
+    "swap": _mutate_swap,
+    "drop": _mutate_drop,
+    "repeat": _mutate_repeat,
+    "stale_tx": _mutate_stale_tx,
+    "bogus_tx": _mutate_bogus_tx,
+    "delay": _mutate_delay,
+    "burst": _mutate_burst,
+    "clock_back": _mutate_clock,
+    "payload": _mutate_payload,
+}
+
+
+def build_scenario(index, base_seed):
+    """
+    @param index: 시나리오 번호
+    @param base_seed: --seed 값
+    @return: (Step 리스트, 적용한 변형 이름 리스트)
+    @note: 시나리오마다 --seed에서 유도한 sub-seed로 전역 random을 초기화
+        → 프로세스/연결 수와 무관하게 같은 번호는 같은 시나리오
+    """
+    random.seed(derive_block_seed(base_seed, index))
+    steps = []
+    for action in SCENARIO_FLOW:
+        repeat = random.randint(METER_STEPS_MIN, METER_STEPS_MAX) if action == "MeterValues" else 1
+        steps.extend(Step(action, random.choice(_SEEDS_BY_ACTION[action])) for _ in range(repeat))
+
+    mutations = []
+    if random.random() >= BASELINE_SCENARIO_PROB:
+        for _ in range(random.randint(1, SCENARIO_MUTATIONS_MAX)):
+            name = random.choice(list(SCENARIO_MUTATORS))
+            applied = SCENARIO_MUTATORS[name](steps)
+            if applied is not None:
+                mutations.append(applied)
+    return steps, mutations
+
+
+class ConnectionState:
+    """
+    @note: 연결(CP) 하나의 시나리오 간 상태
+    - values      : CAPTURE_FIELDS로 읽은 값 (현재 시나리오)
+    - previous    : 이전 시나리오의 values (stale_tx 변형용)
+    - issued_tx   : 프로세스 전체에서 서버가 발급한 transactionId 집합 (재사용 탐지, 연결 간 공유)
+    """
+
+    def __init__(self, issued_tx):
+        self.values = {}
+        self.previous = {}
+        self.issued_tx = issued_tx
+
+    def next_scenario(self):
+        if self.values:
+            self.previous = self.values
+        self.values = {}
+
+
+def _timestamp(clock):
+    return (datetime.now(UTC) + timedelta(seconds=clock)).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def render_step(step, state):
+    """
+    @param step: Step
+    @param state: ConnectionState
+    @return: 전송할 프레임 (새 uniqueId, 바인딩 값, 현재 시각 timestamp)
+    @note: 바인딩할 값이 아직 없으면(예: StartTransaction 전에 StopTransaction) 시드 값을 그대로 둠
+    """
+    frame = list(step.frame)
+    if len(frame) > 1:
+        frame[1] = str(uuid.uuid4())
+    if len(frame) < 4 or not isinstance(frame[3], dict):
+        return frame
+
+    payload = dict(frame[3])
+    for field, name in BIND_FIELDS.get(step.action, {}).items():
+        if step.tx == "stale":
+            value = state.previous.get(name, state.values.get(name))
+        elif step.tx is not None:
+            value = step.tx
+        else:
+            value = state.values.get(name)
+        if value is not None:
+            payload[field] = value
+
+    now = _timestamp(step.clock)
+    if isinstance(payload.get("timestamp"), str):
+        payload["timestamp"] = now
+    if isinstance(payload.get("meterValue"), list):
+        payload["meterValue"] = [dict(item, timestamp=now) if isinstance(item, dict) else item
+                                 for item in payload["meterValue"]]
+    frame[3] = payload
+    return frame
+
+
+def capture_response(step, result, state):
+    """
+    @param step: 보낸 Step
+    @param result: 응답 (CallResult 프레임 등)
+    @param state: ConnectionState
+    @return: 발견한 이상 목록 (예: 이미 발급된 transactionId 재발급 → "tx_reused")
+    """
+    anomalies = []
+    fields = CAPTURE_FIELDS.get(step.action)
+    if not fields or not isinstance(result, list) or len(result) < 3 or result[0] != 3:
+        return anomalies
+    payload = result[2]
+    if not isinstance(payload, dict):
+        return anomalies
+    for field, name in fields.items():
+        if field not in payload:
+            continue
+        value = payload[field]
+        if name == "transaction_id":
+            key = repr(value)
+            if key in state.issued_tx:
+                anomalies.append(f"tx_reused:{value}")
+            state.issued_tx.add(key)
+        state.values[name] = value
+    return anomalies
+
+
+async def run_scenario(session, steps, state, latency=None):
+    """
+    @param session: ReplaySession (연결/재연결 담당, window는 burst 수 이상)
+    @param steps: Step 리스트
+    @param state: ConnectionState
+    @param latency: LatencyReport (선택)
+    @return: (단계별 결과 분류 리스트, 이상 목록)
+    @note: burst 단계는 앞 단계와 묶어 응답을 기다리지 않고 함께 전송
+    """
+    state.next_scenario()
+    groups = []
+    for step in steps:
+        if step.burst and groups:
+            groups[-1].append(step)
+        else:
+            groups.append([step])
+
+    classes = []
+    anomalies = []
+    for group in groups:
+        if group[0].delay:
+            await asyncio.sleep(group[0].delay)
+        frames = [render_step(step, state) for step in group]
+        replies = await asyncio.gather(*(session.send(frame) for frame in frames))
+        for step, frame, (result, timing) in zip(group, frames, replies):
+            cls = classify_response(result)
+            classes.append(cls)
+            anomalies.extend(capture_response(step, result, state))
+            if latency is not None:
+                latency.record(step.action, cls, timing.parsed_ms())
+    return classes, anomalies
+
+
+def scenario_verdict(steps, classes):
+    """
+    @return: "ok" (모든 단계 CallResult) 또는 처음 실패한 "<액션>:<결과>"
+    """
+    for step, cls in zip(steps, classes):
+        if cls != "CallResult":
+            return f"{step.action}:{cls}"
+    return "ok"
+
+
+async def run_scenarios(indices, uri, base_seed, emit, connections=DEFAULT_CONNECTIONS, slot_offset=0,
+                        total_slots=None, subprotocols=None, timeout=RECV_TIMEOUT_SEC, verbose=False, metrics=None):
+    """
+    @param indices: 실행할 시나리오 번호 이터러블
+    @param uri: 기준 URI (연결마다 "<경로>_<슬롯 번호>" CP ID)
+    @param base_seed: 시나리오 생성 시드
+    @param emit: 결과 콜백 emit(index, row)  (row = SCENARIO_RESULT_FIELDS 순서)
+    @param connections: 동시 연결 수
+    @param slot_offset / total_slots: 프로세스 간 CP ID가 겹치지 않도록 하는 전체 기준 슬롯 번호
+    @param verbose: 시나리오마다 결과 한 줄 출력
+    @param metrics: SenderMetrics (선택, 재연결 수 집계)
+    @return: LatencyReport (단계 액션별/결과별 지연)
+    @note: 연결이 재연결을 포기하면 그 연결은 시나리오 실행을 멈추고, 모든 연결이 멈추면 TargetUnreachable
+    """
+    latency = LatencyReport()
+    issued_tx = set()
+    pending = iter(indices)
+    total_slots = total_slots or connections
+    clock_origin = time.monotonic()
+
+    async def worker(slot):
+        session = ReplaySession(slot, build_session_uri(uri, slot, total_slots),
+                                subprotocols or DEFAULT_SUBPROTOCOLS, timeout, inflight=1,
+                                window=len(SCENARIO_FLOW) + METER_STEPS_MAX + SCENARIO_MUTATIONS_MAX)
+        session.clock_origin = clock_origin
+        session.metrics = metrics
+        state = ConnectionState(issued_tx)
+        try:
+            for index in pending:
+                steps, mutations = build_scenario(index, base_seed)
+                started = time.monotonic()
+                classes, anomalies = await run_scenario(session, steps, state, latency)
+                verdict = scenario_verdict(steps, classes)
+                if verbose:
+                    print(f"scenario:{index:06d} -> {verdict}")
+                emit(index, [f"scenario:{index:06d}", verdict,
+                             ">".join(step.action for step in steps), ";".join(mutations), "|".join(classes),
+                             "" if state.values.get("transaction_id") is None else state.values["transaction_id"],
+                             ";".join(anomalies), f"{(time.monotonic() - started) * 1000.0:.3f}"])
+                if session.dead:
+                    break
+        finally:
+            await session.close()
+        return session
+
+    sessions = await asyncio.gather(*(worker(slot_offset + k) for k in range(max(1, connections))))
+    if all_sessions_dead(sessions):
+        raise TargetUnreachable(f"cannot connect to {uri} ({RECONNECT_MAX_TRIES} tries per connection)")
+    return latency
+
+
+def _scenario_process(proc_no, n_procs, n_scenarios, uri, base_seed, connections, subprotocols, timeout,
+                      verbose, result_queue):
+    """
+    @note: 자식 프로세스 진입점. 번호 % n_procs == proc_no 인 시나리오를 실행하고
+        결과 행은 ("row", index, row), 끝나면 ("done", proc_no, LatencyReport)를 큐로 전송.
+        대상에 연결할 수 없으면 ("error", proc_no, 메시지)
+    """
+    try:
+        latency = asyncio.run(run_scenarios(
+            range(proc_no, n_scenarios, n_procs), uri, base_seed,
+            lambda index, row: result_queue.put(("row", index, row)),
+            connections, slot_offset=proc_no * connections, total_slots=n_procs * connections,
+            subprotocols=subprotocols, timeout=timeout, verbose=verbose))
+    except TargetUnreachable as e:
+        result_queue.put(("error", proc_no, str(e)))
+        return
+    result_queue.put(("done", proc_no, latency))
+
+
+def run_scenario_processes(n_procs, n_scenarios, uri, base_seed, connections, subprotocols, timeout, emit,
+                           verbose=False, status=None):
+    """
+    @param n_procs: 프로세스 수
+    @param emit: 결과 콜백 emit(index, row) (감독 프로세스에서 호출, 예: ResultWriter.add)
+    @param verbose: 시나리오마다 결과 한 줄 출력 (자식 프로세스)
+    @param status: StatusLine (선택, 결과를 기다리는 동안 주기적으로 출력)
+    @return: 합친 LatencyReport
+    @note: RESULT_POLL_SEC 마다 자식 프로세스 생존을 확인. "done" 없이 끝난 프로세스는
+        큐를 한 번 더 비운 뒤 종료로 보고 기다리지 않음. 대상에 연결할 수 없다고 보고한 프로세스가 있으면
+        모두 끝난 뒤 TargetUnreachable
+    """
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    processes = [ctx.Process(target=_scenario_process, name=f"scenario-{p}",
+                             args=(p, n_procs, n_scenarios, uri, base_seed, connections, subprotocols, timeout,
+                                   verbose, result_queue))
+                 for p in range(n_procs)]
+    for process in processes:
+        process.start()
+
+    latency = LatencyReport()
+    running = set(range(n_procs))
+    suspect = set()              # 끝난 것을 한 번 본 프로세스 (큐에 남은 메시지를 한 번 더 기다림)
+    errors = []
+    last_status = time.monotonic()
+    try:
+        while running:
+            if status is not None and time.monotonic() - last_status >= status.interval:
+                print(status.format())
+                last_status = time.monotonic()
+            try:
+                kind, key, value = result_queue.get(timeout=RESULT_POLL_SEC)
+            except queue.Empty:
+                for p in sorted(running):
+                    if processes[p].exitcode is None:
+                        continue
+                    if p in suspect:
+                        print(f"[WARN] scenario process {p} exited with code {processes[p].exitcode} "
+                              f"before finishing, its remaining scenarios were not run")
+                        running.discard(p)
+                    else:
+                        suspect.add(p)
+                continue
+            if kind == "row":
+                emit(key, value)
+                continue
+            running.discard(key)
+            if kind == "done":
+                latency.merge(value)
+            else:
+                errors.append(value)
+    finally:
+        for process in processes:
+            process.join(timeout=RESULT_POLL_SEC)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+    if errors and len(errors) == n_procs:
+        raise TargetUnreachable(errors[0])
+    for message in errors:
+        print(f"[WARN] {message}")
+    return latency
+
+
+async def _run_local(indices, uri, base_seed, emit, connections, subprotocols, timeout, verbose, metrics, status):
+    """
+    @note: 단일 프로세스 실행. status(StatusLine)가 있으면 실행하는 동안 주기적으로 출력
+    """
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(status.run(stop)) if status is not None else None
+    try:
+        return await run_scenarios(indices, uri, base_seed, emit, connections, subprotocols=subprotocols,
+                                   timeout=timeout, verbose=verbose, metrics=metrics)
+    finally:
+        stop.set()
+        if monitor is not None:
+            await monitor
+
+
+def main():
+    """
+    @note:
+    - --scenarios : 실행할 시나리오 수
+    - --connections : 프로세스당 동시 연결(CP) 수. 연결마다 시나리오를 차례로 실행
+    - --processes : 시나리오를 나눠 실행할 프로세스 수 (CP ID는 프로세스 간에도 겹치지 않음)
+    - --seed : 시나리오 생성 시드 (같은 시드/번호 → 같은 시나리오, 프로세스·연결 수와 무관)
+    - 결과 파일 컬럼: input(scenario:<번호>), result(ok / <액션>:<결과>), steps, mutations,
+      results(단계별 결과), transaction_id(마지막으로 받은 값), anomalies(tx_reused 등), elapsed_ms
+    - 종료 시 단계 액션별/결과별 지연 p50/p90/p99/max 출력
+    - 진행 상황: --status-interval 초마다 [STATUS] 한 줄, 시나리오별 결과 줄은 --verbose 일 때만 출력
+    """
+    parser = argparse.ArgumentParser(description="Run stateful OCPP session scenarios against a CSMS.")
+    parser.add_argument("--scenarios", type=int, required=True, help="실행할 시나리오 수")
+    parser.add_argument("--uri", default=DEFAULT_URI, help="WebSocket 서버 URI")
+    parser.add_argument("--subp", nargs="*", default=DEFAULT_SUBPROTOCOLS, help="WebSocket subprotocols")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS, help="프로세스당 동시 연결 수")
+    parser.add_argument("--processes", type=int, default=1, help="프로세스 수 (기본: 1)")
+    parser.add_argument("--seed", type=int, default=None, help="재현성용 난수 시드")
+    parser.add_argument("--timeout", type=int, default=RECV_TIMEOUT_SEC, help="서버 응답 타임아웃(초)")
+    parser.add_argument("--csv", default=CSV_DEFAULT_PATH, help="결과 파일 경로 (.jsonl 이면 JSONL)")
+    parser.add_argument("--verbose", action="store_true", help="시나리오마다 결과 한 줄 출력")
+    parser.add_argument("--status-interval", type=float, default=DEFAULT_STATUS_INTERVAL_SEC,
+                        help="[STATUS] 상태 줄 출력 주기(초, 0 = 출력 안 함)")
+    args = parser.parse_args()
+
+    base_seed = args.seed
+    if base_seed is None:
+        base_seed = random.randrange(2 ** 32)
+        print(f"seed = {base_seed}")
+    n_scenarios = max(0, args.scenarios)
+    n_procs = max(1, args.processes)
+
+    sink = ResultWriter(args.csv, SCENARIO_RESULT_FIELDS)
+    metrics = SenderMetrics()
+    status = StatusLine(metrics, args.status_interval) if args.status_interval > 0 else None
+
+    def emit(index, row):
+        sink.add(index, row)
+        metrics.sends.inc(amount=row[4].count("|") + 1)     # results 컬럼 = 단계별 결과 "a|b|c"
+        metrics.results.inc(result_label(row[1]))
+
+    try:
+        if n_procs == 1:
+            latency = asyncio.run(_run_local(range(n_scenarios), args.uri, base_seed, emit, args.connections,
+                                             args.subp, args.timeout, args.verbose, metrics, status))
+        else:
+            latency = run_scenario_processes(n_procs, n_scenarios, args.uri, base_seed, args.connections,
+                                             args.subp, args.timeout, emit, args.verbose, status)
+    except TargetUnreachable as e:
+        raise SystemExit(f"aborted: {e}")
+    finally:
+        sink.close()
+    print(latency.format())
+    print(f"wrote {sink.written} scenarios: {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
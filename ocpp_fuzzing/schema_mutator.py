@@ -0,0 +1,347 @@
+# schema_mutator.py
+# OCPP 1.6 JSON schema 기반 변형기 (generator --mode schema)
+# - 시작 시 ocpp 패키지의 v16 요청 스키마를 읽어 액션별 필드 표를 한 번만 만듦
+#   (필드 경로, 타입, enum, maxLength, date-time, required, multipleOf, minItems → 적용 가능한 op 목록)
+# - 케이스 1건 = 스키마에 맞는 기본 payload에 같은 범주의 op 1~SCHEMA_OPS_MAX개 적용
+#     valid    : 경계값이지만 유효 (enum 각 값, maxLength 꽉 채움, 정수 경계, 날짜 경계, 선택 필드 생략)
+#     invalid  : 경계를 살짝 넘김 (maxLength+1, enum 대소문자/공백, 필수 필드 누락, minItems 미만, 추가 필드)
+#     confused : 타입 혼동 (문자열↔숫자, bool, null, 객체↔배열)
+#   → 일반 변형(make_variants)보다 스키마 검증을 통과해 핸들러까지 가는 비율을 조절 가능
+# - payload는 copy-on-write로 바뀌는 경로만 복사 (make_variants와 같이 결과는 읽기 전용으로 사용)
+
+import json
+import os
+import random
+import string
+
+import ocpp
+
+from .provenance import format_path, join_trace
+
+SCHEMA_CATEGORIES = ["valid", "invalid", "confused"]
+SCHEMA_CATEGORY_WEIGHTS = [0.4, 0.4, 0.2]   # 범주 선택 비율 (valid는 검증 통과 → 핸들러 로직 도달)
+SCHEMA_OPS_MAX = 2                          # 케이스 1건에 적용할 op 최대 개수
+OPTIONAL_FIELD_PROB = 0.5                   # 기본 payload에 선택 필드를 넣을 확률
+MANY_ITEMS = 64                             # many_items op 의 배열 길이
+MAX_REF_DEPTH = 8                           # $ref 해석 깊이 상한
+# OCPP 1.6 Security 확장 메시지: server.py에 핸들러가 없어 항상 NotSupported
+# → 기본 액션 목록에서 제외 (--mode schema-all 로만 포함)
+SECURITY_ACTIONS = frozenset([
+    "CertificateSigned", "DeleteCertificate", "ExtendedTriggerMessage", "GetInstalledCertificateIds", "GetLog",
+    "InstallCertificate", "LogStatusNotification", "SecurityEventNotification", "SignCertificate",
+    "SignedFirmwareStatusNotification", "SignedUpdateFirmware",
+])
+
+INT_BOUNDARIES = [0, 1, -1, 2 ** 31 - 1, -2 ** 31, 2 ** 53, 2 ** 64]   # 스키마상 모두 유효한 정수
+VALID_DATETIMES = [
+    "2025-08-31T00:00:00Z", "2025-08-31T09:00:00.123+09:00", "1970-01-01T00:00:00Z",
+    "2038-01-19T03:14:08Z", "9999-12-31T23:59:59.999999Z", "2024-02-29T23:59:60Z",
+]
+# date-time 형식 위반 (ocpp 라이브러리는 format을 검사하지 않으므로 핸들러/저장 단계까지 전달됨)
+INVALID_DATETIMES = [
+    "2025-13-01T00:00:00Z", "2025-02-30T00:00:00Z", "2025-08-31T24:00:00Z", "2025-08-31 00:00:00",
+    "2025-08-31T00:00:00", "2025-08-31", "31/08/2025 00:00", "", "not-a-date", "0000-00-00T00:00:00Z",
+]
+PLAIN_STRINGS = ["", "\x00", "\x1f\u202e", "가😀", "' OR '1'='1", "%s%n", "../../etc/passwd"]
+
+_DELETE = object()   # op 결과가 이 값이면 필드 제거
+
+
+class FieldSpec:
+    """
+    @note: 스키마 노드 하나 (액션별 필드 표의 한 행)
+    - path       : payload 기준 경로 (dict 키 / 배열은 0번째 원소 = 0)
+    - chain      : 루트 자식부터 이 필드까지의 FieldSpec (없는 상위 구조를 만들 때 사용)
+    - kind       : object / array / string / integer / number / boolean
+    - required   : 부모 객체의 required 포함 여부
+    - enum / max_length / date_time / multiple_of / min_items / closed(additionalProperties: false)
+    - properties : (object) 자식 FieldSpec 목록, items: (array) 원소 FieldSpec
+    """
+
+    def __init__(self, path, chain, kind, required):
+        self.path = path
+        self.chain = chain + (self,) if path else ()
+        self.kind = kind
+        self.required = required
+        self.enum = None
+        self.max_length = None
+        self.date_time = False
+        self.multiple_of = None
+        self.min_items = 0
+        self.closed = False
+        self.properties = []
+        self.items = None
+
+    def build(self, full=False):
+        """
+        @param full: 선택 필드까지 모두 포함
+        @return: 스키마에 맞는 값 (무작위)
+        """
+        if self.kind == "object":
+            return {child.path[-1]: child.build(full) for child in self.properties
+                    if child.required or full or random.random() < OPTIONAL_FIELD_PROB}
+        if self.kind == "array":
+            return [self.items.build(full) for _ in range(max(1, self.min_items))] if self.items else []
+        if self.kind == "string":
+            if self.enum:
+                return random.choice(self.enum)
+            if self.date_time:
+                return VALID_DATETIMES[0]
+            length = random.randint(1, min(self.max_length or 20, 20))
+            return "".join(random.choices(string.ascii_letters + string.digits, k=length))
+        if self.kind == "integer":
+            return random.randint(0, 100)
+        if self.kind == "number":
+            return _multiple(random.randint(0, 1000), self.multiple_of)
+        if self.kind == "boolean":
+            return random.choice([True, False])
+        return None
+
+
+def _multiple(k, multiple_of):
+    # 0.1 * 37 = 3.7000000000000002 같은 오차를 없애 Decimal multipleOf 검사도 통과하도록 반올림
+    return round(k * multiple_of, 6) if multiple_of else float(k)
+
+
+def _junk():
+    # generator.mutate_payload()의 "__junk__" 필드와 같은 형식 (영숫자 1~50자)
+    return "".join(random.choices(string.ascii_letters + string.digits, k=random.randint(1, 50)))
+
+
+def _swap_case(value):
+    swapped = value.swapcase()
+    return swapped if swapped != value else value + "x"
+
+
+def _field_ops(field):
+    """
+    @param field: FieldSpec
+    @return: {범주: [(op 이름, fn(현재 값) -> 새 값)]}
+    """
+    ops = {category: [] for category in SCHEMA_CATEGORIES}
+    valid, invalid, confused = ops["valid"], ops["invalid"], ops["confused"]
+
+    if field.path and not isinstance(field.path[-1], int):   # 배열 원소는 제거 대상 아님 (null_item/below_min_items)
+        if field.required:
+            invalid.append(("drop_required", lambda cur: _DELETE))
+        else:
+            valid.append(("drop_optional", lambda cur: _DELETE))
+    confused.append(("null", lambda cur: None))
+
+    if field.kind == "string":
+        if field.enum:
+            enum = field.enum
+            valid.append(("enum_value", lambda cur: random.choice(enum)))
+            invalid.append(("enum_case", lambda cur: _swap_case(random.choice(enum))))
+            invalid.append(("enum_space", lambda cur: random.choice(enum) + " "))
+            invalid.append(("enum_truncated", lambda cur: random.choice(enum)[:-1]))
+        elif field.date_time:
+            valid.append(("datetime_boundary", lambda cur: random.choice(VALID_DATETIMES)))
+            invalid.append(("datetime_malformed", lambda cur: random.choice(INVALID_DATETIMES)))
+            confused.append(("datetime_epoch", lambda cur: 1756598400))
+        elif field.max_length:
+            limit = field.max_length
+            valid.append(("max_length", lambda cur: "A" * limit))
+            valid.append(("max_length_multibyte", lambda cur: "가" * limit))
+            valid.append(("empty", lambda cur: ""))
+            invalid.append(("max_length_plus_one", lambda cur: "A" * (limit + 1)))
+            invalid.append(("oversize", lambda cur: "A" * (limit * random.randint(2, 100))))
+        else:
+            valid.append(("special_string", lambda cur: random.choice(PLAIN_STRINGS)))
+            valid.append(("long_string", lambda cur: "A" * random.randint(256, 4096)))
+        confused.append(("as_int", lambda cur: 12345))
+        confused.append(("as_bool", lambda cur: True))
+        confused.append(("as_list", lambda cur: [cur]))
+    elif field.kind == "integer":
+        valid.append(("int_boundary", lambda cur: random.choice(INT_BOUNDARIES)))
+        invalid.append(("int_fraction", lambda cur: (cur if isinstance(cur, int) else 0) + 0.5))
+        invalid.append(("int_as_float", lambda cur: float(cur if isinstance(cur, int) else 0)))
+        confused.append(("as_str", lambda cur: str(cur)))
+        confused.append(("as_bool", lambda cur: False))
+        confused.append(("as_list", lambda cur: [cur]))
+    elif field.kind == "number":
+        multiple_of = field.multiple_of
+        valid.append(("number_boundary", lambda cur: random.choice(
+            [0, _multiple(1, multiple_of), _multiple(10 ** 6, multiple_of), -_multiple(1, multiple_of)])))
+        if multiple_of:
+            invalid.append(("not_multiple", lambda cur: round(multiple_of / 2, 6)))
+        confused.append(("as_str", lambda cur: str(cur)))
+        confused.append(("as_bool", lambda cur: True))
+    elif field.kind == "boolean":
+        valid.append(("bool_flip", lambda cur: not cur))
+        confused.append(("as_str", lambda cur: "true"))
+        confused.append(("as_int", lambda cur: 1))
+    elif field.kind == "object":
+        if any(not child.required for child in field.properties):
+            valid.append(("all_optional", lambda cur: field.build(full=True)))
+        if field.closed:
+            invalid.append(("additional_property", lambda cur: {**(cur if isinstance(cur, dict) else {}),
+                                                                "__junk__": _junk()}))
+        confused.append(("as_list", lambda cur: [cur]))
+        confused.append(("as_str", lambda cur: ""))
+    elif field.kind == "array":
+        items = field.items
+        if items is not None:
+            valid.append(("many_items", lambda cur: [items.build() for _ in range(MANY_ITEMS)]))
+            invalid.append(("null_item", lambda cur: (cur if isinstance(cur, list) else []) + [None]))
+        if field.min_items > 0:
+            invalid.append(("below_min_items", lambda cur: []))
+        confused.append(("as_object", lambda cur: {}))
+        confused.append(("as_str", lambda cur: ""))
+    return ops
+
+
+class ActionTable:
+    """
+    @param action: 액션 이름
+    @param schema: 요청 스키마 (dict)
+    @note: root(FieldSpec 트리)와 범주별 (FieldSpec, op 이름, fn) 목록을 미리 계산
+    """
+
+    def __init__(self, action, schema):
+        self.action = action
+        self._definitions = schema.get("definitions", {})
+        self.fields = []
+        self.root = self._parse(schema, (), (), True, 0)
+        self.ops = {category: [] for category in SCHEMA_CATEGORIES}
+        for field in self.fields:
+            for category, field_ops in _field_ops(field).items():
+                self.ops[category].extend((field, name, fn) for name, fn in field_ops)
+        self.categories = [c for c in SCHEMA_CATEGORIES if self.ops[c]]
+        self.weights = [SCHEMA_CATEGORY_WEIGHTS[SCHEMA_CATEGORIES.index(c)] for c in self.categories]
+
+    def _parse(self, node, path, chain, required, depth):
+        while "$ref" in node and depth < MAX_REF_DEPTH:
+            # 1.6 보안 확장 스키마의 "#/definitions/<이름>" 만 사용
+            node = self._definitions.get(node["$ref"].rsplit("/", 1)[-1], {})
+            depth += 1
+        kind = node.get("type", "string")
+        if isinstance(kind, list):
+            kind = kind[0]
+        field = FieldSpec(path, chain, kind, required)
+        field.enum = node.get("enum")
+        field.max_length = node.get("maxLength")
+        field.date_time = node.get("format") == "date-time"
+        field.multiple_of = node.get("multipleOf")
+        field.min_items = node.get("minItems", 0)
+        field.closed = node.get("additionalProperties") is False
+        self.fields.append(field)
+        if kind == "object":
+            required_names = set(node.get("required", []))
+            field.properties = [self._parse(child, path + (name,), field.chain, name in required_names, depth)
+                                for name, child in node.get("properties", {}).items()]
+        elif kind == "array" and isinstance(node.get("items"), dict):
+            field.items = self._parse(node["items"], path + (0,), field.chain, True, depth)
+        return field
+
+
+def _replace(node, chain, path, fn):
+    """
+    @param node: 현재 값 (없으면 None)
+    @param chain: path 각 단계의 FieldSpec
+    @param path: 남은 경로
+    @param fn: 대상 값에 적용할 op
+    @return: 새 값 (바뀐 경로의 dict/list만 복사). 중간 구조가 없거나 타입이 다르면 스키마대로 새로 만듦
+    """
+    if not path:
+        return fn(node)
+    key = path[0]
+    if isinstance(key, int):
+        container = list(node) if isinstance(node, list) else []
+        current = container[0] if container else None
+    else:
+        container = dict(node) if isinstance(node, dict) else {}
+        current = container.get(key)
+    spec = chain[0]
+    if current is None and len(path) > 1:
+        current = spec.build()
+    new_value = _replace(current, chain[1:], path[1:], fn)
+    if new_value is _DELETE:
+        if isinstance(key, int):
+            del container[:1]
+        else:
+            container.pop(key, None)
+    elif isinstance(key, int):
+        container[:1] = [new_value]
+    else:
+        container[key] = new_value
+    return container
+
+
+class SchemaMutator:
+    """
+    @param ocpp_version: 스키마 버전 (현재 "1.6")
+    @param include_security: SECURITY_ACTIONS 도 기본 payload 후보에 넣을지 여부
+    @note: actions = 요청 스키마가 있는 액션 (CP→CSMS 및 CSMS→CP 방향 모두, 기본은 SECURITY_ACTIONS 제외).
+        tables 는 모든 액션을 가지므로 mutate()는 제외된 액션의 프레임에도 사용 가능
+    """
+
+    def __init__(self, ocpp_version="1.6", include_security=False):
+        schemas_dir = os.path.join(os.path.dirname(ocpp.__file__), "v" + ocpp_version.replace(".", ""), "schemas")
+        self.tables = {}
+        for filename in sorted(os.listdir(schemas_dir)):
+            name, ext = os.path.splitext(filename)
+            if ext != ".json" or name.endswith("Response"):
+                continue
+            with open(os.path.join(schemas_dir, filename), encoding="utf-8-sig") as f:
+                self.tables[name] = ActionTable(name, json.load(f))
+        self.actions = sorted(name for name in self.tables if include_security or name not in SECURITY_ACTIONS)
+
+    def baseline(self, action):
+        """
+        @param action: 액션 이름
+        @return: 스키마에 맞는 프레임 [2, "$UID$", action, payload]
+        """
+        return [2, "$UID$", action, self.tables[action].root.build()]
+
+    def mutate(self, frame):
+        """
+        @param frame: 스키마가 있는 액션의 프레임 (예: baseline() 결과)
+        @return: (변형된 프레임, 적용한 op 이름 리스트 "범주:op@경로")
+        @note: 범주 하나를 고르고 서로 포함 관계가 아닌 필드에 op 1~SCHEMA_OPS_MAX개 적용
+        """
+        table = self.tables[frame[2]]
+        category = random.choices(table.categories, table.weights)[0]
+        candidates = table.ops[category]
+        picked = random.sample(candidates, min(random.randint(1, SCHEMA_OPS_MAX), len(candidates)))
+
+        payload = frame[3]
+        applied = []
+        used_paths = []
+        for field, op_name, fn in picked:
+            path = field.path
+            if any(path[:len(p)] == p or p[:len(path)] == path for p in used_paths):
+                continue
+            used_paths.append(path)
+            payload = _replace(payload, field.chain, path, fn)
+            applied.append(f"{category}:{op_name}@{format_path(path)}")
+        return [frame[0], frame[1], frame[2], payload], applied
+
+    def make_variants(self, frame, n_variants, traces=None):
+        """
+        @param frame: 스키마가 있는 액션의 프레임
+        @param n_variants: 생성할 변형 개수
+        @param traces: 변형마다 trace 문자열을 순서대로 덧붙일 리스트 (선택)
+        @return: 변형된 프레임 리스트 (generator.make_variants()와 같은 형식)
+        """
+        if traces is None:
+            return [self.mutate(frame)[0] for _ in range(n_variants)]
+        variants = []
+        for _ in range(n_variants):
+            variant, ops = self.mutate(frame)
+            variants.append(variant)
+            traces.append(join_trace(ops))
+        return variants
+
+
+_SCHEMA_MUTATORS = {}
+
+
+def get_schema_mutator(ocpp_version="1.6", include_security=False):
+    """
+    @return: SchemaMutator (프로세스당 한 번만 스키마를 읽어 필드 표 생성)
+    """
+    key = (ocpp_version, include_security)
+    if key not in _SCHEMA_MUTATORS:
+        _SCHEMA_MUTATORS[key] = SchemaMutator(ocpp_version, include_security)
+    return _SCHEMA_MUTATORS[key]
@@ -5,41 +5,84 @@ import json
 import uuid
 import argparse
 import asyncio
-import csv
+import random
+import re
+import time
+from collections import deque
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 
 import websockets
 
+from . import codec
+from .corpus import INDEX_FILE_NAME, is_corpus_file, iter_corpus_records, iter_shard_file, load_provenance
+from .results import NOT_SENT_RESULT, ResultWriter, RESULT_FIELDS, load_completed_inputs
+from .stats import LatencyReport
+from .template import iter_generated_records
+from .metrics import DEFAULT_METRICS_HOST, DEFAULT_STATUS_INTERVAL_SEC, SenderMetrics, StatusLine, \
+    monitor_loop_lag, serve_metrics
+from .dedup import DedupIndex, format_stats
+from .provenance import apply_tuning, load_tuning
+from .mapped_corpus import MappedCorpus, select_rows
+from .result_cache import DEFAULT_DIFF_SAMPLE, CachingSink, DiffStats, ResultCache, iter_cached_records, \
+    report_changes
+
 DEFAULT_URI = "ws://127.0.0.1:9000/CP_REPLAY"
 DEFAULT_SUBPROTOCOLS = ["ocpp1.6"]
 RECV_TIMEOUT_SEC = 8          # 서버 응답 대기 타임아웃(초)
 CSV_DEFAULT_PATH = "replay_result.csv"
 UID_PLACEHOLDER = "$UID$"
 FRAME_MIN_FIELDS = 3          # [msgTypeId, uniqueId, action, ...] 최소 3개
+# 직렬화된 프레임의 앞부분 [msgTypeId, "uniqueId", "action", ... (--raw-send: payload는 파싱하지 않음,
+# escape/제어 문자가 있는 uniqueId/action은 맞지 않음 → 전체 파싱으로 처리)
+RAW_HEADER_RE = re.compile(rb'\[\s*(-?\d+)\s*,\s*"([^"\\\x00-\x1f]*)"\s*,\s*"([^"\\\x00-\x1f]*)"\s*[,\]]')
+DEFAULT_CONNECTIONS = 1       # 동시 WebSocket 세션 수
+DEFAULT_INFLIGHT = 8          # 세션별 대기 큐 길이 (backpressure)
+DEFAULT_WINDOW = 1            # 세션별 동시 응답 대기 요청 수 (1 = stop-and-wait)
+RECONNECT_MAX_TRIES = 5       # 세션 재연결 최대 시도 횟수
+RECONNECT_BASE_DELAY_SEC = 0.5
+RECONNECT_MAX_DELAY_SEC = 8
+DEFAULT_MINIMIZE_CONNECTIONS = 8  # 재현기 최소화 시험 동시 연결 수
+TIMING_FIELDS = ["send_start_s", "received_ms", "parsed_ms"]
+FAULT_FIELDS = ["fault"]
+DETAIL_FIELDS = ["action", "detail"]
+MUTATION_FIELDS = ["mutations"]  # 변형 trace (generator index / 즉석 생성에서 전달, 없으면 빈 값)
+DETAIL_MAX_CHARS = 300        # detail 컬럼 최대 길이
+DETAIL_LITERAL_CHARS = 32     # detail 안의 긴 문자열 리터럴은 앞부분만 남김 (oversize 값이 원인 문구를 밀어내지 않도록)
+_SCHEMA_DUMP = re.compile(r"(Failed validating '[^']*' in \S+?):?\n.*", re.S)  # jsonschema의 스키마/인스턴스 덤프
+_LONG_LITERAL = re.compile("'[^'\n]{%d,}'|\"[^\"\n]{%d,}\"" % (DETAIL_LITERAL_CHARS, DETAIL_LITERAL_CHARS))
+HISTORY_WINDOW = 16           # 연결별로 기억할 직전 전송 프레임 수 (재현기 최소화 입력)
+FAULT_RETRIES = 2             # 연결 장애로 결과를 얻지 못한 (원인이 아닌) 프레임 재전송 횟수
+FAULT_CRASH = "crash"         # 응답 대기 중 연결이 끊김 (가장 먼저 보낸 미응답 프레임)
+FAULT_HANG = "hang"           # TIMEOUT 후 같은 연결의 Heartbeat 확인에도 응답 없음
+FAULT_COLLATERAL = "collateral"  # 다른 프레임의 crash/hang으로 결과를 얻지 못함 (재전송도 실패)
+HANG_RESULT = "HANG"          # hang으로 끊은 연결에서 대기 중이던 요청의 결과
 
 def iter_input_records(input_path):
     """
     @param input_path: JSON 파일/JSONL/디렉터리 경로
-    @return: (Path(표시용), parsed JSON 객체) 튜플을 생성하는 Generatpor
+    @return: (Path(표시용), parsed JSON 객체, 변형 trace) 튜플을 생성하는 Generatpor
     @note: Path(표시용)는 JSONL인 경우 "파일명:라인번호" 형태
+        index.csv가 있는 디렉터리(generator --format jsonl/shards)는 case_id 형태
+        shard 파일(.jsonl.gz / .jsonl.zst)은 압축 해제하며 스트리밍
+        변형 trace는 index.csv / provenance.csv의 mutations 값 (그 외 입력은 빈 문자열)
     """
     p = Path(input_path)
 
     if p.is_dir():
+        if (p / INDEX_FILE_NAME).exists():
+            yield from iter_corpus_records(p)
+            return
+        provenance = load_provenance(p)
         for json_path in sorted(p.glob("*.json")):
-            yield json_path, json.loads(json_path.read_text(encoding="utf-8"))
+            yield json_path, codec.loads(json_path.read_text(encoding="utf-8")), provenance.get(json_path.stem, "")
 
     else:
-        if p.suffix.lower() == ".jsonl":
-            with p.open("r", encoding="utf-8") as f:
-                for line_no, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    display_name = Path(f"{p.name}:{line_no}")
-                    yield display_name, json.loads(line)
+        if is_corpus_file(p):
+            for display_path, parsed in iter_shard_file(p):
+                yield display_path, parsed, ""
         else:
-            yield p, json.loads(p.read_text(encoding="utf-8"))
+            yield p, codec.loads(p.read_text(encoding="utf-8")), ""
 
 
 def replace_uid_if_enabled(frame, enable_replace):
@@ -79,6 +122,53 @@ def classify_response(resp):
     return str(resp)
 
 
+def response_detail(resp):
+    """
+    @param resp: send_frame_and_receive() 반환값
+    @return: CallError의 원인 문자열 (errorDetails.cause, 없으면 errorDescription), 그 외 ""
+    @note: 서버의 errorDescription은 오류 코드마다 고정 문구라 cause가 실제 원인을 구분함.
+        jsonschema 메시지 뒤의 스키마/인스턴스 덤프는 빼고 ("Failed validating '<키워드>' in <경로>"까지 유지),
+        긴 문자열 리터럴은 줄이고, 한 줄로 합친 뒤 그래도 길면 가운데를 잘라 DETAIL_MAX_CHARS 이내로 맞춤
+    """
+    if not isinstance(resp, list) or len(resp) < 4 or resp[0] != 4:
+        return ""
+    detail = resp[3]
+    if len(resp) >= 5 and isinstance(resp[4], dict) and resp[4].get("cause") is not None:
+        detail = resp[4]["cause"]
+    detail = _SCHEMA_DUMP.sub(r"\1", str(detail))
+    detail = _LONG_LITERAL.sub(lambda m: m.group(0)[:DETAIL_LITERAL_CHARS] + "…" + m.group(0)[0], detail)
+    detail = " ".join(detail.split())
+    if len(detail) > DETAIL_MAX_CHARS:  # 앞부분(페이로드 repr)을 줄이고 끝의 검증 메시지는 유지
+        head = DETAIL_MAX_CHARS // 3
+        detail = detail[:head] + "…" + detail[head + 1 - DETAIL_MAX_CHARS:]
+    return detail
+
+
+def frame_action(frame):
+    """
+    @return: 프레임의 action 문자열 (없으면 "")
+    """
+    if isinstance(frame, list) and len(frame) >= FRAME_MIN_FIELDS:
+        return str(frame[2])
+    return ""
+
+
+def is_connection_failure(result):
+    """
+    @param result: CallDispatcher.call() 결과
+    @return: 응답 대신 연결 장애(CLOSED:<code> / EXC:<msg> / HANG)로 끝났는지 여부
+    """
+    return isinstance(result, str) and (result.startswith("CLOSED:") or result.startswith("EXC:")
+                                        or result == HANG_RESULT)
+
+
+def health_probe_frame():
+    """
+    @return: 연결이 살아 있는지 확인할 Heartbeat 프레임 (새 uniqueId)
+    """
+    return [2, str(uuid.uuid4()), "Heartbeat", {}]
+
+
 async def send_frame_and_receive(ws, frame, timeout=RECV_TIMEOUT_SEC):
     """
     @param ws:  websockets 연결 객체
@@ -91,9 +181,9 @@ async def send_frame_and_receive(ws, frame, timeout=RECV_TIMEOUT_SEC):
             그 외 예외 : EXC:<msg>
     """
     try:
-        await ws.send(json.dumps(frame))
+        await ws.send(codec.dumps(frame))
         raw = await asyncio.wait_for(ws.recv(), timeout=timeout)
-        return json.loads(raw)
+        return codec.loads(raw)
     except asyncio.TimeoutError:
         return "TIMEOUT"
     except websockets.ConnectionClosed as e:
@@ -102,66 +192,783 @@ async def send_frame_and_receive(ws, frame, timeout=RECV_TIMEOUT_SEC):
         return f"EXC:{e}"
 
 
+class FrameTiming:
+    """
+    @note: 케이스 1건의 monotonic 시각 기록
+    - send_start  : ws.send() 직전
+    - received_at : 응답 메시지 전체 수신 직후 (JSON 파싱 전)
+    - parsed_at   : 응답 JSON 파싱 완료 직후
+    websockets는 메시지 단위로만 넘겨주므로 received_at 은 첫 바이트가 아니라 마지막 프레임까지 조립된 시각
+    """
+
+    __slots__ = ("send_start", "received_at", "parsed_at")
+
+    def __init__(self, send_start, received_at, parsed_at):
+        self.send_start = send_start
+        self.received_at = received_at
+        self.parsed_at = parsed_at
+
+    def _elapsed_ms(self, at):
+        if self.send_start is None or at is None:
+            return None
+        return (at - self.send_start) * 1000.0
+
+    def received_ms(self):
+        return self._elapsed_ms(self.received_at)
+
+    def parsed_ms(self):
+        return self._elapsed_ms(self.parsed_at)
+
+    def columns(self, clock_origin):
+        """
+        @param clock_origin: send_start_s 기준 시각 (실행 시작)
+        @return: TIMING_FIELDS 순서의 CSV 값 (없으면 빈 문자열)
+        """
+        values = [
+            None if self.send_start is None else self.send_start - clock_origin,
+            self.received_ms(),
+            self.parsed_ms(),
+        ]
+        return ["" if v is None else f"{v:.3f}" for v in values]
+
+
+def unique_id_key(unique_id):
+    """
+    @param unique_id: 프레임의 uniqueId (퍼징으로 문자열이 아닐 수 있음)
+    @return: pending dict 키로 쓸 정규화 문자열
+    @note: 서버는 받은 uniqueId를 그대로 되돌려 주므로 JSON 표현으로 비교
+    """
+    try:
+        return json.dumps(unique_id, sort_keys=True)
+    except (TypeError, ValueError):
+        return repr(unique_id)
+
+
+class CallDispatcher:
+    """
+    @note: 연결 하나에 대한 uniqueId 기반 응답 매칭기.
+    - 단일 reader 태스크가 소켓을 읽어 CallResult/CallError를 frame[1]로 매칭
+    - pending: {uniqueId 키: Future} (응답 대기 중인 요청)
+    - 서버가 보낸 CALL, 이미 타임아웃된 요청의 늦은 응답은 결과에 섞이지 않고 카운트만 함
+    - 연결이 닫히면 대기 중인 모든 요청을 CLOSED:<code>로 종료.
+      그때 가장 먼저 보낸 미응답 요청의 키를 culprit으로 기록 (crash 원인 프레임)
+    - history: 이 연결로 보낸 최근 프레임 (HISTORY_WINDOW개)
+    - 시각은 모두 time.monotonic() 기준 (수신 직후 / JSON 파싱 직후)
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.pending = {}
+        self.sent_at = {}            # uniqueId 키 -> 전송 시각 (culprit 판단용)
+        self.closed_result = None    # 연결 종료 시 "CLOSED:<code>"
+        self.culprit = None          # 연결 장애 원인으로 판단한 요청의 uniqueId 키
+        self.history = deque(maxlen=HISTORY_WINDOW)
+        self.probe_lock = asyncio.Lock()
+        self.server_calls = 0        # 서버가 먼저 보낸 CALL 수
+        self.unmatched = 0           # 매칭되지 않은 응답/파싱 불가 메시지 수
+        self.reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        close_code = None
+        try:
+            async for raw in self.ws:
+                received_at = time.monotonic()
+                try:
+                    msg = codec.loads(raw)
+                except ValueError:
+                    self.unmatched += 1
+                    continue
+
+                if not isinstance(msg, list) or len(msg) < 2:
+                    self.unmatched += 1
+                elif msg[0] in (3, 4):
+                    future = self.pending.pop(unique_id_key(msg[1]), None)
+                    if future is not None and not future.done():
+                        future.set_result((msg, received_at, time.monotonic()))
+                    else:
+                        self.unmatched += 1
+                elif msg[0] == 2:
+                    self.server_calls += 1
+                else:
+                    self.unmatched += 1
+            close_code = self.ws.close_code
+        except websockets.ConnectionClosed as e:
+            close_code = e.code
+        except Exception as e:
+            self.closed_result = f"EXC:{e}"
+        finally:
+            if self.closed_result is None:
+                self.closed_result = f"CLOSED:{close_code}"
+            if self.culprit is None and self.pending:
+                self.culprit = min(self.pending, key=lambda k: self.sent_at.get(k, float("inf")))
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_result((self.closed_result, None, None))
+            self.pending.clear()
+
+    async def call(self, frame, timeout=RECV_TIMEOUT_SEC, raw=None):
+        """
+        @param frame: 전송할 OCPP 메시지 프레임 (list)
+        @param timeout: 응답 대기 타임아웃(초)
+        @param raw: frame을 직렬화한 원본 바이트 (주면 다시 직렬화하지 않고 text 프레임으로 그대로 전송)
+        @return: (결과, FrameTiming)
+            - 결과: send_frame_and_receive()와 동일한 형식
+            - FrameTiming: 전송 시작/응답 수신/파싱 완료 시각 (응답이 없으면 None)
+        @note: 같은 uniqueId가 이미 대기 중이면 앞 요청이 끝날 때까지 기다린 뒤 전송.
+            전송 자체가 실패하면(연결이 이미 닫힘) FrameTiming.send_start는 None
+        """
+        if self.closed_result is not None:
+            return self.closed_result, FrameTiming(None, None, None)
+
+        key = unique_id_key(frame[1])
+        while key in self.pending:
+            await asyncio.wait([self.pending[key]])
+            if self.closed_result is not None:
+                return self.closed_result, FrameTiming(None, None, None)
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        send_start = time.monotonic()
+        self.sent_at[key] = send_start
+        try:
+            self.history.append(frame if raw is None else raw)
+            try:
+                if raw is not None:
+                    await self.ws.send(raw, text=True)
+                else:
+                    await self.ws.send(codec.dumps(frame))
+            except websockets.ConnectionClosed as e:
+                return f"CLOSED:{e.code}", FrameTiming(None, None, None)
+            result, received_at, parsed_at = await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+            return result, FrameTiming(send_start, received_at, parsed_at)
+        except asyncio.TimeoutError:
+            return "TIMEOUT", FrameTiming(send_start, None, None)
+        except websockets.ConnectionClosed as e:
+            return f"CLOSED:{e.code}", FrameTiming(send_start, None, None)
+        except Exception as e:
+            return f"EXC:{e}", FrameTiming(send_start, None, None)
+        finally:
+            if self.pending.get(key) is future:
+                del self.pending[key]
+                del self.sent_at[key]
+            if not future.done():
+                future.cancel()
+
+    async def abandon(self, culprit_key):
+        """
+        @param culprit_key: hang 원인으로 판단한 요청의 uniqueId 키
+        @note: 응답하지 않는 연결을 닫음. 대기 중이던 다른 요청은 HANG 결과로 끝남
+        """
+        self.culprit = culprit_key
+        if self.closed_result is None:
+            self.closed_result = HANG_RESULT
+        await self.close()
+
+    async def close(self):
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+        await asyncio.gather(self.reader, return_exceptions=True)
+
+
+def build_session_uri(base_uri, session_index, n_sessions):
+    """
+    @param base_uri: 기준 WebSocket URI (예: ws://host:port/CP_REPLAY)
+    @param session_index: 세션 번호 (0부터)
+    @param n_sessions: 전체 세션 수
+    @return: 세션별 URI
+    @note: 세션이 1개면 원본 URI 그대로 사용.
+        여러 개면 경로(CP ID) 뒤에 "_<번호>"를 붙여 서로 다른 충전기 ID로 접속
+    """
+    if n_sessions <= 1:
+        return base_uri
+
+    parts = urlsplit(base_uri)
+    cp_path = parts.path.rstrip("/") or "/CP_REPLAY"
+    return urlunsplit(parts._replace(path=f"{cp_path}_{session_index:03d}"))
+
+
+def prepare_frame(parsed, enable_replace):
+    """
+    @param parsed: 입력에서 읽은 JSON 객체
+    @param enable_replace: uniqueId 교체 여부
+    @return: 전송할 프레임, 형식이 잘못된 경우 None
+    """
+    # 프레임 보정: list 형태/필드 수 점검
+    frame = replace_uid_if_enabled(parsed, enable_replace)
+    if not isinstance(frame, list) or len(frame) < FRAME_MIN_FIELDS:
+        return None
+
+    # 자리표시자("$UID$") 방어적 치환 (replace-uid 옵션 없이도 안전)
+    if frame[1] == UID_PLACEHOLDER:
+        frame = list(frame)
+        frame[1] = str(uuid.uuid4())
+    return frame
+
+
+def prepare_raw_frame(raw, enable_replace):
+    """
+    @param raw: 직렬화된 프레임 (bytes / memoryview, 코퍼스 원본 줄)
+    @param enable_replace: uniqueId 교체 여부
+    @return: (헤더 프레임 [msgTypeId, uniqueId, action], 보낼 바이트), 헤더를 읽지 못하면 None
+    @note: payload는 파싱하지 않음. uniqueId를 바꿔야 하면 (--replace-uid / "$UID$") prepare_frame()과 같은 규칙으로
+        원본의 uniqueId 자리에만 새 uuid를 넣어 이어 붙임 (그 외에는 raw를 그대로 반환 - 복사 없음)
+    """
+    m = RAW_HEADER_RE.match(raw)
+    if m is None:
+        return None
+    try:
+        unique_id = m.group(2).decode("utf-8")
+        action = m.group(3).decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if enable_replace or unique_id == UID_PLACEHOLDER:
+        unique_id = str(uuid.uuid4())
+        start, end = m.span(2)
+        raw = b"".join((raw[:start], unique_id.encode("ascii"), raw[end:]))
+    return [int(m.group(1)), unique_id, action], raw
+
+
+def expand_frame(frame):
+    """
+    @param frame: 보낸 프레임 또는 --raw-send 로 보낸 바이트
+    @return: 전체 프레임 객체 (crash/hang 기록용, raw는 이때만 파싱)
+    """
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        return codec.loads(bytes(frame))
+    return frame
+
+
+class FaultCase:
+    """
+    @note: crash/hang을 일으킨 케이스 1건 (최소화 입력)
+    - index / input : 입력 순번 / 표시 이름
+    - fault         : FAULT_CRASH / FAULT_HANG
+    - result        : 결과 분류 (CLOSED:<code> / TIMEOUT 등)
+    - frame         : 실제로 보낸 프레임
+    - window        : 같은 연결에서 직전에 보낸 프레임 리스트
+    """
+
+    __slots__ = ("index", "input", "fault", "result", "frame", "window")
+
+    def __init__(self, index, input_name, fault, result, frame, window):
+        self.index = index
+        self.input = input_name
+        self.fault = fault
+        self.result = result
+        self.frame = frame
+        self.window = window
+
+
+class ReplaySession:
+    """
+    @note: WebSocket 세션 하나를 담당하는 전송 워커.
+    - 세션별 bounded 큐로 backpressure 적용 (큐가 차면 입력 분배가 대기)
+    - window 개수까지 응답 대기 요청을 동시에 유지 (CallDispatcher가 uniqueId로 매칭)
+    - 연결이 닫히면(CLOSED) 다음 케이스 전송 전에 지수 backoff로 재연결
+    - send_checked(): crash/hang을 감지해 원인 프레임에만 fault를 붙이고,
+      장애에 휘말린 다른 프레임과 전송되지 못한 프레임은 새 연결로 다시 보냄
+    - 결과는 입력 순번(index)과 함께 ResultWriter에 전달 (순서 정렬은 writer가 담당)
+    """
+
+    def __init__(self, session_index, uri, subprotocols, timeout, inflight, window=DEFAULT_WINDOW):
+        self.session_index = session_index
+        self.uri = uri
+        self.subprotocols = subprotocols
+        self.timeout = timeout
+        self.queue = asyncio.Queue(maxsize=max(1, inflight))
+        self.window = asyncio.Semaphore(max(1, window))
+        self.dispatcher = None
+        self.reconnects = 0
+        self.attempted = False               # 연결을 한 번이라도 시도했는지 (입력을 받지 못한 세션 구분)
+        self.dead = False                    # 재연결 시도를 모두 실패하면 True (이후 전송은 바로 CONNECT_FAILED)
+        self._connect_lock = asyncio.Lock()
+        self.latency = None                  # LatencyReport (main에서 공유 주입)
+        self.on_result = None                # 결과 콜백 (index, result_class, parsed_ms) - 온라인 모드
+        self.faults = None                   # FaultCase 리스트 (main에서 공유 주입)
+        self.limiters = ()                   # 전송 전에 토큰을 받을 TokenBucket들 (campaign.py에서 주입)
+        self.deadline = None                 # 이 time.monotonic() 시각 이후로는 보내지 않음 (campaign.py에서 주입)
+        self.metrics = None                  # SenderMetrics (main에서 공유 주입, /metrics 와 상태 줄)
+        self.verbose = False                 # 케이스마다 결과 한 줄 출력
+        self.clock_origin = time.monotonic() # send_start_s 기준 시각
+
+    async def connect(self):
+        """
+        @return: 연결 성공 여부
+        @note: RECONNECT_MAX_TRIES 회까지 지수 backoff로 재시도
+        """
+        self.attempted = True
+        delay = RECONNECT_BASE_DELAY_SEC
+        for attempt in range(1, RECONNECT_MAX_TRIES + 1):
+            try:
+                ws = await websockets.connect(self.uri, subprotocols=self.subprotocols)
+                print(f"[HS] {self.uri} negotiated subprotocol = {ws.subprotocol!r}")
+                self.dispatcher = CallDispatcher(ws)
+                return True
+            except Exception as e:
+                print(f"[HS] {self.uri} connect failed ({attempt}/{RECONNECT_MAX_TRIES}): {e}")
+                if attempt < RECONNECT_MAX_TRIES:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY_SEC)
+        return False
+
+    async def close(self):
+        if self.dispatcher is not None:
+            await self.dispatcher.close()
+            self.dispatcher = None
+
+    async def ensure_connected(self):
+        """
+        @return: 사용 가능한 CallDispatcher, 연결 실패 시 None
+        @note: 동시에 여러 요청이 재연결을 시도하지 않도록 lock으로 보호.
+            RECONNECT_MAX_TRIES 회를 모두 실패하면 세션을 dead로 표시하고 이후에는 다시 시도하지 않음
+        """
+        async with self._connect_lock:
+            if self.dead:
+                return None
+            if self.dispatcher is not None and self.dispatcher.closed_result is not None:
+                await self.close()
+                self.reconnects += 1
+                if self.metrics is not None:
+                    self.metrics.reconnects.inc()
+            if self.dispatcher is None and not await self.connect():
+                self.dead = True
+                print(f"[HS] {self.uri} giving up after {RECONNECT_MAX_TRIES} tries, "
+                      f"session {self.session_index} stopped")
+                return None
+            return self.dispatcher
+
+    async def send(self, frame):
+        """
+        @param frame: 전송할 프레임
+        @return: (결과, FrameTiming) - CallDispatcher.call() 참고
+        @note: 연결이 없거나 닫혔으면 먼저 (재)연결
+        """
+        dispatcher = await self.ensure_connected()
+        if dispatcher is None:
+            return "EXC:CONNECT_FAILED", FrameTiming(None, None, None)
+        return await dispatcher.call(frame, timeout=self.timeout)
+
+    async def send_checked(self, frame, raw=None):
+        """
+        @param frame: 전송할 프레임
+        @param raw: frame의 원본 직렬화 바이트 (선택, --raw-send)
+        @return: (결과, FrameTiming, fault, window)
+            - fault: "" / FAULT_CRASH / FAULT_HANG / FAULT_COLLATERAL
+            - window: 같은 연결에서 이 프레임 직전에 보낸 프레임 리스트 (최대 HISTORY_WINDOW개)
+        @note: 전송되지 못했거나 다른 프레임의 장애에 휘말린 경우 FAULT_RETRIES회까지 새 연결로 재전송
+            limiters가 있으면 (재전송 포함) 전송마다 토큰을 받은 뒤 보냄.
+            deadline이 지났으면 (토큰 대기 중에 지난 경우 포함) 보내지 않고 NOT_SENT_RESULT
+        """
+        key = unique_id_key(frame[1])
+        for attempt in range(FAULT_RETRIES + 1):
+            if self._past_deadline():
+                return NOT_SENT_RESULT, FrameTiming(None, None, None), "", []
+            for limiter in self.limiters:
+                await limiter.acquire()
+            if self._past_deadline():
+                return NOT_SENT_RESULT, FrameTiming(None, None, None), "", []
+            dispatcher = await self.ensure_connected()
+            if dispatcher is None:
+                return "EXC:CONNECT_FAILED", FrameTiming(None, None, None), "", []
+            window = list(dispatcher.history)
+            metrics = self.metrics
+            if metrics is not None:
+                metrics.sends.inc()
+                metrics.inflight.inc()
+            try:
+                result, timing = await dispatcher.call(frame, timeout=self.timeout, raw=raw)
+            finally:
+                if metrics is not None:
+                    metrics.inflight.dec()
+
+            if result == "TIMEOUT":
+                fault = await self.check_hang(dispatcher, key)
+            elif is_connection_failure(result) and dispatcher.closed_result is not None:
+                if timing.send_start is None:
+                    fault = FAULT_COLLATERAL   # 전송 전에 이미 닫힌 연결
+                else:
+                    fault = FAULT_CRASH if dispatcher.culprit == key else FAULT_COLLATERAL
+            else:
+                fault = ""
+            if fault != FAULT_COLLATERAL:
+                return result, timing, fault, window
+        return result, timing, fault, window
+
+    def _past_deadline(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    async def check_hang(self, dispatcher, key):
+        """
+        @param dispatcher: TIMEOUT이 난 연결
+        @param key: TIMEOUT이 난 요청의 uniqueId 키
+        @return: "" (연결 정상, 단순 무응답) / FAULT_HANG / FAULT_COLLATERAL
+        @note: 같은 연결로 Heartbeat를 보내 응답이 없으면 hang으로 보고 연결을 끊음
+            (동시에 TIMEOUT이 난 요청은 lock으로 한 번만 확인, 먼저 확인한 요청이 원인)
+        """
+        async with dispatcher.probe_lock:
+            if dispatcher.closed_result is not None:
+                return FAULT_HANG if dispatcher.culprit == key else FAULT_COLLATERAL
+            probe, _ = await dispatcher.call(health_probe_frame(), timeout=self.timeout)
+            if not is_connection_failure(probe) and probe != "TIMEOUT":
+                return ""
+            await dispatcher.abandon(key)
+            return FAULT_HANG
+
+    async def _process(self, item, sink, enable_replace):
+        index, display_path, parsed, trace = item[:4]
+        raw = item[4] if len(item) > 4 else None
+        try:
+            send_raw = None
+            if raw is not None:
+                # --raw-send: 헤더만 읽고 원본 바이트를 그대로 (uniqueId만 바꿔) 전송
+                prepared = prepare_raw_frame(raw, enable_replace)
+                if prepared is not None:
+                    frame, send_raw = prepared
+                elif parsed is None:
+                    try:
+                        parsed = codec.loads(bytes(raw))
+                    except ValueError:
+                        parsed = None
+            if send_raw is None:
+                frame = prepare_frame(parsed, enable_replace)
+                if raw is not None and frame is parsed:
+                    send_raw = raw
+            if frame is None:
+                result, timing, fault = "EXC:INVALID_FORMAT", FrameTiming(None, None, None), ""
+            else:
+                result, timing, fault, window = await self.send_checked(frame, send_raw)
+
+            cls = classify_response(result)
+            if self.verbose:
+                print(f"{str(display_path):35s} -> {cls}")
+            if fault:
+                print(f"[FAULT] {display_path} -> {fault} ({cls}), session {self.session_index} reconnects")
+                if self.faults is not None and fault != FAULT_COLLATERAL:
+                    self.faults.append(FaultCase(index, str(display_path), fault, cls,
+                                                 expand_frame(frame if send_raw is None else send_raw),
+                                                 [expand_frame(sent) for sent in window]))
+            sink.add(index, [str(display_path), cls] + timing.columns(self.clock_origin)
+                     + [fault, frame_action(frame), response_detail(result), trace])
+            if self.latency is not None and frame is not None:
+                self.latency.record(frame[2], cls, timing.parsed_ms())
+            if self.metrics is not None:
+                self.metrics.record_result(frame_action(frame), cls, timing.parsed_ms(), fault)
+            if self.on_result is not None:
+                self.on_result(index, cls, timing.parsed_ms())
+        finally:
+            self.window.release()
+
+    async def run(self, sink, enable_replace):
+        """
+        @param sink: 결과 기록기 (ResultWriter)
+        @param enable_replace: uniqueId 교체 여부
+        @note: 큐에서 None을 받으면 남은 요청을 마무리하고 종료
+        """
+        tasks = set()
+        try:
+            while True:
+                item = await self.queue.get()
+                if item is None:
+                    break
+
+                await self.window.acquire()
+                task = asyncio.create_task(self._process(item, sink, enable_replace))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            await self.close()
+
+
+class TargetUnreachable(ConnectionError):
+    """
+    @note: 모든 세션이 재연결을 포기함 (대상 서버에 연결할 수 없어 실행을 중단)
+    """
+
+
+def all_sessions_dead(sessions):
+    """
+    @param sessions: ReplaySession 리스트
+    @return: 연결을 시도한 세션이 모두 재연결을 포기했는지 (대상 서버에 연결할 수 없어 실행을 중단해야 하는지)
+    @note: 입력을 하나도 받지 않아 연결을 시도하지 않은 세션은 판단에서 제외
+    """
+    tried = [session for session in sessions if session.attempted]
+    return bool(tried) and all(session.dead for session in tried)
+
+
+async def dispatch_inputs(inputs, sessions, skip_inputs=None):
+    """
+    @param inputs: (display_path, parsed, trace[, raw]) 이터러블 (지연 평가)
+    @param sessions: ReplaySession 리스트
+    @param skip_inputs: 건너뛸 input 표시 이름 집합 (--resume)
+    @return: (전송 대상 수, 건너뛴 수)
+    @note: 대기 큐가 가장 짧은 세션에 입력을 넣음. 모든 큐가 가득 차면 대기(backpressure)
+        → 입력 파일은 전송 속도에 맞춰 필요한 만큼만 읽힘.
+        dead 세션에는 넣지 않고, 모든 세션이 dead면 분배를 멈춤 (all_sessions_dead()로 확인)
+    """
+    index = 0
+    skipped = 0
+    try:
+        for record in inputs:
+            if skip_inputs and str(record[0]) in skip_inputs:
+                skipped += 1
+                continue
+            live = [s for s in sessions if not s.dead]
+            if not live:
+                break
+            target = min(live, key=lambda s: s.queue.qsize())
+            await target.queue.put((index, *record))
+            index += 1
+    finally:
+        for session in sessions:
+            await session.queue.put(None)
+    return index, skipped
+
+
 async def main():
     """
     @note:
     - --input : (JSON 파일/JSONL/디렉터리) 입력
+    - --generate N : 입력 파일 대신 템플릿 splice로 N개 케이스를 즉석 생성해 전송 (--seed로 재현)
+    - --online N : coverage-guided 온라인 퍼징. 서버 응답 시그니처(액션, 결과, 지연 구간)로
+                   interesting 입력을 골라 energy 스케줄로 재변형하며 N개 전송
+    - --online-corpus : 온라인 모드에서 찾은 interesting 입력 저장 디렉터리
+    - --dedup : --generate/--online 에서 이미 보낸 프레임은 재생성 (종료 시 액션별 hit ratio 출력)
+    - --tuning : --generate/--online 변형 확률 조정 파일 (run_analysis.py --tune-out)
     - --replace-uid : uniqueId 교체
     - --csv : (결과 CSV 경로) 출력
     - --uri : WebSocket 서버
     - --subp : WebSocket subprotocols (기본: ocpp1.6)
     - --timeout : 서버 응답 타임아웃(초, 기본 8초)
-    - CSV 컬럼: input, result
+    - --connections : 동시 WebSocket 세션 수 (세션마다 CP ID "<경로>_<번호>")
+    - --inflight : 세션별 대기 큐 길이 (backpressure)
+    - --window : 세션별 응답 대기(미확인) 요청 수. 응답은 uniqueId로 매칭
+    - --resume : 기존 결과 파일에 있는 input은 건너뛰고 이어서 기록
+    - --minimize DIR : crash/hang 케이스를 ddmin으로 최소화해 재현 파일을 DIR에 저장 (ocpp_fuzzing/minimize.py)
+    - --minimize-connections : 최소화 시험을 동시에 돌릴 연결 수
+    - 연결 장애 처리: 응답 대기 중 연결이 끊기면 가장 먼저 보낸 미응답 프레임이 crash,
+      TIMEOUT 후 Heartbeat 확인에도 응답이 없으면 그 프레임이 hang (연결을 끊고 재연결).
+      장애에 휘말린 다른 프레임은 새 연결로 다시 보내 결과를 기록.
+      세션이 RECONNECT_MAX_TRIES 회 연속 연결에 실패하면 그 세션은 중단, 모든 세션이 중단되면 실행을 중단(종료 코드 1)
+    - 결과 파일: --csv 경로가 .jsonl 이면 JSONL, 그 외 CSV. 완료되는 대로 주기적으로 flush
+    - CSV 컬럼: input, result, send_start_s, received_ms, parsed_ms, fault, action, detail, mutations (입력 순서 유지)
+      (fault: crash / hang / collateral(재전송도 실패) / 빈 값, detail: CallError 원인 문자열,
+       mutations: 변형 trace "op@경로;…" - generator index.csv/provenance.csv 또는 --generate/--online 생성 시 기록)
+      (send_start_s: 실행 시작 기준 전송 시각(초), *_ms: 전송 시작 기준 경과 시간)
+    - 종료 시 액션별/결과 분류별 지연시간 p50/p90/p99/max 출력
+    - 진행 상황: --status-interval 초마다 [STATUS] 한 줄 (완료 수/전송률/응답 대기/재연결/결과 분류 상위),
+      케이스별 결과 줄은 --verbose 일 때만 출력
+    - --cache DB --build TAG : 보낸 케이스의 결과를 빌드 태그별 SQLite 캐시에 기록 (ocpp_fuzzing/result_cache.py)
+    - --diff : 기준 빌드(--diff-from, 기본: 가장 최근의 다른 빌드)에 결과가 있는 케이스는 --sample 비율만 다시 보내고,
+               종료 시 분류가 달라진 케이스 보고 (--diff-report CSV)
+    - --case / --action / --sample-rate / --sample-count (+ --stratify, --seed) : --input 이 index.csv 가 있는
+      코퍼스 디렉터리일 때 index.bin(mmap)으로 지정 케이스만 / 액션별 / 표본만 골라 전송 (ocpp_fuzzing/mapped_corpus.py)
+    - --raw-send : 코퍼스 줄을 파싱/재직렬화하지 않고 그대로 text 프레임으로 전송 (헤더만 읽음,
+      uniqueId를 바꿔야 하면 그 자리만 새 uuid로 바꿔 붙임)
+    - --metrics-port : 지정하면 http://<--metrics-host>:<포트>/metrics 에 Prometheus 지표 노출
+      (전송 수, 결과 분류별 수, 응답 대기 수, 재연결, fault, 액션별 응답 지연, 이벤트 루프 지연)
     - result: CallResult, CallError:<errorCode>, CallError, TIMEOUT, CLOSED:<code>, EXC:<msg>
     """
     parser = argparse.ArgumentParser(description="Replay OCPP JSON files to server.")
-    parser.add_argument("--input", required=True, help="JSON 파일/JSONL/디렉터리 경로")
+    parser.add_argument("--input", help="JSON 파일/JSONL/디렉터리 경로")
+    parser.add_argument("--generate", type=int, default=None,
+                        help="입력 대신 템플릿 splice로 N개 케이스 즉석 생성")
+    parser.add_argument("--online", type=int, default=None,
+                        help="coverage-guided 온라인 퍼징 전송 예산 (케이스 수)")
+    parser.add_argument("--online-corpus", default=None, help="온라인 모드 interesting 입력 저장 디렉터리")
+    parser.add_argument("--seed", type=int, default=None, help="--generate/--online 재현성용 난수 시드")
+    parser.add_argument("--dedup", action="store_true", help="--generate/--online 중복 프레임 재생성")
+    parser.add_argument("--tuning", default=None, help="--generate/--online 변형 확률 조정 파일")
     parser.add_argument("--replace-uid", action="store_true",
                         help="uniqueId를 실행 시 새 uuid4로 교체")
-    parser.add_argument("--csv", default=CSV_DEFAULT_PATH, help="결과 CSV 경로")
+    parser.add_argument("--csv", default=CSV_DEFAULT_PATH, help="결과 CSV 경로 (.jsonl 이면 JSONL)")
     parser.add_argument("--uri", default=DEFAULT_URI, help="WebSocket 서버 URI")
     parser.add_argument("--subp", nargs="*", default=DEFAULT_SUBPROTOCOLS,
                         help="WebSocket subprotocols (기본: ocpp1.6)")
     parser.add_argument("--timeout", type=int, default=RECV_TIMEOUT_SEC,
                         help="서버 응답 타임아웃(초)")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help="동시 WebSocket 세션 수 (기본: 1)")
+    parser.add_argument("--inflight", type=int, default=DEFAULT_INFLIGHT,
+                        help="세션별 대기 큐 길이 (기본: 8)")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help="세션별 동시 응답 대기 요청 수 (기본: 1)")
+    parser.add_argument("--resume", action="store_true",
+                        help="기존 결과 파일에 있는 입력은 건너뛰고 이어서 기록")
+    parser.add_argument("--minimize", default=None, help="crash/hang 재현 파일을 최소화해 저장할 디렉터리")
+    parser.add_argument("--minimize-connections", type=int, default=DEFAULT_MINIMIZE_CONNECTIONS,
+                        help="최소화 시험 동시 연결 수 (기본: 8)")
+    parser.add_argument("--cache", default=None, help="빌드별 결과 캐시 SQLite 파일")
+    parser.add_argument("--build", default=None, help="--cache 에 기록할 대상/빌드 태그")
+    parser.add_argument("--diff", action="store_true", help="기준 빌드에 결과가 있는 케이스는 표본만 다시 전송")
+    parser.add_argument("--diff-from", default=None, help="--diff 기준 빌드 태그 (기본: 가장 최근의 다른 빌드)")
+    parser.add_argument("--sample", type=float, default=DEFAULT_DIFF_SAMPLE,
+                        help="--diff 에서 기존 케이스를 다시 보낼 비율 (기본: 0.05)")
+    parser.add_argument("--diff-report", default=None, help="--diff 분류가 달라진 케이스 CSV 경로")
+    parser.add_argument("--case", action="append", default=None, help="보낼 case_id 또는 번호 (여러 번 지정 가능)")
+    parser.add_argument("--action", action="append", default=None, help="보낼 액션 (여러 번 지정 가능)")
+    parser.add_argument("--sample-rate", type=float, default=None, help="코퍼스 표본 비율 (0~1)")
+    parser.add_argument("--sample-count", type=int, default=None, help="코퍼스 표본 수")
+    parser.add_argument("--stratify", action="store_true", help="액션별 층화 표본")
+    parser.add_argument("--raw-send", action="store_true", help="코퍼스 줄을 재직렬화 없이 그대로 전송")
+    parser.add_argument("--verbose", action="store_true", help="케이스마다 결과 한 줄 출력")
+    parser.add_argument("--status-interval", type=float, default=DEFAULT_STATUS_INTERVAL_SEC,
+                        help="[STATUS] 상태 줄 출력 주기(초, 0 = 출력 안 함)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Prometheus /metrics 포트 (기본: 사용 안 함)")
+    parser.add_argument("--metrics-host", default=DEFAULT_METRICS_HOST, help="/metrics 바인드 주소 (기본: 127.0.0.1)")
     args = parser.parse_args()
+    sources = [args.input is not None, args.generate is not None, args.online is not None]
+    if sources.count(True) != 1:
+        parser.error("exactly one of --input, --generate or --online is required")
+    if args.online is not None and args.resume:
+        parser.error("--resume cannot be combined with --online")
+    if (args.cache is None) != (args.build is None):
+        parser.error("--cache and --build must be given together")
+    if args.diff and args.cache is None:
+        parser.error("--diff requires --cache and --build")
+    if args.diff and args.online is not None:
+        parser.error("--diff cannot be combined with --online")
+    corpus_select = (args.case is not None or args.action is not None or args.sample_rate is not None
+                     or args.sample_count is not None or args.raw_send)
+    if corpus_select and not (args.input and os.path.isfile(os.path.join(args.input, INDEX_FILE_NAME))):
+        parser.error("--case/--action/--sample-*/--raw-send require --input to be an indexed corpus directory")
+    if args.sample_rate is not None and args.sample_count is not None:
+        parser.error("use only one of --sample-rate or --sample-count")
+    if args.tuning:
+        try:
+            apply_tuning(load_tuning(args.tuning))
+        except (OSError, ValueError) as e:
+            parser.error(f"--tuning: {e}")
 
-    # 입력 수집
-    inputs = list(iter_input_records(args.input))
-    if not inputs:
-        print("No input JSON found.")
-        return
-
-    rows = []  # CSV 누적: [input_display, classified_result]
-
-    # WebSocket 연결 (한 번 연결해서 전 케이스 전송)
-    async with websockets.connect(args.uri, subprotocols=args.subp) as ws:
-        print(f"[HS] negotiated subprotocol = {ws.subprotocol!r}")
+    feedback = corpus = None
+    dedup = DedupIndex() if args.dedup else None
+    if args.generate is not None:
+        records = iter_generated_records(args.generate, seed=args.seed, dedup=dedup)
+    elif args.online is not None:
+        if args.seed is not None:
+            random.seed(args.seed)
+        from .feedback import FeedbackCorpus  # feedback 이 frame_action 을 sender 에서 가져오므로 지연 import
+        feedback = FeedbackCorpus(save_dir=args.online_corpus, dedup=dedup)
+        records = feedback.iter_records(args.online)
+    elif corpus_select:
+        corpus = MappedCorpus(args.input)
+        if args.case is not None:
+            rows = []
+            for case in args.case:
+                row = corpus.find(case)
+                if row is None:
+                    parser.error(f"--case: {case} not found in {args.input}")
+                rows.append(row)
+        else:
+            rows = select_rows(corpus, args.action, args.sample_rate, args.sample_count, args.stratify, args.seed)
+            print(f"corpus: selected {len(rows)} of {len(corpus)} cases")
+        records = corpus.iter_records(rows, raw=args.raw_send)
+    else:
+        records = iter_input_records(args.input)
 
-        for display_path, parsed in inputs:
-            # 프레임 보정: list 형태/필드 수 점검
-            frame = replace_uid_if_enabled(parsed, args.replace_uid)
+    # 이어하기: 이미 결과가 있는 입력 목록
+    skip_inputs = load_completed_inputs(args.csv) if args.resume else None
+    try:
+        sink = ResultWriter(args.csv, RESULT_FIELDS + TIMING_FIELDS + FAULT_FIELDS + DETAIL_FIELDS + MUTATION_FIELDS,
+                            append=args.resume)
+    except ValueError as e:
+        parser.error(f"--resume: {e}")
+    if sink.dropped:
+        print(f"resume: removed {sink.dropped} undelivered rows from {args.csv}, resending them")
+    cache = diff = None
+    if args.cache is not None:
+        cache = ResultCache(args.cache)
+        baseline = None
+        if args.diff:
+            baseline = args.diff_from or cache.latest_build(exclude=args.build)
+            if baseline is None:
+                print(f"diff: no previous build in {args.cache}, sending all cases")
+        cache.register_build(args.build)
+        sink = CachingSink(sink, cache, args.build)
+        diff = DiffStats(baseline)
+        records = iter_cached_records(records, sink, baseline, args.sample, diff)
+    latency = LatencyReport()
+    faults = []
 
-            if not isinstance(frame, list) or len(frame) < FRAME_MIN_FIELDS:
-                result = "EXC:INVALID_FORMAT"
-            else:
-                # 자리표시자("$UID$") 방어적 치환 (replace-uid 옵션 없이도 안전)
-                if frame[1] == UID_PLACEHOLDER:
-                    frame[1] = str(uuid.uuid4())
-                result = await send_frame_and_receive(ws, frame, timeout=args.timeout)
+    # 세션 풀 구성: 세션마다 별도 CP ID, 별도 큐/재연결
+    n_sessions = max(1, args.connections)
+    sessions = [
+        ReplaySession(i, build_session_uri(args.uri, i, n_sessions),
+                      args.subp, args.timeout, args.inflight, args.window)
+        for i in range(n_sessions)
+    ]
+    metrics = SenderMetrics()
+    clock_origin = time.monotonic()
+    for session in sessions:
+        session.latency = latency
+        session.clock_origin = clock_origin
+        session.faults = faults
+        session.metrics = metrics
+        session.verbose = args.verbose
+        if feedback is not None:
+            session.on_result = feedback.report
 
-            cls = classify_response(result)
-            print(f"{str(display_path):35s} -> {cls}")
-            rows.append([str(display_path), cls])
+    # 진행 상황: 상태 줄 + (선택) /metrics 엔드포인트와 이벤트 루프 지연 측정
+    stop = asyncio.Event()
+    monitors = []
+    metrics_server = None
+    if args.status_interval > 0:
+        monitors.append(asyncio.create_task(StatusLine(metrics, args.status_interval).run(stop)))
+    if args.metrics_port is not None:
+        metrics_server = await serve_metrics(metrics.registry, args.metrics_host, args.metrics_port)
+        port = metrics_server.sockets[0].getsockname()[1]
+        print(f"metrics: http://{args.metrics_host}:{port}/metrics")
+        monitors.append(asyncio.create_task(monitor_loop_lag(metrics.loop_lag, stop)))
 
-    # CSV 작성
-    with open(args.csv, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["input", "result"])
-        writer.writerows(rows)
+    try:
+        workers = [asyncio.create_task(s.run(sink, args.replace_uid)) for s in sessions]
+        sent, skipped = await dispatch_inputs(records, sessions, skip_inputs)
+        await asyncio.gather(*workers)
+    finally:
+        sink.close()
+        stop.set()
+        if corpus is not None:
+            corpus.close()
+        if cache is not None and diff.baseline is None:
+            cache.close()
+        await asyncio.gather(*monitors)
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
 
+    if all_sessions_dead(sessions):
+        raise SystemExit(f"aborted: cannot connect to {args.uri} ({RECONNECT_MAX_TRIES} tries per session). "
+                         f"Rerun with --resume once the server is reachable.")
+    if sent == 0 and skipped == 0 and not (diff is not None and diff.skipped):
+        print("No input JSON found.")
+        return
+    if skipped:
+        print(f"resume: skipped {skipped} inputs already in {args.csv}")
+    print(latency.format())
+    if feedback is not None:
+        print(feedback.format_summary())
+    if dedup is not None:
+        print(format_stats(dedup.stats()))
+    if diff is not None:
+        print(diff.format())
+        if diff.baseline is not None:
+            print(report_changes(cache, args.build, diff.baseline, args.diff_report))
+            cache.close()
+    reconnects = sum(s.reconnects for s in sessions)
+    if faults or reconnects:
+        kinds = {kind: sum(1 for f in faults if f.fault == kind) for kind in (FAULT_CRASH, FAULT_HANG)}
+        print(f"faults: crash {kinds[FAULT_CRASH]}, hang {kinds[FAULT_HANG]}, reconnects {reconnects}")
     print(f"wrote CSV: {args.csv}")
 
+    if args.minimize and faults:
+        from .minimize import minimize_faults
+        await minimize_faults(sorted(faults, key=lambda f: f.index), args.minimize, args.uri, args.subp,
+                              args.timeout, args.minimize_connections)
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
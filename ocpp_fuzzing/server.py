@@ -3,21 +3,36 @@
 import asyncio
 import logging
 import argparse
+import functools
+import itertools
+import json
+import time
 from datetime import datetime, UTC
 
 import websockets
+from ocpp.exceptions import (OCPPError, FormatViolationError, ProtocolError,
+                             PropertyConstraintViolationError)
+from ocpp.messages import Call, CallError, CallResult, MessageType
 from ocpp.routing import on
 from ocpp.v16 import ChargePoint as ChargePointBase
 from ocpp.v16 import call_result
 from ocpp.v16.datatypes import IdTagInfo, KeyValue, ChargingSchedule, ChargingSchedulePeriod
 from ocpp.v16.enums import AuthorizationStatus
 
+from . import codec
+from .metrics import DEFAULT_METRICS_HOST, ServerMetrics, monitor_loop_lag, serve_metrics
+from .recorder import CaseRecorder
+from .validation import ValidationCache, format_stats, warm_up
+
 DEFAULT_HOST = "0.0.0.0"
 DEFAULT_PORT = 9000
 REQUIRED_SUBPROTOCOL = "ocpp1.6"
 PING_INTERVAL = None                 # 서버가 핑 안 보낼 경우
 MAX_MESSAGE_BYTES = 2 * 1024 * 1024  # 최대 수신 페이로드 크기
 
+# StartTransaction 응답 transactionId (프로세스 내 고유, CP 세션은 한 워커에 고정되므로 CP 기준으로도 고유)
+_transaction_ids = itertools.count(1)
+
 
 LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
 logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
@@ -26,6 +41,44 @@ logging.getLogger("websockets").setLevel(logging.WARNING)
 log = logging.getLogger("ocpp-server")
 
 
+def unpack_frame(raw_msg):
+    """
+    @param raw_msg: 수신한 원본 프레임 문자열
+    @return: Call / CallResult / CallError
+    @note: ocpp.messages.unpack()과 같은 검사/예외. JSON 파싱만 codec.loads() 사용
+    """
+    try:
+        msg = codec.loads(raw_msg)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise FormatViolationError(
+            details={"cause": "Message is not valid JSON", "ocpp_message": raw_msg}
+        )
+
+    if not isinstance(msg, list):
+        raise ProtocolError(
+            details={
+                "cause": (
+                    "OCPP message hasn't the correct format. It "
+                    f"should be a list, but got '{type(msg)}' "
+                    "instead"
+                )
+            }
+        )
+
+    for cls in [Call, CallResult, CallError]:
+        try:
+            if msg[0] == cls.message_type_id:
+                return cls(*msg[1:])
+        except IndexError:
+            raise ProtocolError(details={"cause": "Message does not contain MessageTypeId"})
+        except TypeError:
+            raise ProtocolError(details={"cause": "Message is missing elements."})
+
+    raise PropertyConstraintViolationError(
+        details={"cause": f"MessageTypeId '{msg[0]}' isn't valid"}
+    )
+
+
 class CentralSystem(ChargePointBase):
     """
     @param ChargePointBase: ocpp.v16.ChargePoint 기반
@@ -33,8 +86,59 @@ class CentralSystem(ChargePointBase):
     - NORMAL_SEEDS의 표준 CP->CSMS 요청 처리
     - VIOLATION_SEEDS의 '방향 위반' 액션도 CallResult로 수용(테스트 편의 목적)
     - EDGECASE_SEEDS의 변형/경계값도 최소 스키마로 응답
+    - recorder(CaseRecorder)가 주어지면 수신 프레임마다 구조화 레코드를 남김
+    - StartTransaction마다 새 transactionId를 발급하고 진행 중인 거래를 CP별로 추적
+      (모르는 거래의 MeterValues/StopTransaction은 경고 로그, StopTransaction은 idTagInfo Invalid 응답)
     """
 
+    def __init__(self, id, connection, recorder=None, **kw):
+        super().__init__(id, connection, **kw)
+        self.recorder = recorder
+        self._last_reply = None
+        self.active_transactions = set()
+
+    async def _send(self, message):
+        self._last_reply = message
+        await super()._send(message)
+
+    async def route_message(self, raw_msg):
+        """
+        @param raw_msg: 수신한 원본 프레임 문자열
+        @note: ocpp 기본 route_message()와 같은 라우팅 (JSON 파싱만 codec 사용, unpack_frame()).
+            recorder가 있으면 처리 시간/응답을 측정해 recorder 큐에 넣고,
+            예외 traceback 로그는 레코드로 대체 (이벤트 루프에서 포맷팅 비용 제거)
+        """
+        recorder = self.recorder
+        started = time.perf_counter()
+        self._last_reply = None
+        record = {"ts": time.time(), "cp_id": self.id, "unique_id": "", "message_type": "",
+                  "action": "", "parse": "ok"}
+        try:
+            msg = unpack_frame(raw_msg)
+        except OCPPError as e:
+            record["parse"] = e.code
+            if recorder is None:
+                self.logger.exception("Unable to parse message: '%s', it doesn't seem "
+                                      "to be valid OCPP: %s", raw_msg, e)
+        else:
+            record["unique_id"] = str(msg.unique_id)
+            record["message_type"] = str(msg.message_type_id)
+            if msg.message_type_id == MessageType.Call:
+                record["action"] = str(msg.action)
+                try:
+                    await self._handle_call(msg)
+                except OCPPError as error:
+                    if recorder is None:
+                        self.logger.exception("Error while handling request '%s'", msg)
+                    await self._send(msg.create_call_error(error).to_json())
+            elif msg.message_type_id in [MessageType.CallResult, MessageType.CallError]:
+                self._response_queue.put_nowait(msg)
+
+        if recorder is not None:
+            record["handler_ms"] = (time.perf_counter() - started) * 1000.0
+            record["reply"] = self._last_reply
+            recorder.add(record)
+
     # ===== NORMAL_SEEDS (CP -> CSMS 표준 요청) =====
 
     @on("BootNotification")
@@ -55,15 +159,22 @@ class CentralSystem(ChargePointBase):
 
     @on("StartTransaction")
     async def on_start_tx(self, connector_id, id_tag, meter_start, timestamp, **kw):
-        log.info("StartTransaction: connector=%s idTag=%s meterStart=%s", connector_id, id_tag, meter_start)
+        transaction_id = next(_transaction_ids)
+        self.active_transactions.add(transaction_id)
+        log.info("StartTransaction: connector=%s idTag=%s meterStart=%s txId=%s",
+                 connector_id, id_tag, meter_start, transaction_id)
         return call_result.StartTransaction(
-            transaction_id=12345,
+            transaction_id=transaction_id,
             id_tag_info=IdTagInfo(status=AuthorizationStatus.accepted),
         )
 
     @on("StopTransaction")
     async def on_stop_tx(self, transaction_id, meter_stop, timestamp, **kw):
         log.info("StopTransaction: txId=%s meterStop=%s", transaction_id, meter_stop)
+        if transaction_id not in self.active_transactions:
+            log.warning("StopTransaction for unknown transaction: cp=%s txId=%s", self.id, transaction_id)
+            return call_result.StopTransaction(id_tag_info=IdTagInfo(status=AuthorizationStatus.invalid))
+        self.active_transactions.discard(transaction_id)
         # id_tag_info 응답은 선택(생략 가능). 여기선 간단 응답.
         return call_result.StopTransaction()
 
@@ -78,6 +189,9 @@ class CentralSystem(ChargePointBase):
     async def on_meter_values(self, connector_id=None, meter_value=None, **kw):
         samples = sum(len(m.get("sampledValue", [])) for m in (meter_value or []))
         log.info("MeterValues: connector=%s samples=%s", connector_id, samples)
+        transaction_id = kw.get("transaction_id")
+        if transaction_id is not None and transaction_id not in self.active_transactions:
+            log.warning("MeterValues for unknown transaction: cp=%s txId=%s", self.id, transaction_id)
         return call_result.MeterValues()
 
     @on("StatusNotification")
@@ -206,9 +320,10 @@ class CentralSystem(ChargePointBase):
         return call_result.ClearChargingProfile(status="Accepted")
 
 
-async def handle_connection(ws):
+async def handle_connection(ws, recorder=None):
     """
     @param ws: websockets 연결 객체
+    @param recorder: CaseRecorder (선택)
     @note: 클라이언트와의 핸드셰이크가 끝난 후 호출되는 엔트리.
         - 서브프로토콜 확인
         - 경로에서 ChargePoint ID 추출
@@ -216,7 +331,9 @@ async def handle_connection(ws):
     """
     try:
         peer = getattr(ws, "remote_address", None)
-        path = getattr(ws, "path", "/")
+        # websockets 14+ 는 ws.request.path, 이전 버전은 ws.path
+        request = getattr(ws, "request", None)
+        path = getattr(request, "path", None) or getattr(ws, "path", "/")
         log.info("[HS] peer=%s subprotocol=%r path=%s", peer, ws.subprotocol, path)
 
         # 필수 서브프로토콜 확인
@@ -230,29 +347,108 @@ async def handle_connection(ws):
         cp_id = (path.strip("/") or "UNKNOWN_CP")
 
         # ChargePoint 핸들러 시작 (루프 생명주기 관장)
-        await CentralSystem(cp_id, ws).start()
+        await CentralSystem(cp_id, ws, recorder=recorder).start()
 
+    except websockets.ConnectionClosedOK:
+        log.info("[HS] closed normally: %s", getattr(ws, "remote_address", None))
     except Exception as e:
         log.error("[SERVER] Exception: %s", e)
 
 
-async def main(host=DEFAULT_HOST, port=DEFAULT_PORT):
-    server = await websockets.serve(
-        handle_connection,
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, recorder=None, reuse_port=False):
+    """
+    @param recorder: CaseRecorder 또는 add(record)를 가진 객체 (선택)
+    @param reuse_port: SO_REUSEPORT 사용 (여러 워커 프로세스가 같은 포트를 나눠 받음)
+    @return: 실행 중인 websockets 서버 (port=0 이면 임의 포트, server.sockets로 확인)
+    """
+    return await websockets.serve(
+        functools.partial(handle_connection, recorder=recorder),
         host=host,
         port=port,
         subprotocols=[REQUIRED_SUBPROTOCOL],
         ping_interval=PING_INTERVAL,
         max_size=MAX_MESSAGE_BYTES,
+        reuse_port=reuse_port or None,
     )
-    log.info("CSMS listening on ws://%s:%s", host, port)
-    await server.wait_closed()
+
+
+def install_validation_cache(max_entries):
+    """
+    @param max_entries: 검증 결과 LRU 크기 (0 이하면 사용 안 함)
+    @return: 설치된 ValidationCache 또는 None
+    @note: 스키마 검증기를 미리 모두 생성한 뒤 ocpp 검증 함수를 캐시로 교체 (프로세스 전체 적용)
+    """
+    if max_entries <= 0:
+        return None
+    validators = warm_up()
+    cache = ValidationCache(max_entries)
+    cache.install()
+    log.info("validation cache: %d entries, %d schema validators compiled", max_entries, validators)
+    return cache
+
+
+async def main(host=DEFAULT_HOST, port=DEFAULT_PORT, case_log=None, validation_cache=0,
+               metrics_port=None, metrics_host=DEFAULT_METRICS_HOST):
+    """
+    @param case_log: 케이스 로그 경로 (.csv / .parquet, 선택).
+        지정하면 핸들러별 INFO 로그 대신 구조화 레코드를 백그라운드 스레드에서 기록
+    @param validation_cache: 스키마 검증 결과 LRU 크기 (0 = 사용 안 함)
+    @param metrics_port: 지정하면 http://<metrics_host>:<포트>/metrics 에 Prometheus 지표 노출
+        (액션별 처리 시간/응답 종류, 파싱 오류, 이벤트 루프 지연)
+    """
+    case_recorder = CaseRecorder(case_log) if case_log else None
+    recorder = case_recorder
+    metrics = metrics_server = lag_task = None
+    stop = asyncio.Event()
+    if metrics_port is not None:
+        metrics = recorder = ServerMetrics(inner=case_recorder)
+    cache = install_validation_cache(validation_cache)
+    try:
+        server = await serve(host, port, recorder)
+        log.info("CSMS listening on ws://%s:%s", host, port)
+        if metrics is not None:
+            metrics_server = await serve_metrics(metrics.registry, metrics_host, metrics_port)
+            lag_task = asyncio.create_task(monitor_loop_lag(metrics.loop_lag, stop))
+            log.info("metrics -> http://%s:%s/metrics", metrics_host, metrics_server.sockets[0].getsockname()[1])
+        if case_recorder is not None:
+            log.info("case log -> %s (per-handler INFO logs disabled)", case_log)
+            log.setLevel(logging.WARNING)
+        await server.wait_closed()
+    finally:
+        stop.set()
+        if lag_task is not None:
+            await lag_task
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+        if case_recorder is not None:
+            case_recorder.close()
+            print(f"case log: {case_recorder.written} records -> {case_log} (dropped {case_recorder.dropped})")
+        if cache is not None:
+            cache.uninstall()
+            print(format_stats(cache.stats()))
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="OCPP 1.6 Central System Server")
     parser.add_argument("--host", default=DEFAULT_HOST, help="Bind host (default: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Listen port (default: 9000)")
+    parser.add_argument("--case-log", default=None, help="Per-message case log (.csv / .parquet)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes sharing the port (SO_REUSEPORT)")
+    parser.add_argument("--validation-cache", type=int, default=0,
+                        help="LRU entries for cached schema-validation results (default: 0 = off)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Prometheus /metrics port (default: off; worker N uses port + N)")
+    parser.add_argument("--metrics-host", default=DEFAULT_METRICS_HOST,
+                        help="Bind host for /metrics (default: 127.0.0.1)")
     args = parser.parse_args()
 
-    asyncio.run(main(host=args.host, port=args.port))
+    if args.workers > 1:
+        from .workers import run_workers
+        run_workers(args.host, args.port, args.workers, case_log=args.case_log,
+                    validation_cache=args.validation_cache, metrics_port=args.metrics_port,
+                    metrics_host=args.metrics_host)
+    else:
+        asyncio.run(main(host=args.host, port=args.port, case_log=args.case_log,
+                         validation_cache=args.validation_cache, metrics_port=args.metrics_port,
+                         metrics_host=args.metrics_host))
@@ -0,0 +1,139 @@
+# stats.py
+# 스트리밍 지연시간 통계 (HDR histogram 방식)
+# - 샘플을 모두 저장하지 않고 log-linear 버킷 카운트만 유지
+# - 상대 오차: 약 1 / 2**(SUB_BUCKET_BITS-1) (기본 7비트 → 약 1.6% 이내)
+# - 그룹(액션/결과 분류 등)별 p50/p90/p99/max 요약
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+VALUE_UNIT = 1000            # ms 값을 정수 버킷으로 바꿀 배율 (1 단위 = 1µs)
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def bucket_index(value):
+    """
+    @param value: 0 이상 정수
+    @return: 버킷 번호
+    @note: SUB_BUCKET_COUNT 미만은 값 그대로, 그 이상은 2의 거듭제곱 구간마다
+        SUB_BUCKET_HALF 개의 선형 버킷으로 나눔
+    """
+    if value < SUB_BUCKET_COUNT:
+        return value
+    exponent = value.bit_length() - SUB_BUCKET_BITS
+    mantissa = value >> exponent
+    return SUB_BUCKET_COUNT + (exponent - 1) * SUB_BUCKET_HALF + (mantissa - SUB_BUCKET_HALF)
+
+
+def bucket_upper_value(index):
+    """
+    @param index: 버킷 번호
+    @return: 해당 버킷에 들어가는 가장 큰 값
+    """
+    if index < SUB_BUCKET_COUNT:
+        return index
+    exponent = (index - SUB_BUCKET_COUNT) // SUB_BUCKET_HALF + 1
+    mantissa = (index - SUB_BUCKET_COUNT) % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+    return ((mantissa + 1) << exponent) - 1
+
+
+class LatencyHistogram:
+    """
+    @note: 밀리초(float) 값을 기록하는 스트리밍 히스토그램.
+        메모리 사용량은 샘플 수가 아니라 값의 범위(버킷 수)에 비례
+    """
+
+    def __init__(self):
+        self.counts = {}         # bucket index -> count
+        self.total = 0
+        self.max_ms = 0.0
+        self.sum_ms = 0.0
+
+    def record(self, value_ms):
+        if value_ms is None:
+            return
+        value_ms = max(0.0, float(value_ms))
+        index = bucket_index(int(value_ms * VALUE_UNIT))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def merge(self, other):
+        """
+        @param other: 합칠 LatencyHistogram
+        """
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, pct):
+        """
+        @param pct: 백분위 (0~100)
+        @return: 해당 백분위 값(ms), 샘플이 없으면 None
+        """
+        if self.total == 0:
+            return None
+        rank = max(1, int(round(self.total * pct / 100.0 + 0.4999)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(bucket_upper_value(index) / VALUE_UNIT, self.max_ms)
+        return self.max_ms
+
+    def mean(self):
+        return self.sum_ms / self.total if self.total else None
+
+
+class LatencyReport:
+    """
+    @note: 그룹 키별 LatencyHistogram 모음
+        - by_action : 액션별
+        - by_result : 결과 분류별 (CallResult, CallError:<code> ...)
+    """
+
+    def __init__(self):
+        self.by_action = {}
+        self.by_result = {}
+
+    def record(self, action, result_class, value_ms):
+        if value_ms is None:
+            return
+        self.by_action.setdefault(str(action), LatencyHistogram()).record(value_ms)
+        self.by_result.setdefault(str(result_class), LatencyHistogram()).record(value_ms)
+
+    def merge(self, other):
+        """
+        @param other: 합칠 LatencyReport (다른 세션/프로세스의 집계)
+        """
+        for mine, theirs in ((self.by_action, other.by_action), (self.by_result, other.by_result)):
+            for key, hist in theirs.items():
+                mine.setdefault(key, LatencyHistogram()).merge(hist)
+
+    def format_table(self, title, groups, percentiles=DEFAULT_PERCENTILES):
+        """
+        @return: 고정폭 텍스트 표
+        """
+        header = f"{title:35s} {'count':>8s} " + " ".join(f"{'p' + str(p):>9s}" for p in percentiles) + f" {'max':>9s}"
+        lines = [header, "-" * len(header)]
+        for key in sorted(groups):
+            hist = groups[key]
+            values = " ".join(f"{hist.percentile(p):9.2f}" for p in percentiles)
+            lines.append(f"{key[:35]:35s} {hist.total:8d} {values} {hist.max_ms:9.2f}")
+        return "\n".join(lines)
+
+    def format(self):
+        """
+        @return: 액션별/결과 분류별 요약 문자열 (단위: ms)
+        """
+        if not self.by_action:
+            return "latency: no samples"
+        return "\n\n".join([
+            "latency (ms, send -> reply parsed)",
+            self.format_table("action", self.by_action),
+            self.format_table("result", self.by_result),
+        ])
@@ -0,0 +1,296 @@
+# template.py
+# 사전 직렬화 시드 템플릿 + 바이트 splice 변형 (고속 경로)
+# - 시드 프레임을 compact JSON으로 한 번만 직렬화하고, 모든 값/키/컨테이너의 바이트 위치를 기록
+# - 변형은 객체 트리를 다시 만들지 않고 템플릿 바이트의 구간 치환(splice)으로 적용
+# - 결과는 항상 유효한 JSON (generator의 jsonl/shards 출력, sender의 즉석 생성에 사용)
+
+import heapq
+import json
+import random
+import string
+from pathlib import Path
+
+from .dedup import MAX_REROLLS, MAX_STALLED_CASES
+from . import seeds
+from .seeds import DEFAULT_SEEDS
+from .provenance import join_trace, trace_op, tuning_weight
+
+SPLICE_OPS_MIN = 1           # 변형 1건당 적용할 splice 개수 범위
+SPLICE_OPS_MAX = 3
+OVERSIZE_MIN = 25            # oversize 문자열에 덧붙일 'A' 개수 범위 (generator와 동일)
+OVERSIZE_MAX = 200
+NUMBER_BOUNDARIES = [b"-1", b"0", b"1000000000"]
+HEADER_VALUES = [b'"2"', b"-1", b"999"]
+SWAP_ACTIONS = ["BootNotification", "Authorize", "StartTransaction",
+                "StatusNotification", "MeterValues", "TotallyUnknownAction"]
+JUNK_POOL_SIZE = 4096        # junk 문자열은 미리 만든 영숫자 풀에서 잘라 씀 (문자 단위 난수 생략)
+# --tuning 확률을 후보 가중치로 반영하는 payload 연산자 (action/header는 확률을 직접 사용)
+WEIGHTED_SPLICE_OPS = ("drop", "junk", "list_append_none")
+
+
+def _dump_scalar(value):
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+SWAP_ACTION_BYTES = [_dump_scalar(action) for action in SWAP_ACTIONS]
+_JUNK_POOL = "".join(random.Random(0).choices(string.ascii_letters + string.digits, k=JUNK_POOL_SIZE)).encode()
+
+
+class SeedTemplate:
+    """
+    @param frame: 시드 프레임 ([2, uid, Action, payload])
+    @note: 직렬화 중 기록하는 위치 정보 (모두 [start, end) 바이트 구간)
+    - scalars : (path, start, end, kind)  kind = str / num / bool / null
+    - members : (path, start, end, prev_comma, next_comma)  dict 필드 전체 ("key":value)
+    - closers : (path, pos, is_empty, kind)  dict/list 닫는 괄호 위치 (필드/원소 추가용)
+    path는 프레임 기준 인덱스/키 튜플. 프레임 헤더는 (0,), 액션은 (2,)
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.action = frame[2] if isinstance(frame, list) and len(frame) > 2 else "Unknown"
+        self.scalars = []
+        self.members = []
+        self.closers = []
+        buf = bytearray()
+        self._emit(frame, (), buf)
+        self.data = bytes(buf)
+        self.candidates = self._candidate_splices()
+        self._weights_key = None
+        self._weights = None
+        self.header_splice = None
+        self.action_splice = None
+        for path, start, end, kind in self.scalars:
+            if path == (0,):
+                self.header_splice = lambda s=start, e=end: (s, e, random.choice(HEADER_VALUES))
+            elif path == (2,):
+                self.action_splice = lambda s=start, e=end: (s, e, random.choice(SWAP_ACTION_BYTES))
+
+    def _emit(self, node, path, buf):
+        if isinstance(node, dict):
+            buf += b"{"
+            items = list(node.items())
+            for i, (key, value) in enumerate(items):
+                if i:
+                    buf += b","
+                member_start = len(buf)
+                buf += _dump_scalar(str(key)) + b":"
+                self._emit(value, path + (key,), buf)
+                self.members.append((path + (key,), member_start, len(buf), i > 0, i < len(items) - 1))
+            self.closers.append((path, len(buf), not items, "dict"))
+            buf += b"}"
+        elif isinstance(node, list):
+            buf += b"["
+            for i, element in enumerate(node):
+                if i:
+                    buf += b","
+                self._emit(element, path + (i,), buf)
+            self.closers.append((path, len(buf), not node, "list"))
+            buf += b"]"
+        else:
+            start = len(buf)
+            buf += _dump_scalar(node)
+            if isinstance(node, str):
+                kind = "str"
+            elif isinstance(node, bool):
+                kind = "bool"
+            elif node is None:
+                kind = "null"
+            else:
+                kind = "num"
+            self.scalars.append((path, start, len(buf), kind))
+
+    def _payload_scalars(self):
+        return [s for s in self.scalars if len(s[0]) > 1 and s[0][0] == 3]
+
+    def _candidate_weights(self):
+        """
+        @return: 후보별 가중치 리스트 (조정된 확률이 없으면 None → 균등 추출)
+        """
+        scales = tuple(tuning_weight(op) for op in WEIGHTED_SPLICE_OPS)
+        if all(scale == 1.0 for scale in scales):
+            return None
+        if self._weights_key != scales:
+            by_op = dict(zip(WEIGHTED_SPLICE_OPS, scales))
+            self._weights = [by_op.get(op_name.split("@", 1)[0], 1.0) for op_name, _ in self.candidates]
+            self._weights_key = scales
+        return self._weights
+
+    def _candidate_splices(self):
+        """
+        @return: payload에 적용 가능한 (trace 항목 "op@경로", 생성 함수) 목록
+            생성 함수는 (start, end, 치환 바이트)를 반환
+        """
+        candidates = []
+        data = self.data
+
+        for path, start, end, kind in self._payload_scalars():
+            if kind == "str":
+                candidates.append((trace_op("empty", path[1:]), lambda s=start, e=end: (s, e, b'""')))
+                candidates.append((trace_op("oversize", path[1:]), lambda e=end: (
+                    e - 1, e - 1, b"A" * random.randint(OVERSIZE_MIN, OVERSIZE_MAX))))
+                candidates.append((trace_op("as_int", path[1:]), lambda s=start, e=end: (s, e, b"12345")))
+            elif kind in ("num", "bool"):
+                candidates.append((trace_op("num_boundary", path[1:]), lambda s=start, e=end: (
+                    s, e, random.choice(NUMBER_BOUNDARIES))))
+                candidates.append((trace_op("as_str", path[1:]),
+                                   lambda s=start, e=end: (s, e, b'"' + data[s:e] + b'"')))
+            candidates.append((trace_op("null", path[1:]), lambda s=start, e=end: (s, e, b"null")))
+
+        for path, start, end, prev_comma, next_comma in self.members:
+            if path[0] != 3:
+                continue
+            # 필드 제거: 앞/뒤 쉼표 하나를 함께 제거해 JSON 유효성 유지
+            op = trace_op("drop", path[1:])
+            if next_comma:
+                candidates.append((op, lambda s=start, e=end: (s, e + 1, b"")))
+            elif prev_comma:
+                candidates.append((op, lambda s=start, e=end: (s - 1, e, b"")))
+            else:
+                candidates.append((op, lambda s=start, e=end: (s, e, b"")))
+
+        for path, pos, is_empty, kind in self.closers:
+            if not path or path[0] != 3:
+                continue
+            if kind == "dict":
+                candidates.append((trace_op("junk", path[1:]),
+                                   lambda p=pos, empty=is_empty: (p, p, self._junk_member(empty))))
+            else:
+                candidates.append((trace_op("list_append_none", path[1:]), lambda p=pos, empty=is_empty: (
+                    p, p, b"null" if empty else b",null")))
+        return candidates
+
+    @staticmethod
+    def _junk_member(is_empty):
+        length = random.randint(1, 50)
+        offset = random.randrange(JUNK_POOL_SIZE - length)
+        member = b'"__junk__":"' + _JUNK_POOL[offset:offset + length] + b'"'
+        return member if is_empty else b"," + member
+
+    def mutate(self):
+        """
+        @return: (변형된 프레임 바이트, 적용한 trace 항목 리스트 "op@경로")
+        @note: 서로 겹치지 않는 payload splice를 1~3개 골라 뒤에서부터 적용.
+            액션 스왑/헤더 파괴는 make_variants()와 같은 확률(ACTION_SWAP_PROB/HEADER_CORRUPT_PROB).
+            --tuning 으로 바뀐 drop/junk/list_append_none 확률은 후보 가중치(조정 전 대비 배율)로 반영
+        """
+        candidates = self.candidates
+        picked = []
+        if candidates:
+            n_ops = min(random.randint(SPLICE_OPS_MIN, SPLICE_OPS_MAX), len(candidates))
+            weights = self._candidate_weights()
+            if weights is None:
+                picked = random.sample(candidates, n_ops)
+            else:
+                picked = _weighted_sample(candidates, weights, n_ops)
+        if self.action_splice is not None and random.random() < seeds.ACTION_SWAP_PROB:
+            picked.append((trace_op("action"), self.action_splice))
+        if self.header_splice is not None and random.random() < seeds.HEADER_CORRUPT_PROB:
+            picked.append((trace_op("header"), self.header_splice))
+
+        chosen = []
+        for op_name, make_splice in picked:
+            start, end, replacement = make_splice()
+            # 이미 고른 구간과 겹치면 건너뜀 (같은 위치 삽입도 충돌로 취급)
+            if any(start <= other_end and other_start <= end for _, other_start, other_end, _ in chosen):
+                continue
+            chosen.append((op_name, start, end, replacement))
+
+        if not chosen:
+            return self.data, []
+
+        # 앞에서부터 조각을 이어 붙여 한 번에 join
+        pieces = []
+        cursor = 0
+        for _, start, end, replacement in sorted(chosen, key=lambda c: c[1]):
+            pieces.append(self.data[cursor:start])
+            pieces.append(replacement)
+            cursor = end
+        pieces.append(self.data[cursor:])
+        return b"".join(pieces), [c[0] for c in chosen]
+
+
+def _weighted_sample(population, weights, k):
+    """
+    @return: population 에서 weights 비례로 중복 없이 고른 최대 k개 (가중치 0인 항목은 제외)
+    @note: Efraimidis-Spirakis 방식 (항목마다 random() ** (1 / w) 키, 상위 k개)
+    """
+    keyed = [(random.random() ** (1.0 / w), i) for i, w in enumerate(weights) if w > 0]
+    return [population[i] for _, i in heapq.nlargest(k, keyed)]
+
+
+_TEMPLATE_CACHE = {}
+
+
+def get_templates(seed_frames=None):
+    """
+    @param seed_frames: 시드 목록 (기본: DEFAULT_SEEDS)
+    @return: SeedTemplate 리스트 (프로세스당 한 번만 직렬화)
+    """
+    seed_frames = DEFAULT_SEEDS if seed_frames is None else seed_frames
+    key = id(seed_frames)
+    if key not in _TEMPLATE_CACHE:
+        _TEMPLATE_CACHE[key] = [SeedTemplate(frame) for frame in seed_frames]
+    return _TEMPLATE_CACHE[key]
+
+
+def splice_variants(template, n_variants, traces=None):
+    """
+    @param template: SeedTemplate
+    @param n_variants: 생성할 변형 개수
+    @param traces: 변형마다 trace 문자열을 순서대로 덧붙일 리스트 (선택)
+    @return: 변형된 프레임 바이트 리스트 (make_variants()의 바이트 버전)
+    """
+    if traces is None:
+        return [template.mutate()[0] for _ in range(n_variants)]
+    variants = []
+    for _ in range(n_variants):
+        data, ops = template.mutate()
+        variants.append(data)
+        traces.append(join_trace(ops))
+    return variants
+
+
+def _reroll_candidates(template, first, first_trace):
+    yield first, first_trace
+    for _ in range(MAX_REROLLS):
+        data, ops = template.mutate()
+        yield data, join_trace(ops)
+
+
+def iter_generated_records(n_cases, seed=None, min_variants=1, max_variants=5, dedup=None):
+    """
+    @param n_cases: 생성할 케이스 수
+    @param seed: 난수 시드 (재현성)
+    @param min_variants / max_variants: 시드 하나에서 연속으로 뽑을 변형 개수 범위
+    @param dedup: DedupIndex (선택). 이미 보낸 프레임이면 재생성, MAX_REROLLS 회 후에도 중복이면 건너뜀
+    @return: (표시용 Path, None, 변형 trace, 프레임 바이트) Generator - --raw-send 코퍼스 레코드와 같은 형식
+        (parsed 자리는 None: sender가 prepare_raw_frame()으로 헤더만 읽고 splice 결과 바이트를 그대로 전송)
+    @note: 디스크를 거치지 않고 sender에서 바로 케이스를 만들 때 사용.
+        건너뛴 케이스가 MAX_STALLED_CASES 개 연속이면 변형 공간이 소진된 것으로 보고 n_cases 전에 멈춤
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    templates = get_templates()
+    case_no = 0
+    stalled = 0
+    while case_no < n_cases:
+        template = random.choice(templates)
+        traces = []
+        variants = splice_variants(template, random.randint(min_variants, max_variants), traces)
+        for data, trace in zip(variants, traces):
+            if case_no >= n_cases:
+                break
+            if dedup is not None:
+                data, trace = next(((d, t) for d, t in _reroll_candidates(template, data, trace)
+                                    if not dedup.seen(d, template.action)), (None, None))
+                if data is None:
+                    stalled += 1
+                    if stalled >= MAX_STALLED_CASES:
+                        print(f"dedup: no new variant in {stalled} tries, stopped after {case_no} cases")
+                        return
+                    continue
+                stalled = 0
+            case_no += 1
+            yield Path(f"gen:{case_no:06d}_{template.action}"), None, trace, data
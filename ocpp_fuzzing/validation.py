@@ -0,0 +1,183 @@
+# validation.py
+# 서버 스키마 검증 결과 캐시
+# - ocpp 라이브러리는 Call 수신 / CallResult 송신마다 JSON schema 검증 (기본: 스레드 풀에서 실행)
+# - 리플레이/퍼징에서는 같은 페이로드가 반복되므로 수신 Call의 (액션, 페이로드 해시) → 검증 결과를 LRU에 저장
+#   (송신 CallResult는 currentTime 등 매번 달라지는 값이 많아 캐시하지 않고 그대로 검증)
+# - 시작 시 OCPP 1.6 스키마 검증기를 모두 미리 생성 (첫 요청의 스키마 로딩 지연 제거)
+# - 결과는 캐시가 없을 때와 같음: 실패 시 같은 예외 클래스/description/details
+#   (details의 ocpp_message만 현재 메시지로 교체 → CallError 응답 바이트도 동일)
+
+import decimal
+import hashlib
+import os
+from collections import OrderedDict
+
+import ocpp.charge_point
+import ocpp.messages
+from ocpp.exceptions import OCPPError
+from ocpp.messages import MessageType
+
+from . import codec
+
+DEFAULT_MAX_ENTRIES = 65536    # LRU 최대 항목 수
+OCPP_VERSION = "1.6"
+
+# 라이브러리가 Decimal로 파싱해 검증하고 message.payload 자체를 바꾸는 (메시지 종류, 액션) → 캐시하지 않음
+# (warm_up()에서 이 스키마는 Decimal 파서로 생성)
+DECIMAL_SCHEMAS = {
+    (MessageType.Call, "SetChargingProfile"),
+    (MessageType.Call, "RemoteStartTransaction"),
+    (MessageType.CallResult, "GetCompositeSchedule"),
+}
+
+
+def payload_key(message):
+    """
+    @param message: Call / CallResult
+    @return: 캐시 키 (메시지 종류, 액션, 페이로드 digest). 직렬화할 수 없으면 None
+    @note: 키 순서를 유지한 compact JSON으로 해시 (정렬하지 않음).
+        검증 오류 메시지(details의 cause)가 키 순서와 값 표기(1 / 1.0 / true)에 따라 달라지기 때문
+    """
+    try:
+        data = codec.dumps_compact(message.payload)
+    except (TypeError, ValueError, RecursionError):
+        return None
+    return message.message_type_id, message.action, hashlib.blake2b(data, digest_size=16).digest()
+
+
+def warm_up(ocpp_version=OCPP_VERSION):
+    """
+    @param ocpp_version: 스키마 버전 (현재 "1.6")
+    @return: 생성한 검증기 수
+    @note: ocpp.messages.get_validator() 캐시를 미리 채움. 라이브러리 캐시 키에 parse_float가 없으므로
+        DECIMAL_SCHEMAS는 라이브러리와 같이 Decimal 파서로 생성해야 이후 검증 결과가 바뀌지 않음
+    """
+    schemas_dir = os.path.join(os.path.dirname(ocpp.messages.__file__),
+                               "v" + ocpp_version.replace(".", ""), "schemas")
+    count = 0
+    for filename in sorted(os.listdir(schemas_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext != ".json":
+            continue
+        if name.endswith("Response"):
+            message_type_id, action = MessageType.CallResult, name[:-len("Response")]
+        else:
+            message_type_id, action = MessageType.Call, name
+        parse_float = decimal.Decimal if (message_type_id, action) in DECIMAL_SCHEMAS else float
+        validator = ocpp.messages.get_validator(message_type_id, action, ocpp_version, parse_float=parse_float)
+        validator.is_valid({})  # $ref 해석 등 지연 초기화까지 마침
+        count += 1
+    return count
+
+
+class ValidationCache:
+    """
+    @param max_entries: LRU 최대 항목 수
+    @note: validate(message, ocpp_version)는 ocpp.messages.validate_payload()와 같은 동작.
+        install() 하면 ChargePoint._handle_call()이 이 캐시를 거쳐 검증
+        - hits / misses : 수신 Call의 캐시 적중 / 실제 검증 횟수
+        - bypassed      : 캐시하지 않는 수신 Call (DECIMAL_SCHEMAS, 직렬화 불가 페이로드)
+        - evictions     : LRU 상한으로 밀려난 항목 수
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self.entries = OrderedDict()   # key -> None(통과) 또는 (예외 클래스, description, details, ocpp_message 포함 여부)
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self._original = None
+
+    def install(self):
+        """
+        @note: ocpp.charge_point 모듈의 validate_payload를 이 캐시로 교체 (프로세스 전체 적용)
+        """
+        if self._original is None:
+            self._original = ocpp.charge_point.validate_payload
+            ocpp.charge_point.validate_payload = self.validate
+
+    def uninstall(self):
+        if self._original is not None:
+            ocpp.charge_point.validate_payload = self._original
+            self._original = None
+
+    async def validate(self, message, ocpp_version):
+        """
+        @param message: Call / CallResult
+        @param ocpp_version: 스키마 버전
+        @note: 실패 시 캐시 없이 검증한 것과 같은 OCPPError를 새로 만들어 발생
+        """
+        validate = self._original or ocpp.messages.validate_payload
+        if message.message_type_id != MessageType.Call:
+            await validate(message, ocpp_version)
+            return
+        key = None
+        if (message.message_type_id, message.action) not in DECIMAL_SCHEMAS:
+            key = payload_key(message)
+        if key is None:
+            self.bypassed += 1
+            await validate(message, ocpp_version)
+            return
+
+        key = (ocpp_version,) + key
+        try:
+            outcome = self.entries[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            if outcome is not None:
+                error_class, description, details, with_message = outcome
+                details = dict(details)
+                if with_message:
+                    details["ocpp_message"] = message
+                raise error_class(description=description, details=details)
+            return
+
+        self.misses += 1
+        try:
+            await validate(message, ocpp_version)
+        except OCPPError as e:
+            details = dict(e.details)
+            with_message = details.pop("ocpp_message", None) is not None
+            self._store(key, (type(e), e.description, details, with_message))
+            raise
+        self._store(key, None)
+
+    def _store(self, key, outcome):
+        self.entries[key] = outcome
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        @return: {"hits", "misses", "bypassed", "evictions", "entries"} (프로세스 간 전달/합산용)
+        """
+        return {"hits": self.hits, "misses": self.misses, "bypassed": self.bypassed,
+                "evictions": self.evictions, "entries": len(self.entries)}
+
+
+def merge_stats(total, stats):
+    """
+    @param total: 누적 stats() dict
+    @param stats: 더할 stats() dict
+    @return: total (제자리 갱신)
+    """
+    for name, value in stats.items():
+        total[name] = total.get(name, 0) + value
+    return total
+
+
+def format_stats(stats):
+    """
+    @param stats: stats() dict
+    @return: 한 줄 요약 문자열
+    """
+    lookups = stats.get("hits", 0) + stats.get("misses", 0)
+    ratio = 100.0 * stats.get("hits", 0) / lookups if lookups else 0.0
+    return (f"validation cache: hits {stats.get('hits', 0)}, misses {stats.get('misses', 0)} "
+            f"({ratio:.1f}% hit), bypassed {stats.get('bypassed', 0)}, "
+            f"evictions {stats.get('evictions', 0)}, entries {stats.get('entries', 0)}")
@@ -0,0 +1,275 @@
+# workers.py
+# 멀티 프로세스 CSMS (SO_REUSEPORT 샤딩)
+# - 워커 N개가 같은 포트를 SO_REUSEPORT로 각각 bind, 커널이 새 연결을 워커에 분배
+#   (WebSocket 연결은 accept한 워커에서 끝까지 처리되므로 CP 세션은 한 워커에 고정)
+# - 감독(supervisor) 프로세스: 죽은 워커를 백오프 후 재시작, 워커 로그/지표를 모아 출력
+# - 로그: 워커 logging → QueueHandler → 감독 프로세스의 핸들러
+#   (워커는 record.worker 만 붙이고, "[w<번호>]" 접두어는 감독 쪽 WorkerFormatter 가 출력 시 추가)
+# - 지표: 워커가 METRICS_INTERVAL_SEC 마다 MetricsRecorder.snapshot()을 큐로 전송
+#   (--metrics-port 지정 시 워커마다 포트 + 워커 번호에 Prometheus /metrics 도 노출)
+
+import asyncio
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from pathlib import Path
+
+from .metrics import DEFAULT_METRICS_HOST, ServerMetrics, monitor_loop_lag, serve_metrics
+from .recorder import CaseRecorder, MetricsRecorder
+from .server import LOG_FORMAT, install_validation_cache, serve, log
+from .stats import LatencyReport
+from .validation import format_stats, merge_stats
+
+METRICS_INTERVAL_SEC = 5.0         # 워커 지표 전송 / 감독 상태 출력 주기
+RESTART_BASE_DELAY_SEC = 0.5       # 재시작 백오프 (연속 크래시마다 2배)
+RESTART_MAX_DELAY_SEC = 30.0
+WORKER_STABLE_SEC = 30.0           # 이만큼 살아 있었으면 백오프 초기화
+SHUTDOWN_TIMEOUT_SEC = 5.0
+
+
+def worker_case_log_path(case_log, worker_id):
+    """
+    @param case_log: 기준 케이스 로그 경로 (예: case.csv)
+    @param worker_id: 워커 번호
+    @return: 워커 프로세스별 경로 (예: case.w0-<pid>.csv). 재시작된 워커는 새 파일에 기록
+    """
+    p = Path(case_log)
+    return p.with_name(f"{p.stem}.w{worker_id}-{os.getpid()}{p.suffix}")
+
+
+class _WorkerTag(logging.Filter):
+    def __init__(self, worker_id):
+        super().__init__()
+        self.worker_id = worker_id
+
+    def filter(self, record):
+        record.worker = self.worker_id
+        return True
+
+
+class WorkerFormatter(logging.Formatter):
+    """
+    @note: record.worker 가 있으면 메시지 앞에 "[w<번호>] " 를 붙여 출력
+    - record.msg 는 건드리지 않으므로 여러 핸들러/재출력에서도 접두어가 한 번만 붙음
+    """
+
+    def formatMessage(self, record):
+        worker = getattr(record, "worker", None)
+        if worker is None:
+            return super().formatMessage(record)
+        message = record.message
+        record.message = f"[w{worker}] {message}"
+        try:
+            return super().formatMessage(record)
+        finally:
+            record.message = message
+
+
+def worker_main(worker_id, host, port, case_log, log_queue, metrics_queue, validation_cache=0,
+                metrics_port=None, metrics_host=DEFAULT_METRICS_HOST):
+    """
+    @param worker_id: 워커 번호 (0부터)
+    @param log_queue / metrics_queue: 감독 프로세스로 가는 multiprocessing.Queue
+    @param metrics_port: Prometheus /metrics 기준 포트 (이 워커는 metrics_port + worker_id, None = 사용 안 함)
+    @note: 자식 프로세스 진입점. 로그 핸들러를 큐로 바꾼 뒤 서버 루프 실행
+    """
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(_WorkerTag(worker_id))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    asyncio.run(_worker_serve(worker_id, host, port, case_log, metrics_queue, validation_cache,
+                              metrics_port, metrics_host))
+
+
+async def _worker_serve(worker_id, host, port, case_log, metrics_queue, validation_cache,
+                        metrics_port=None, metrics_host=DEFAULT_METRICS_HOST):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    inner = None
+    if case_log:
+        inner = CaseRecorder(worker_case_log_path(case_log, worker_id))
+        log.setLevel(logging.WARNING)   # main()과 동일: 케이스 로그가 핸들러별 INFO 로그를 대체
+    exporter = metrics_server = lag_task = None
+    if metrics_port is not None:
+        exporter = inner = ServerMetrics(inner=inner)
+    metrics = MetricsRecorder(inner)
+    cache = install_validation_cache(validation_cache)
+    server = await serve(host, port, metrics, reuse_port=True)
+    log.info("worker %d (pid %d) listening on ws://%s:%s", worker_id, os.getpid(), host, port)
+    if exporter is not None:
+        metrics_server = await serve_metrics(exporter.registry, metrics_host, metrics_port + worker_id)
+        lag_task = asyncio.create_task(monitor_loop_lag(exporter.loop_lag, stop))
+        log.info("worker %d metrics -> http://%s:%s/metrics", worker_id, metrics_host, metrics_port + worker_id)
+    try:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), METRICS_INTERVAL_SEC)
+            except asyncio.TimeoutError:
+                pass
+            snapshot = metrics.snapshot()
+            if cache is not None:
+                snapshot["validation"] = cache.stats()
+            metrics_queue.put((worker_id, os.getpid(), snapshot))
+    finally:
+        server.close()
+        await server.wait_closed()
+        if lag_task is not None:
+            await lag_task
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+        if inner is not None:
+            inner.close()
+
+
+class WorkerSlot:
+    """
+    @note: 워커 번호 하나의 상태
+    - process   : 현재 프로세스 (없으면 None)
+    - restarts  : 재시작 횟수, failures: 연속 크래시 횟수 (백오프 계산용)
+    - snapshots : {pid: 그 프로세스가 마지막으로 보낸 누적 지표} (재시작 전 프로세스 포함)
+    """
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.process = None
+        self.started_at = None
+        self.restart_at = 0.0
+        self.restarts = 0
+        self.failures = 0
+        self.snapshots = {}
+
+
+def aggregate_metrics(slots):
+    """
+    @param slots: WorkerSlot 리스트
+    @return: (frames, cps, 워커별 frames 리스트, 합친 LatencyReport)
+    @note: cps는 워커별 CP 수의 합 (세션이 워커에 고정되므로 중복 없음, 재접속은 다시 셈)
+    """
+    frames = cps = 0
+    per_worker = []
+    report = LatencyReport()
+    for slot in slots:
+        worker_frames = 0
+        for snapshot in slot.snapshots.values():
+            worker_frames += snapshot["frames"]
+            cps += snapshot["cps"]
+            report.merge(snapshot["report"])
+        frames += worker_frames
+        per_worker.append(worker_frames)
+    return frames, cps, per_worker, report
+
+
+def run_workers(host, port, n_workers, case_log=None, validation_cache=0, metrics_port=None,
+                metrics_host=DEFAULT_METRICS_HOST):
+    """
+    @param n_workers: 워커 프로세스 수
+    @param case_log: 케이스 로그 기준 경로 (워커별 파일로 분리)
+    @param validation_cache: 워커별 스키마 검증 결과 LRU 크기 (0 = 사용 안 함)
+    @param metrics_port: Prometheus /metrics 기준 포트 (워커 N은 metrics_port + N, None = 사용 안 함)
+    @note: 감독 루프 (동기). SIGINT/SIGTERM 을 받으면 워커를 정리하고 최종 지표 출력
+    """
+    # spawn: 감독 프로세스의 로그 수신 스레드가 도는 중에 재시작하므로 fork 대신 사용
+    ctx = multiprocessing.get_context("spawn")
+    log_queue = ctx.Queue()
+    metrics_queue = ctx.Queue()
+    handlers = logging.getLogger().handlers
+    for handler in handlers:
+        handler.setFormatter(WorkerFormatter(LOG_FORMAT))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    slots = [WorkerSlot(i) for i in range(n_workers)]
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    def start(slot):
+        slot.process = ctx.Process(target=worker_main, name=f"csms-worker-{slot.worker_id}",
+                                   args=(slot.worker_id, host, port, case_log, log_queue, metrics_queue,
+                                         validation_cache, metrics_port, metrics_host))
+        slot.process.start()
+        slot.started_at = time.monotonic()
+
+    log.info("supervisor (pid %d): %d workers on ws://%s:%s (SO_REUSEPORT)", os.getpid(), n_workers, host, port)
+    for slot in slots:
+        start(slot)
+
+    next_status = time.monotonic() + METRICS_INTERVAL_SEC
+    try:
+        while not stopping:
+            _drain_metrics(metrics_queue, slots, timeout=0.5)
+            now = time.monotonic()
+            for slot in slots:
+                if slot.process is not None and not slot.process.is_alive():
+                    code = slot.process.exitcode
+                    slot.process.join()
+                    slot.process = None
+                    lived = now - slot.started_at
+                    slot.failures = 1 if lived >= WORKER_STABLE_SEC else slot.failures + 1
+                    delay = min(RESTART_MAX_DELAY_SEC, RESTART_BASE_DELAY_SEC * 2 ** (slot.failures - 1))
+                    slot.restart_at = now + delay
+                    log.warning("worker %d exited with code %s after %.1fs; restarting in %.1fs",
+                                slot.worker_id, code, lived, delay)
+                if slot.process is None and not stopping and now >= slot.restart_at:
+                    slot.restarts += 1
+                    start(slot)
+            if now >= next_status:
+                next_status = now + METRICS_INTERVAL_SEC
+                frames, cps, per_worker, _ = aggregate_metrics(slots)
+                alive = sum(1 for s in slots if s.process is not None)
+                log.info("status: workers %d/%d alive, restarts %d, frames %d, cps %d, per worker %s",
+                         alive, n_workers, sum(s.restarts for s in slots), frames, cps, per_worker)
+    finally:
+        for slot in slots:
+            if slot.process is not None and slot.process.is_alive():
+                slot.process.terminate()
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT_SEC
+        for slot in slots:
+            if slot.process is not None:
+                slot.process.join(max(0.0, deadline - time.monotonic()))
+                if slot.process.is_alive():
+                    slot.process.kill()
+                    slot.process.join()
+        # 워커가 종료 직전에 보낸 마지막 지표까지 반영
+        _drain_metrics(metrics_queue, slots, timeout=0.2)
+        listener.stop()
+
+    frames, cps, per_worker, report = aggregate_metrics(slots)
+    print(f"workers: {n_workers}, restarts: {sum(s.restarts for s in slots)}, "
+          f"frames: {frames}, cps: {cps}, per worker: {per_worker}")
+    if report.by_action:
+        print(report.format_table("handler time (ms) by action", report.by_action))
+        print(report.format_table("handler time (ms) by response", report.by_result))
+    validation = {}
+    for slot in slots:
+        for snapshot in slot.snapshots.values():
+            merge_stats(validation, snapshot.get("validation", {}))
+    if validation:
+        print(format_stats(validation))
+
+
+def _drain_metrics(metrics_queue, slots, timeout):
+    """
+    @note: 큐에 쌓인 워커 지표를 모두 꺼내 pid별 최신값으로 갱신 (첫 항목만 timeout 대기)
+    """
+    block = True
+    while True:
+        try:
+            worker_id, pid, snapshot = metrics_queue.get(block, timeout)
+        except queue.Empty:
+            return
+        block = False
+        slots[worker_id].snapshots[pid] = snapshot
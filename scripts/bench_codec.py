@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON codec backends (frames/sec) and check they match stdlib json.
+
+- 검증: 변형 프레임 + 일부러 만든 비정상 입력(NaN, 큰 정수, 서로게이트, 깊은 중첩, 지수 float 등)에
+  대해 백엔드별 codec 결과/예외가 표준 json과 같은지 먼저 확인합니다.
+- 측정: 백엔드별 loads (코퍼스 한 줄 / 서버 응답), dumps_compact (코퍼스 기록), dumps (전송 형식),
+  unpack_frame (서버 수신 파싱) 처리량
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+
+from ocpp.exceptions import OCPPError
+
+from ocpp_fuzzing import codec
+from ocpp_fuzzing.generator import make_variants
+from ocpp_fuzzing.seeds import DEFAULT_SEEDS
+from ocpp_fuzzing.server import unpack_frame
+
+MALFORMED_INPUTS = [
+    b"NaN", b"[Infinity]", b"[-Infinity]", b"[1e400]", b"[123456789012345678901234567890]",
+    b"[-9223372036854775809]", b"[18446744073709551616]", b'["\\ud800"]', b'["\\udc00\\ud800"]',
+    b'{"\\ud800":1}', b'["\xff"]', b"\xef\xbb\xbf[1]", b'{"a":1,"a":2}', b"[" * 2000 + b"]" * 2000,
+    b"[" * 300 + b"]" * 300, b'["a\x01b"]', b"[1,]", b"[1] x", b"", b"[01]", b"[1.]", b"[.5]",
+    b'["\\u0000"]', b"[5e-324]", b"[1e-400]", b"[True]", b"{1:2}", b"['a']", b"[+1]", b"[-0]",
+    b"[0.30000000000000004]", b'"\\ud83d\\ude00"', b"\x00\x00\x00[", '["é😀"]'.encode(),
+]
+MALFORMED_OBJECTS = [
+    float("nan"), float("inf"), -float("inf"), 1e16, 1e-5, 1.5e300, 1e22, 5e-324, -0.0, 2 ** 63,
+    2 ** 64, -2 ** 63 - 1, 2 ** 70, {1: 2}, {"b": 1, "a": 2}, (1, 2), "a\x01\x1f\x7f é😀\"\\/\n",
+    [None, True, False, "", {}, []], {"k": [0.1, {"x": None}]},
+]
+
+
+def outcome(fn, *args, **kw):
+    try:
+        value = fn(*args, **kw)
+    except RecursionError:
+        return ("err", "RecursionError")
+    except Exception as e:
+        return ("err", type(e).__name__)
+    try:
+        return ("ok", json.dumps(value, sort_keys=True) if not isinstance(value, bytes) else value,
+                type(value).__name__)
+    except (RecursionError, ValueError, TypeError):
+        return ("ok", repr(type(value)))
+
+
+def build_frames(n, seed):
+    random.seed(seed)
+    frames = []
+    while len(frames) < n:
+        frames.extend(make_variants(random.choice(DEFAULT_SEEDS), 5))
+    return frames[:n]
+
+
+def random_numbers(n, seed):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(n):
+        exponent = rng.randint(-330, 310)
+        values.append(float(f"{rng.random()}e{exponent}"))
+        values.append(rng.randint(-2 ** 66, 2 ** 66))
+    return [v for v in values if not (isinstance(v, float) and math.isinf(v))]
+
+
+def verify(frames):
+    """
+    @return: 불일치 건수 (현재 백엔드 기준)
+    """
+    mismatches = 0
+    lines = [json.dumps(f, ensure_ascii=False, separators=(",", ":")).encode("utf-8") for f in frames]
+    decode_inputs = lines + MALFORMED_INPUTS + [s.decode("utf-8", "surrogateescape") for s in MALFORMED_INPUTS]
+    for data in decode_inputs:
+        if outcome(codec.loads, data) != outcome(json.loads, data):
+            mismatches += 1
+            print(f"  loads mismatch: {data[:60]!r}")
+
+    for obj in frames + MALFORMED_OBJECTS + random_numbers(2000, 7):
+        for ensure_ascii in (False, True):
+            for sort_keys in (False, True):
+                expected = outcome(lambda: json.dumps(obj, ensure_ascii=ensure_ascii, sort_keys=sort_keys,
+                                                      separators=(",", ":")).encode("utf-8"))
+                got = outcome(codec.dumps_compact, obj, ensure_ascii=ensure_ascii, sort_keys=sort_keys)
+                if got != expected:
+                    mismatches += 1
+                    print(f"  dumps_compact mismatch: {obj!r:.60} ascii={ensure_ascii} sort={sort_keys}")
+    return mismatches
+
+
+def unpack_or_error(raw):
+    try:
+        return unpack_frame(raw)
+    except OCPPError as e:
+        return e
+
+
+def rate(fn, items, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    elapsed = time.perf_counter() - started
+    return len(items) * repeat / elapsed if elapsed > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ocpp_fuzzing.codec backends")
+    parser.add_argument("--frames", type=int, default=5000, help="측정용 변형 프레임 수")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 횟수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    args = parser.parse_args()
+
+    frames = build_frames(args.frames, args.seed)
+    lines = [codec.dumps_compact(f) for f in frames]
+    wire = [json.dumps(f) for f in frames]
+    calls = [json.dumps([2, f"uid-{i}", "Heartbeat", {}], separators=(",", ":")) for i in range(len(frames))]
+
+    # stdlib를 먼저 측정해 기준으로 사용
+    backends = [name for name in reversed(codec.BACKENDS) if name in codec.available_backends()]
+    print(f"{'backend':10s} {'loads/s':>12s} {'dumps_c/s':>12s} {'dumps/s':>12s} {'unpack/s':>12s}  identical")
+    for name in backends:
+        codec.set_backend(name)
+        mismatches = verify(frames)
+        rates = [
+            rate(codec.loads, lines, args.repeat),
+            rate(codec.dumps_compact, frames, args.repeat),
+            rate(codec.dumps, frames, args.repeat),
+            rate(unpack_or_error, calls + wire, args.repeat),
+        ]
+        print(f"{name:10s} " + " ".join(f"{r:12.0f}" for r in rates) + f"  {mismatches == 0}")
+        if mismatches:
+            raise SystemExit(f"codec output differs from stdlib json with backend {name}")
+    codec.set_backend()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark the mutation engine (variants/sec per seed).
+
+- legacy : 기존 deepcopy 기반 구현 (검증용 기준)
+- cow    : ocpp_fuzzing.generator (copy-on-write)
+같은 난수 시드로 두 구현을 돌려 직렬화 결과가 바이트 단위로 같은지 먼저 확인합니다.
+"""
+
+import argparse
+import copy
+import json
+import random
+import string
+import time
+
+from ocpp_fuzzing.generator import make_variants
+from ocpp_fuzzing.seeds import (DEFAULT_SEEDS, DICT_MUTATE_PROB, DICT_JUNK_PROB, LIST_APPEND_PROB,
+                                ACTION_SWAP_PROB, HEADER_CORRUPT_PROB)
+
+
+def legacy_mutate_payload(payload):
+    payload = copy.deepcopy(payload)
+    if isinstance(payload, dict):
+        field_names = list(payload.keys())
+        if field_names and random.random() < DICT_MUTATE_PROB:
+            key_to_change = random.choice(field_names)
+            if random.random() < DICT_MUTATE_PROB:
+                payload.pop(key_to_change, None)
+            else:
+                payload[key_to_change] = legacy_mutate_payload(payload.get(key_to_change))
+        if random.random() < DICT_JUNK_PROB:
+            junk_length = random.randint(1, 50)
+            payload["__junk__"] = "".join(
+                random.choices(string.ascii_letters + string.digits, k=junk_length)
+            )
+    elif isinstance(payload, list):
+        payload = [legacy_mutate_payload(element) for element in payload]
+        if random.random() < LIST_APPEND_PROB:
+            payload.append(None)
+    elif isinstance(payload, str):
+        mutation_kind = random.choice(["keep", "empty", "oversize", "as_int"])
+        if mutation_kind == "empty":
+            return ""
+        if mutation_kind == "oversize":
+            return payload + ("A" * random.randint(25, 200))
+        if mutation_kind == "as_int":
+            return 12345
+    elif isinstance(payload, (int, float)):
+        payload = random.choice([-1, 0, payload, 10**9])
+    return payload
+
+
+def legacy_make_variants(message_frame, n_variants):
+    variants = []
+    for _ in range(n_variants):
+        frame_copy = copy.deepcopy(message_frame)
+        if len(frame_copy) >= 3 and random.random() < ACTION_SWAP_PROB:
+            frame_copy[2] = random.choice([
+                "BootNotification", "Authorize", "StartTransaction",
+                "StatusNotification", "MeterValues", "TotallyUnknownAction"
+            ])
+        if len(frame_copy) >= 4 and isinstance(frame_copy[3], (dict, list)):
+            frame_copy[3] = legacy_mutate_payload(frame_copy[3])
+        if random.random() < HEADER_CORRUPT_PROB:
+            frame_copy[0] = random.choice(["2", -1, 999])
+        variants.append(frame_copy)
+    return variants
+
+
+def run(make, seed_frame, n_variants, rng_seed):
+    random.seed(rng_seed)
+    started = time.perf_counter()
+    variants = make(seed_frame, n_variants)
+    elapsed = time.perf_counter() - started
+    return variants, n_variants / elapsed if elapsed > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mutate_payload / make_variants")
+    parser.add_argument("--variants", type=int, default=20000, help="시드당 변형 개수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    args = parser.parse_args()
+
+    print(f"{'#':>3s} {'action':32s} {'legacy/s':>12s} {'cow/s':>12s} {'speedup':>8s}  identical")
+    for seed_no, seed_frame in enumerate(DEFAULT_SEEDS):
+        legacy, legacy_rate = run(legacy_make_variants, seed_frame, args.variants, args.seed + seed_no)
+        cow, cow_rate = run(make_variants, seed_frame, args.variants, args.seed + seed_no)
+
+        identical = all(json.dumps(a) == json.dumps(b) for a, b in zip(legacy, cow))
+        print(f"{seed_no:3d} {str(seed_frame[2])[:32]:32s} {legacy_rate:12.0f} {cow_rate:12.0f} "
+              f"{cow_rate / legacy_rate:7.1f}x  {identical}")
+        if not identical:
+            raise SystemExit(f"output mismatch for seed #{seed_no}")
+
+
+if __name__ == "__main__":
+    main()
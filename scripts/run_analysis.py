@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Bucket replay/scenario results and write a triage report (Markdown or HTML).
+"""
+
+from ocpp_fuzzing.analysis import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+List builds in the replay result cache and report cases whose classification changed between two builds.
+"""
+
+from ocpp_fuzzing.result_cache import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Run a rate-limited, time-budgeted fuzzing campaign with adaptive throttling.
+"""
+
+import asyncio
+from ocpp_fuzzing.campaign import main
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Look up, filter and sample cases in a shard corpus through its memory-mapped index.
+"""
+
+from ocpp_fuzzing.mapped_corpus import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Run distributed fuzzing: a coordinator that hands out tasks and merges results, or a worker node.
+"""
+
+import asyncio
+from ocpp_fuzzing.distributed import main
+
+if __name__ == "__main__":
+    asyncio.run(main())
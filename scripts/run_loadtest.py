@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Run the CSMS load test with simulated charge points.
+"""
+
+import asyncio
+from ocpp_fuzzing.loadtest import main
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Run the crash/hang reproducer minimizer CLI.
+"""
+
+import asyncio
+from ocpp_fuzzing.minimize import main
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Run stateful OCPP session scenarios (Boot → Authorize → Start → MeterValues → Stop, mutated).
+"""
+
+from ocpp_fuzzing.scenario import main
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,29 @@ Run the OCPP test server (CSMS).
 
 import asyncio
 import argparse
+from ocpp_fuzzing.metrics import DEFAULT_METRICS_HOST
 from ocpp_fuzzing.server import main, DEFAULT_HOST, DEFAULT_PORT
+from ocpp_fuzzing.workers import run_workers
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run OCPP 1.6 CSMS test server")
     parser.add_argument("--host", default=DEFAULT_HOST, help="Bind host (default: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Listen port (default: 9000)")
+    parser.add_argument("--case-log", default=None, help="Per-message case log (.csv / .parquet)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes sharing the port (SO_REUSEPORT)")
+    parser.add_argument("--validation-cache", type=int, default=0,
+                        help="LRU entries for cached schema-validation results (default: 0 = off)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Prometheus /metrics port (default: off; worker N uses port + N)")
+    parser.add_argument("--metrics-host", default=DEFAULT_METRICS_HOST,
+                        help="Bind host for /metrics (default: 127.0.0.1)")
     args = parser.parse_args()
 
-    asyncio.run(main(host=args.host, port=args.port))
\ No newline at end of file
+    if args.workers > 1:
+        run_workers(args.host, args.port, args.workers, case_log=args.case_log,
+                    validation_cache=args.validation_cache, metrics_port=args.metrics_port,
+                    metrics_host=args.metrics_host)
+    else:
+        asyncio.run(main(host=args.host, port=args.port, case_log=args.case_log,
+                         validation_cache=args.validation_cache, metrics_port=args.metrics_port,
+                         metrics_host=args.metrics_host))
\ No newline at end of file
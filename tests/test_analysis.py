@@ -0,0 +1,29 @@
+import csv
+
+import pytest
+
+from ocpp_fuzzing.analysis import OVERFLOW_KEY, TriageReport, analyze, numpy
+
+
+def test_bucket_count_is_capped():
+    report = TriageReport(max_buckets=40)
+    for i in range(5000):
+        report.add((f"Action{i % 10}", f"op{i % 4}", f"CallError:E{i % 10}", f"sig {i}"), f"case{i}", "", 1.0)
+    assert len(report.buckets) == 41
+    assert report.buckets[OVERFLOW_KEY].count == report.overflow_rows == 5000 - 40
+
+
+@pytest.mark.skipif(numpy is None, reason="pandas not installed")
+def test_engines_agree_past_the_cap(tmp_path):
+    path = tmp_path / "results.csv"
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["input", "result", "send_start_s", "received_ms", "parsed_ms", "fault", "action",
+                         "detail", "mutations"])
+        for i in range(2000):
+            writer.writerow([f"case{i}", f"CallError:E{i % 7}", "0.1", "1.0", f"{i % 50}.5", "",
+                             f"Action{i % 9}", f"'field{i % 60}' is a required property", f"drop@f{i % 5}"])
+    counts = [{key: bucket.count for key, bucket in analyze([str(path)], engine, max_buckets=30)[0].buckets.items()}
+              for engine in ("python", "pandas")]
+    assert counts[0] == counts[1]
+    assert len(counts[0]) == 31
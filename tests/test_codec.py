@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from ocpp_fuzzing import codec
+
+SAMPLES = [
+    "\x7f", "a\x7fb", "\x1f‮", "가😀", " ", [2, "$UID$", "DataTransfer", {"data": "x\x7f", "n": 1e-7}],
+    {"b": 1, "a": [None, True, 1.5, "\x00"]},
+]
+
+
+@pytest.fixture(params=codec.available_backends())
+def backend(request):
+    previous = codec.BACKEND
+    codec.set_backend(request.param)
+    yield request.param
+    codec.set_backend(previous)
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+@pytest.mark.parametrize("obj", SAMPLES)
+def test_dumps_compact_matches_stdlib(backend, obj, ensure_ascii):
+    expected = json.dumps(obj, ensure_ascii=ensure_ascii, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    assert codec.dumps_compact(obj, ensure_ascii=ensure_ascii, sort_keys=True) == expected
@@ -0,0 +1,34 @@
+from ocpp_fuzzing.dedup import MAX_STALLED_CASES, DedupIndex
+from ocpp_fuzzing.feedback import FeedbackCorpus
+from ocpp_fuzzing.template import iter_generated_records
+
+
+class SaturatedDedup(DedupIndex):
+    """변형 공간이 소진된 상태: 처음 limit개 이후의 프레임은 모두 중복으로 봄"""
+
+    def __init__(self, limit):
+        super().__init__(capacity=1000)
+        self.limit = limit
+        self.checks = 0
+
+    def seen(self, frame, action="Unknown"):
+        self.checks += 1
+        if self.limit > 0:
+            self.limit -= 1
+            return False
+        return True
+
+
+def test_generated_records_stop_when_space_is_exhausted():
+    dedup = SaturatedDedup(limit=5)
+    records = list(iter_generated_records(10_000, seed=1, dedup=dedup))
+    assert len(records) == 5
+    assert dedup.checks < 5 + (MAX_STALLED_CASES + 1) * 10
+
+
+def test_feedback_skips_duplicates_and_stops():
+    dedup = SaturatedDedup(limit=5)
+    corpus = FeedbackCorpus(dedup=dedup)
+    records = list(corpus.iter_records(10_000))
+    assert len(records) == 5
+    assert not corpus.pending.keys() - set(range(5))
@@ -0,0 +1,54 @@
+from ocpp_fuzzing.distributed import Coordinator, WorkerHandle, iter_generate_tasks
+
+
+class ListSink:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, index, row):
+        self.rows.append(row)
+
+
+class FakeLink:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+def connect(coordinator, name):
+    worker = WorkerHandle(len(coordinator.workers), name, FakeLink())
+    coordinator.workers[worker.worker_id] = worker
+    return worker
+
+
+def row(name, result, fault=""):
+    return [name, result, "0.001", "1.0", "1.1", fault, "Heartbeat", "", ""]
+
+
+def test_requeued_task_keeps_results_over_undelivered_rows():
+    sink = ListSink()
+    coordinator = Coordinator(iter_generate_tasks(3, task_size=3), {}, sink)
+    bad, good = connect(coordinator, "bad"), connect(coordinator, "good")
+
+    coordinator._assign(bad)
+    task = bad.link.sent[-1]
+    coordinator._add_row(bad, task["task"], row("gen:000001", "EXC:CONNECT_FAILED"))
+    coordinator._add_row(bad, task["task"], row("gen:000002", "CLOSED:1006", "collateral"))
+    coordinator._assign(good)                # 남은 작업이 없어 대기
+    coordinator._release(bad)                # 대상에 못 닿은 워커가 끊김 → good 에 재배정
+
+    assert good.link.sent[-1]["task"] == task["task"]
+    for i in (1, 2, 3):
+        coordinator._add_row(good, task["task"], row(f"gen:{i:06d}", "CallResult"))
+    assert [(r[0], r[1], r[-1]) for r in sink.rows] == [(f"gen:{i:06d}", "CallResult", "good") for i in (1, 2, 3)]
+    assert coordinator.duplicates == 0 and coordinator.undelivered == 2
+
+
+def test_no_tasks_finishes_immediately():
+    coordinator = Coordinator(iter_generate_tasks(0), {}, ListSink())
+    worker = connect(coordinator, "w")
+    coordinator._assign(worker)
+    assert worker.link.sent == [{"type": "stop"}]
+    assert coordinator.finished.is_set()
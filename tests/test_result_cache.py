@@ -0,0 +1,82 @@
+from pathlib import Path
+
+from ocpp_fuzzing.result_cache import CachingSink, DiffStats, ResultCache, iter_cached_records
+
+CASES = 300
+
+
+class ListSink:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, index, row):
+        self.rows.append(row)
+
+    def close(self):
+        pass
+
+
+def make_records():
+    return [(Path(f"{i:04d}_Heartbeat_fuzz"), [2, "$UID$", "Heartbeat", {"n": i}], "") for i in range(CASES)]
+
+
+def replay(cache, build, diff, sample=0.05, result="CallResult"):
+    """sender --cache DB --build TAG [--diff] 와 같은 순서로 한 번 실행"""
+    baseline = cache.latest_build(exclude=build) if diff else None
+    cache.register_build(build)
+    sink = CachingSink(ListSink(), cache, build)
+    stats = DiffStats(baseline)
+    for index, record in enumerate(iter_cached_records(make_records(), sink, baseline, sample, stats)):
+        # 행 순서: input, result, send_start_s, received_ms, parsed_ms, fault, action, detail, mutations
+        sink.add(index, [str(record[0]), result, "", "", "", "", "Heartbeat", "", record[2]])
+    sink.close()
+    return stats
+
+
+def build_size(cache, build):
+    return dict((name, count) for name, _, count in cache.builds())[build]
+
+
+def test_diff_chain_keeps_skipped_cases(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.db"))
+    try:
+        first = replay(cache, "A", diff=False)
+        assert first.new == CASES
+
+        second = replay(cache, "B", diff=True)
+        assert second.baseline == "A"
+        assert second.new == 0
+        assert second.sampled + second.skipped == CASES
+        assert second.skipped > 0
+        assert build_size(cache, "B") == CASES
+
+        third = replay(cache, "C", diff=True)
+        assert third.baseline == "B"
+        assert third.new == 0
+        assert third.sampled + third.skipped == CASES
+        assert build_size(cache, "C") == CASES
+    finally:
+        cache.close()
+
+
+def test_copied_rows_do_not_override_fresh_results(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.db"))
+    try:
+        replay(cache, "A", diff=False)
+        replay(cache, "B", diff=True, sample=1.0)
+        assert list(cache.iter_changed("B", "A")) == []
+    finally:
+        cache.close()
+
+
+def test_undelivered_results_are_not_cached(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.db"))
+    try:
+        replay(cache, "A", diff=False, result="EXC:CONNECT_FAILED")
+        assert build_size(cache, "A") == 0
+
+        second = replay(cache, "B", diff=True)
+        assert second.new == CASES and second.skipped == 0
+        assert build_size(cache, "B") == CASES
+    finally:
+        cache.close()
@@ -0,0 +1,48 @@
+import pytest
+
+from ocpp_fuzzing.results import ResultWriter, load_completed_inputs
+
+FIELDS = ["input", "result", "fault"]
+
+
+@pytest.mark.parametrize("name", ["results.csv", "results.jsonl"])
+def test_resume_resends_undelivered_rows(tmp_path, name):
+    path = tmp_path / name
+    sink = ResultWriter(path, FIELDS)
+    sink.add(0, ["a", "CallResult", ""])
+    sink.add(1, ["b", "EXC:CONNECT_FAILED", ""])
+    sink.add(2, ["c", "CLOSED:1006", "collateral"])
+    sink.add(3, ["d", "CLOSED:1006", "crash"])
+    sink.close()
+    assert load_completed_inputs(path) == {"a", "d"}
+
+
+@pytest.mark.parametrize("name", ["results.csv", "results.jsonl"])
+def test_append_checks_columns(tmp_path, name):
+    path = tmp_path / name
+    sink = ResultWriter(path, FIELDS)
+    sink.add(0, ["a", "CallResult", ""])
+    sink.close()
+
+    ResultWriter(path, FIELDS, append=True).close()
+    with pytest.raises(ValueError):
+        ResultWriter(path, FIELDS + ["detail"], append=True)
+
+
+@pytest.mark.parametrize("name", ["results.csv", "results.jsonl"])
+def test_resume_replaces_undelivered_rows(tmp_path, name):
+    path = tmp_path / name
+    sink = ResultWriter(path, FIELDS)
+    sink.add(0, ["a", "CallResult", ""])
+    sink.add(1, ["b", "EXC:CONNECT_FAILED", ""])
+    sink.add(2, ["c", "CLOSED:1006", "collateral"])
+    sink.close()
+
+    sink = ResultWriter(path, FIELDS, append=True)
+    assert sink.dropped == 2
+    sink.add(0, ["b", "CallResult", ""])
+    sink.add(1, ["c", "CallError:FormatViolation", ""])
+    sink.close()
+
+    assert load_completed_inputs(path) == {"a", "b", "c"}
+    assert len(path.read_text(encoding="utf-8").splitlines()) == (3 if name.endswith(".jsonl") else 4)
@@ -0,0 +1,13 @@
+from ocpp_fuzzing.schema_mutator import SECURITY_ACTIONS, SchemaMutator
+from ocpp_fuzzing.server import CentralSystem
+
+
+def _handled_actions():
+    return {action for fn in vars(CentralSystem).values()
+            if (action := getattr(fn, "_on_action", None)) is not None}
+
+
+def test_default_schema_actions_are_handled_by_server():
+    mutator = SchemaMutator()
+    assert set(mutator.actions) == _handled_actions()
+    assert set(SchemaMutator(include_security=True).actions) == _handled_actions() | SECURITY_ACTIONS
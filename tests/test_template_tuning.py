@@ -0,0 +1,28 @@
+import random
+from collections import Counter
+
+from ocpp_fuzzing import seeds
+from ocpp_fuzzing.provenance import UNTUNED_PROBS, apply_tuning
+from ocpp_fuzzing.template import get_templates
+
+
+def _op_counts(n_rounds=300):
+    random.seed(7)
+    counts = Counter()
+    for template in get_templates():
+        for _ in range(n_rounds):
+            counts.update(op.split("@", 1)[0] for op in template.mutate()[1])
+    return counts
+
+
+def test_splice_mutation_follows_tuned_probabilities(monkeypatch):
+    for name, value in UNTUNED_PROBS.items():
+        monkeypatch.setattr(seeds, name, value)
+    baseline = _op_counts()
+
+    apply_tuning({"DICT_MUTATE_PROB": 0.0, "DICT_JUNK_PROB": 0.9})
+    tuned = _op_counts()
+
+    assert baseline["drop"] > 0
+    assert tuned["drop"] == 0
+    assert tuned["junk"] > baseline["junk"]
@@ -0,0 +1,21 @@
+import logging
+
+from ocpp_fuzzing.workers import WorkerFormatter, _WorkerTag
+
+
+def _record(msg, *args):
+    return logging.LogRecord("ocpp", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_worker_prefix_is_added_once_at_format_time():
+    record = _record("accepted %s from %d%%", "CP_1", 50)
+    assert _WorkerTag(3).filter(record)
+    formatter = WorkerFormatter("%(message)s")
+
+    assert formatter.format(record) == "[w3] accepted CP_1 from 50%"
+    assert formatter.format(record) == "[w3] accepted CP_1 from 50%"
+    assert record.msg == "accepted %s from %d%%"
+
+
+def test_supervisor_records_are_not_prefixed():
+    assert WorkerFormatter("%(message)s").format(_record("status: %d", 1)) == "status: 1"